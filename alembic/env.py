@@ -7,11 +7,15 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 from gpw_scraper.config import settings
+from gpw_scraper.models.backfill import Backfill, BackfillUnit  # noqa: F401
 from gpw_scraper.models.base import BaseModel
-from gpw_scraper.models.espi_ebi import EspiEbi  # noqa: F401
+from gpw_scraper.models.company import Company  # noqa: F401
+from gpw_scraper.models.espi_ebi import EspiEbi, EspiEbiKey, EspiEbiQuarantine  # noqa: F401
 from gpw_scraper.models.webhook import (  # noqa: F401
+    WebhookDeadLetter,
     WebhookEndpoint,
     WebhookEvent,
+    WebhookEventDailyRollup,
     WebhookUser,
 )
 
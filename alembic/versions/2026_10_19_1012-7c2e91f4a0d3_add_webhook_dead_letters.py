@@ -0,0 +1,96 @@
+"""Add webhook dead letters
+
+Revision ID: 7c2e91f4a0d3
+Revises: b169dc90e86a
+Create Date: 2026-10-19 10:12:41.301877
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ENUM
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e91f4a0d3"
+down_revision: str | None = "b169dc90e86a"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    enum_webhook_dead_letter_reason = ENUM(
+        "retries_exhausted",
+        "circuit_open",
+        name="webhookdeadletterreason",
+    )
+    enum_webhook_dead_letter_reason.create(op.get_bind())
+
+    op.create_table(
+        "webhook_dead_letters",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("reason", ENUM(name="webhookdeadletterreason", create_type=False), nullable=False),
+        sa.Column("webhook_id", sa.Integer(), nullable=False),
+        sa.Column("espi_ebi_id", sa.Integer(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("replayed_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["espi_ebi_id"],
+            ["espi_ebi.id"],
+            name=op.f("webhook_dead_letters_espi_ebi_id_fkey"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["webhook_id"],
+            ["webhook_endpoints.id"],
+            name=op.f("webhook_dead_letters_webhook_id_fkey"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("webhook_dead_letters_pkey")),
+    )
+    op.create_index(op.f("ix_webhook_dead_letters_id"), "webhook_dead_letters", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_webhook_dead_letters_webhook_id"),
+        "webhook_dead_letters",
+        ["webhook_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_webhook_dead_letters_espi_ebi_id"),
+        "webhook_dead_letters",
+        ["espi_ebi_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_webhook_dead_letters_replayed_at"),
+        "webhook_dead_letters",
+        ["replayed_at"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_webhook_dead_letters_created_at"),
+        "webhook_dead_letters",
+        ["created_at"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_webhook_dead_letters_updated_at"),
+        "webhook_dead_letters",
+        ["updated_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_webhook_dead_letters_updated_at"), table_name="webhook_dead_letters")
+    op.drop_index(op.f("ix_webhook_dead_letters_created_at"), table_name="webhook_dead_letters")
+    op.drop_index(op.f("ix_webhook_dead_letters_replayed_at"), table_name="webhook_dead_letters")
+    op.drop_index(op.f("ix_webhook_dead_letters_espi_ebi_id"), table_name="webhook_dead_letters")
+    op.drop_index(op.f("ix_webhook_dead_letters_webhook_id"), table_name="webhook_dead_letters")
+    op.drop_index(op.f("ix_webhook_dead_letters_id"), table_name="webhook_dead_letters")
+    op.drop_table("webhook_dead_letters")
+
+    sa.Enum(name="webhookdeadletterreason").drop(op.get_bind(), checkfirst=False)
@@ -0,0 +1,95 @@
+"""Add backfills
+
+Revision ID: 3f8a6d2c9b71
+Revises: 7c2e91f4a0d3
+Create Date: 2026-10-19 14:15:08.120544
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ENUM
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f8a6d2c9b71"
+down_revision: str | None = "7c2e91f4a0d3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    enum_backfill_status = ENUM(
+        "pending",
+        "running",
+        "done",
+        "failed",
+        name="backfillstatus",
+    )
+    enum_backfill_status.create(op.get_bind())
+
+    op.create_table(
+        "backfills",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("date_start", sa.Date(), nullable=False),
+        sa.Column("date_end", sa.Date(), nullable=False),
+        sa.Column("status", ENUM(name="backfillstatus", create_type=False), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id", name=op.f("backfills_pkey")),
+    )
+    op.create_index(op.f("ix_backfills_id"), "backfills", ["id"], unique=False)
+    op.create_index(op.f("ix_backfills_status"), "backfills", ["status"], unique=False)
+    op.create_index(op.f("ix_backfills_created_at"), "backfills", ["created_at"], unique=False)
+    op.create_index(op.f("ix_backfills_updated_at"), "backfills", ["updated_at"], unique=False)
+
+    op.create_table(
+        "backfill_units",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("backfill_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("status", ENUM(name="backfillstatus", create_type=False), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("items_created", sa.Integer(), nullable=False),
+        sa.Column("locked_until", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["backfill_id"],
+            ["backfills.id"],
+            name=op.f("backfill_units_backfill_id_fkey"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("backfill_units_pkey")),
+        sa.UniqueConstraint("backfill_id", "day", name=op.f("backfill_units_backfill_id_day_key")),
+    )
+    op.create_index(op.f("ix_backfill_units_id"), "backfill_units", ["id"], unique=False)
+    op.create_index(op.f("ix_backfill_units_backfill_id"), "backfill_units", ["backfill_id"], unique=False)
+    op.create_index(
+        "ix_backfill_units_status_locked_until",
+        "backfill_units",
+        ["status", "locked_until"],
+        unique=False,
+    )
+    op.create_index(op.f("ix_backfill_units_created_at"), "backfill_units", ["created_at"], unique=False)
+    op.create_index(op.f("ix_backfill_units_updated_at"), "backfill_units", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_backfill_units_updated_at"), table_name="backfill_units")
+    op.drop_index(op.f("ix_backfill_units_created_at"), table_name="backfill_units")
+    op.drop_index("ix_backfill_units_status_locked_until", table_name="backfill_units")
+    op.drop_index(op.f("ix_backfill_units_backfill_id"), table_name="backfill_units")
+    op.drop_index(op.f("ix_backfill_units_id"), table_name="backfill_units")
+    op.drop_table("backfill_units")
+
+    op.drop_index(op.f("ix_backfills_updated_at"), table_name="backfills")
+    op.drop_index(op.f("ix_backfills_created_at"), table_name="backfills")
+    op.drop_index(op.f("ix_backfills_status"), table_name="backfills")
+    op.drop_index(op.f("ix_backfills_id"), table_name="backfills")
+    op.drop_table("backfills")
+
+    sa.Enum(name="backfillstatus").drop(op.get_bind(), checkfirst=False)
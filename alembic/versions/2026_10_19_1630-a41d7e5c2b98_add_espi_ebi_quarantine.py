@@ -0,0 +1,59 @@
+"""Add espi ebi quarantine
+
+Revision ID: a41d7e5c2b98
+Revises: 3f8a6d2c9b71
+Create Date: 2026-10-19 16:30:12.514203
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ENUM
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a41d7e5c2b98"
+down_revision: str | None = "3f8a6d2c9b71"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    enum_scrape_error_kind = ENUM(
+        "transient",
+        "throttled",
+        "parse",
+        "unsupported",
+        name="scrapeerrorkind",
+    )
+    enum_scrape_error_kind.create(op.get_bind())
+
+    op.create_table(
+        "espi_ebi_quarantine",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("error_kind", ENUM(name="scrapeerrorkind", create_type=False), nullable=False),
+        sa.Column("error", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id", name=op.f("espi_ebi_quarantine_pkey")),
+        sa.UniqueConstraint("source", name=op.f("espi_ebi_quarantine_source_key")),
+    )
+    op.create_index(op.f("ix_espi_ebi_quarantine_id"), "espi_ebi_quarantine", ["id"], unique=False)
+    op.create_index(op.f("ix_espi_ebi_quarantine_date"), "espi_ebi_quarantine", ["date"], unique=False)
+    op.create_index(op.f("ix_espi_ebi_quarantine_created_at"), "espi_ebi_quarantine", ["created_at"], unique=False)
+    op.create_index(op.f("ix_espi_ebi_quarantine_updated_at"), "espi_ebi_quarantine", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_espi_ebi_quarantine_updated_at"), table_name="espi_ebi_quarantine")
+    op.drop_index(op.f("ix_espi_ebi_quarantine_created_at"), table_name="espi_ebi_quarantine")
+    op.drop_index(op.f("ix_espi_ebi_quarantine_date"), table_name="espi_ebi_quarantine")
+    op.drop_index(op.f("ix_espi_ebi_quarantine_id"), table_name="espi_ebi_quarantine")
+    op.drop_table("espi_ebi_quarantine")
+
+    sa.Enum(name="scrapeerrorkind").drop(op.get_bind(), checkfirst=False)
@@ -0,0 +1,25 @@
+"""Add espi ebi date id index
+
+Revision ID: 5b0e9c3f7a12
+Revises: a41d7e5c2b98
+Create Date: 2026-10-19 17:05:33.920417
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b0e9c3f7a12"
+down_revision: str | None = "a41d7e5c2b98"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_espi_ebi_date_id", "espi_ebi", ["date", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_espi_ebi_date_id", table_name="espi_ebi")
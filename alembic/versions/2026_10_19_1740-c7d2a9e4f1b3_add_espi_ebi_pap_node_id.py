@@ -0,0 +1,43 @@
+"""Add espi ebi pap node id
+
+Revision ID: c7d2a9e4f1b3
+Revises: 5b0e9c3f7a12
+Create Date: 2026-10-19 17:40:12.518302
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d2a9e4f1b3"
+down_revision: str | None = "5b0e9c3f7a12"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("espi_ebi", sa.Column("pap_node_id", sa.BigInteger(), nullable=True))
+    # if a node id shows up in more than one source only the oldest entry gets it
+    op.execute(
+        """
+        UPDATE espi_ebi
+        SET pap_node_id = nodes.node_id
+        FROM (
+            SELECT DISTINCT ON (node_id) id, node_id
+            FROM (SELECT id, substring(source FROM '/node/([0-9]+)')::bigint AS node_id FROM espi_ebi) AS parsed
+            WHERE node_id IS NOT NULL
+            ORDER BY node_id, id
+        ) AS nodes
+        WHERE espi_ebi.id = nodes.id;
+        """
+    )
+    op.create_unique_constraint(op.f("espi_ebi_pap_node_id_key"), "espi_ebi", ["pap_node_id"])
+
+
+def downgrade() -> None:
+    op.drop_constraint(op.f("espi_ebi_pap_node_id_key"), "espi_ebi", type_="unique")
+    op.drop_column("espi_ebi", "pap_node_id")
@@ -0,0 +1,35 @@
+"""Add espi ebi listing indexes
+
+Revision ID: 9e4b7d21c6a5
+Revises: c7d2a9e4f1b3
+Create Date: 2026-10-19 18:10:47.203195
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4b7d21c6a5"
+down_revision: str | None = "c7d2a9e4f1b3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    op.create_index("ix_espi_ebi_type_date", "espi_ebi", ["type", "date"], unique=False)
+    op.create_index(
+        "ix_espi_ebi_company_trgm",
+        "espi_ebi",
+        ["company"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"company": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_espi_ebi_company_trgm", table_name="espi_ebi", postgresql_using="gin")
+    op.drop_index("ix_espi_ebi_type_date", table_name="espi_ebi")
@@ -0,0 +1,58 @@
+"""Add companies
+
+Revision ID: 3d6f0a8b5e27
+Revises: 9e4b7d21c6a5
+Create Date: 2026-10-19 18:45:21.640873
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3d6f0a8b5e27"
+down_revision: str | None = "9e4b7d21c6a5"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "companies",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id", name=op.f("companies_pkey")),
+        sa.UniqueConstraint("name", name=op.f("companies_name_key")),
+    )
+    op.create_index(op.f("ix_companies_id"), "companies", ["id"], unique=False)
+    op.create_index(op.f("ix_companies_created_at"), "companies", ["created_at"], unique=False)
+    op.create_index(op.f("ix_companies_updated_at"), "companies", ["updated_at"], unique=False)
+    op.create_index(
+        "ix_companies_name_trgm",
+        "companies",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_companies_name_lower_prefix",
+        "companies",
+        [sa.text("lower(name) text_pattern_ops")],
+        unique=False,
+    )
+    op.execute("INSERT INTO companies (name, created_at) SELECT DISTINCT company, now() FROM espi_ebi;")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_companies_name_lower_prefix", table_name="companies")
+    op.drop_index("ix_companies_name_trgm", table_name="companies", postgresql_using="gin")
+    op.drop_index(op.f("ix_companies_updated_at"), table_name="companies")
+    op.drop_index(op.f("ix_companies_created_at"), table_name="companies")
+    op.drop_index(op.f("ix_companies_id"), table_name="companies")
+    op.drop_table("companies")
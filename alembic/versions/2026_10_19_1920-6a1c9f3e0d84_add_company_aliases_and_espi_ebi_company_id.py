@@ -0,0 +1,90 @@
+"""Add company aliases and espi ebi company id
+
+Revision ID: 6a1c9f3e0d84
+Revises: 3d6f0a8b5e27
+Create Date: 2026-10-19 19:20:05.381940
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6a1c9f3e0d84"
+down_revision: str | None = "3d6f0a8b5e27"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+LEGAL_FORM_KEYS = {
+    "SPÓŁKAAKCYJNA": "SA",
+    "SPÓŁKAEUROPEJSKA": "SE",
+    "SPÓŁKAZOGRANICZONĄODPOWIEDZIALNOŚCIĄ": "SPZOO",
+}
+
+
+def company_key(name: str) -> str:
+    # copy of `gpw_scraper.services.company.company_key` at the time of this migration
+    key = "".join(char for char in name.upper() if char.isalnum())
+    for legal_form, abbreviation in LEGAL_FORM_KEYS.items():
+        if key.endswith(legal_form):
+            return key.removesuffix(legal_form) + abbreviation
+    return key
+
+
+def upgrade() -> None:
+    op.add_column(
+        "companies",
+        sa.Column("aliases", postgresql.ARRAY(sa.String()), server_default="{}", nullable=False),
+    )
+    op.add_column("companies", sa.Column("ticker", sa.String(), nullable=True))
+    op.create_unique_constraint(op.f("companies_ticker_key"), "companies", ["ticker"])
+    op.create_index("ix_companies_aliases", "companies", ["aliases"], unique=False, postgresql_using="gin")
+
+    op.add_column("espi_ebi", sa.Column("company_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        op.f("espi_ebi_company_id_fkey"),
+        "espi_ebi",
+        "companies",
+        ["company_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_index("ix_espi_ebi_company_id_date", "espi_ebi", ["company_id", "date"], unique=False)
+
+    # names are merged by key in python, upper() of the db doesn't handle polish letters in every locale
+    conn = op.get_bind()
+    company_ids: dict[str, int] = {}
+    duplicates: list[int] = []
+    for id_, name in conn.execute(sa.text("SELECT id, name FROM companies ORDER BY id")).all():
+        key = company_key(name)
+        if key in company_ids:
+            duplicates.append(id_)
+        else:
+            company_ids[key] = id_
+
+    if company_ids:
+        conn.execute(
+            sa.text("UPDATE companies SET aliases = ARRAY[:key] WHERE id = :id"),
+            [{"key": key, "id": id_} for key, id_ in company_ids.items()],
+        )
+    if duplicates:
+        conn.execute(sa.text("DELETE FROM companies WHERE id = ANY(:ids)"), {"ids": duplicates})
+
+    names = conn.execute(sa.text("SELECT DISTINCT company FROM espi_ebi")).scalars().all()
+    mapping = [{"name": name, "id": company_ids[key]} for name in names if (key := company_key(name)) in company_ids]
+    if mapping:
+        conn.execute(sa.text("UPDATE espi_ebi SET company_id = :id WHERE company = :name"), mapping)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_espi_ebi_company_id_date", table_name="espi_ebi")
+    op.drop_constraint(op.f("espi_ebi_company_id_fkey"), "espi_ebi", type_="foreignkey")
+    op.drop_column("espi_ebi", "company_id")
+    op.drop_index("ix_companies_aliases", table_name="companies", postgresql_using="gin")
+    op.drop_constraint(op.f("companies_ticker_key"), "companies", type_="unique")
+    op.drop_column("companies", "ticker")
+    op.drop_column("companies", "aliases")
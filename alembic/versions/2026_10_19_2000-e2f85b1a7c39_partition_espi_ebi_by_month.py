@@ -0,0 +1,213 @@
+"""Partition espi ebi by month
+
+Revision ID: e2f85b1a7c39
+Revises: 6a1c9f3e0d84
+Create Date: 2026-10-19 20:00:41.774106
+
+"""
+
+import itertools
+from collections.abc import Sequence
+from datetime import UTC, date, datetime, timedelta
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import ENUM
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2f85b1a7c39"
+down_revision: str | None = "6a1c9f3e0d84"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+PARTITIONS_AHEAD_MONTHS = 3
+
+COLUMNS = "id, type, title, description, company, company_id, source, pap_node_id, parsed_by_llm, date, created_at"
+
+TSVECTOR_SQL = """
+setweight(to_tsvector('pl_ispell', title), 'A') ||
+setweight(to_tsvector('pl_ispell', description), 'B') ||
+setweight(to_tsvector('pl_ispell', company), 'D')
+"""
+
+# same as `gpw_scraper.models.espi_ebi.ESPI_EBI_KEYS_TRIGGER_SQL` at the time of this migration
+KEYS_TRIGGER_SQL = (
+    """
+CREATE OR REPLACE FUNCTION espi_ebi_keys_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO espi_ebi_keys (id, date, source, pap_node_id)
+        VALUES (NEW.id, NEW.date, NEW.source, NEW.pap_node_id);
+    ELSIF TG_OP = 'UPDATE' THEN
+        UPDATE espi_ebi_keys
+        SET id = NEW.id, date = NEW.date, source = NEW.source, pap_node_id = NEW.pap_node_id
+        WHERE id = OLD.id;
+    ELSE
+        DELETE FROM espi_ebi_keys WHERE id = OLD.id;
+    END IF;
+    RETURN NULL;
+END
+$$;
+""",
+    """
+CREATE TRIGGER espi_ebi_keys_sync
+AFTER INSERT OR UPDATE OF id, date, source, pap_node_id OR DELETE ON espi_ebi
+FOR EACH ROW EXECUTE FUNCTION espi_ebi_keys_sync();
+""",
+)
+
+INDEX_NAMES = (
+    "ix_espi_ebi_tsvector",
+    "ix_espi_ebi_date_id",
+    "ix_espi_ebi_type_date",
+    "ix_espi_ebi_company_trgm",
+    "ix_espi_ebi_company_id_date",
+)
+
+
+def espi_ebi_columns() -> list[sa.SchemaItem]:
+    return [
+        sa.Column("id", sa.Integer(), server_default=sa.text("nextval('espi_ebi_id_seq')"), nullable=False),
+        sa.Column("type", ENUM(name="entrytype", create_type=False), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("company", sa.String(), nullable=False),
+        sa.Column("company_id", sa.Integer(), nullable=True),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("pap_node_id", sa.BigInteger(), nullable=True),
+        sa.Column("parsed_by_llm", sa.String(), nullable=True),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("_tsvector", postgresql.TSVECTOR(), sa.Computed(TSVECTOR_SQL, persisted=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["company_id"],
+            ["companies.id"],
+            name=op.f("espi_ebi_company_id_fkey"),
+            ondelete="SET NULL",
+        ),
+    ]
+
+
+def create_espi_ebi_indexes() -> None:
+    op.create_index("ix_espi_ebi_tsvector", "espi_ebi", ["_tsvector"], unique=False, postgresql_using="gin")
+    op.create_index("ix_espi_ebi_date_id", "espi_ebi", ["date", "id"], unique=False)
+    op.create_index("ix_espi_ebi_type_date", "espi_ebi", ["type", "date"], unique=False)
+    op.create_index(
+        "ix_espi_ebi_company_trgm",
+        "espi_ebi",
+        ["company"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"company": "gin_trgm_ops"},
+    )
+    op.create_index("ix_espi_ebi_company_id_date", "espi_ebi", ["company_id", "date"], unique=False)
+
+
+def repoint_webhook_foreign_keys(table: str) -> None:
+    for referencing in ("webhook_events", "webhook_dead_letters"):
+        op.drop_constraint(op.f(f"{referencing}_espi_ebi_id_fkey"), referencing, type_="foreignkey")
+        op.create_foreign_key(
+            op.f(f"{referencing}_espi_ebi_id_fkey"),
+            referencing,
+            table,
+            ["espi_ebi_id"],
+            ["id"],
+        )
+
+
+def month_starts(first: date, last: date) -> list[date]:
+    """
+    First days of the months from `first` to `last` and of the one after it
+    """
+    months = [first.replace(day=1)]
+    while months[-1] <= last:
+        months.append((months[-1] + timedelta(days=32)).replace(day=1))
+    return months
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    # global uniqueness and target of foreign keys, a partitioned table can't have either on its own
+    op.create_table(
+        "espi_ebi_keys",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("pap_node_id", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("id", name=op.f("espi_ebi_keys_pkey")),
+        sa.UniqueConstraint("source", name=op.f("espi_ebi_keys_source_key")),
+        sa.UniqueConstraint("pap_node_id", name=op.f("espi_ebi_keys_pap_node_id_key")),
+    )
+    op.create_index(op.f("ix_espi_ebi_keys_date"), "espi_ebi_keys", ["date"], unique=False)
+    op.execute(
+        "INSERT INTO espi_ebi_keys (id, date, source, pap_node_id) SELECT id, date, source, pap_node_id FROM espi_ebi;"
+    )
+    repoint_webhook_foreign_keys("espi_ebi_keys")
+
+    # old table is copied into the partitioned one, its id sequence carries over
+    op.execute("ALTER SEQUENCE espi_ebi_id_seq OWNED BY NONE;")
+    op.rename_table("espi_ebi", "espi_ebi_unpartitioned")
+    for index in INDEX_NAMES:
+        op.drop_index(index, table_name="espi_ebi_unpartitioned")
+    for constraint in ("espi_ebi_pkey", "espi_ebi_source_key", "espi_ebi_pap_node_id_key"):
+        op.drop_constraint(constraint, "espi_ebi_unpartitioned")
+
+    op.create_table(
+        "espi_ebi",
+        *espi_ebi_columns(),
+        sa.PrimaryKeyConstraint("id", "date", name=op.f("espi_ebi_pkey")),
+        postgresql_partition_by="RANGE (date)",
+    )
+
+    # months of the existing rows up to `PARTITIONS_AHEAD_MONTHS` from now, later ones are made by the worker
+    first, last = conn.execute(sa.text("SELECT min(date)::date, max(date)::date FROM espi_ebi_unpartitioned")).one()
+    today = datetime.now(UTC).date()
+    months = month_starts(
+        min(first or today, today),
+        max(last or today, today + timedelta(days=31 * PARTITIONS_AHEAD_MONTHS)),
+    )
+    for month, end in itertools.pairwise(months):
+        op.execute(
+            f"CREATE TABLE espi_ebi_y{month.year}m{month.month:02d} PARTITION OF espi_ebi"
+            f" FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}');"
+        )
+    op.execute("CREATE TABLE espi_ebi_default PARTITION OF espi_ebi DEFAULT;")
+
+    op.execute(f"INSERT INTO espi_ebi ({COLUMNS}) SELECT {COLUMNS} FROM espi_ebi_unpartitioned;")  # noqa: S608
+    op.drop_table("espi_ebi_unpartitioned")
+    op.execute("ALTER SEQUENCE espi_ebi_id_seq OWNED BY espi_ebi.id;")
+
+    create_espi_ebi_indexes()
+    for sql in KEYS_TRIGGER_SQL:
+        op.execute(sql)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER espi_ebi_keys_sync ON espi_ebi;")
+    op.execute("DROP FUNCTION espi_ebi_keys_sync();")
+
+    op.execute("ALTER SEQUENCE espi_ebi_id_seq OWNED BY NONE;")
+    op.rename_table("espi_ebi", "espi_ebi_partitioned")
+    for index in INDEX_NAMES:
+        op.drop_index(index, table_name="espi_ebi_partitioned")
+    op.drop_constraint("espi_ebi_pkey", "espi_ebi_partitioned")
+
+    op.create_table(
+        "espi_ebi",
+        *espi_ebi_columns(),
+        sa.PrimaryKeyConstraint("id", name=op.f("espi_ebi_pkey")),
+        sa.UniqueConstraint("source", name=op.f("espi_ebi_source_key")),
+        sa.UniqueConstraint("pap_node_id", name=op.f("espi_ebi_pap_node_id_key")),
+    )
+    op.execute(f"INSERT INTO espi_ebi ({COLUMNS}) SELECT {COLUMNS} FROM espi_ebi_partitioned;")  # noqa: S608
+    # drops the partitions with it
+    op.drop_table("espi_ebi_partitioned")
+    op.execute("ALTER SEQUENCE espi_ebi_id_seq OWNED BY espi_ebi.id;")
+    create_espi_ebi_indexes()
+
+    repoint_webhook_foreign_keys("espi_ebi")
+    op.drop_index(op.f("ix_espi_ebi_keys_date"), table_name="espi_ebi_keys")
+    op.drop_table("espi_ebi_keys")
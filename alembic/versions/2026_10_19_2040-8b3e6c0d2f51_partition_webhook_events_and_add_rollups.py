@@ -0,0 +1,183 @@
+"""Partition webhook events and add rollups
+
+Revision ID: 8b3e6c0d2f51
+Revises: e2f85b1a7c39
+Create Date: 2026-10-19 20:40:12.508311
+
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import ENUM
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b3e6c0d2f51"
+down_revision: str | None = "e2f85b1a7c39"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+PARTITIONS_AHEAD_DAYS = 7
+# same as `settings.WEBHOOK_RESPONSE_TEXT_MAX_BYTES` at the time of this migration
+RESPONSE_TEXT_MAX_BYTES = 2048
+
+COLUMNS = "id, type, webhook_id, http_code, espi_ebi_id, meta, created_at, updated_at"
+
+INDEX_COLUMNS = {
+    "ix_webhook_events_created_at": "created_at",
+    "ix_webhook_events_id": "id",
+    "ix_webhook_events_updated_at": "updated_at",
+    "ix_webhook_events_espi_ebi_id": "espi_ebi_id",
+    "ix_webhook_events_webhook_id": "webhook_id",
+}
+
+
+def webhook_events_columns() -> list[sa.SchemaItem]:
+    return [
+        sa.Column("id", sa.Integer(), server_default=sa.text("nextval('webhook_events_id_seq')"), nullable=False),
+        sa.Column("type", ENUM(name="webhookeventtype", create_type=False), nullable=False),
+        sa.Column("webhook_id", sa.Integer(), nullable=False),
+        sa.Column("http_code", sa.Integer(), nullable=True),
+        sa.Column("espi_ebi_id", sa.Integer(), nullable=False),
+        sa.Column("meta", postgresql.JSONB(none_as_null=True, astext_type=sa.Text()), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["espi_ebi_id"],
+            ["espi_ebi_keys.id"],
+            name=op.f("webhook_events_espi_ebi_id_fkey"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["webhook_id"],
+            ["webhook_endpoints.id"],
+            name=op.f("webhook_events_webhook_id_fkey"),
+        ),
+    ]
+
+
+def create_webhook_events_indexes() -> None:
+    for index, column in INDEX_COLUMNS.items():
+        op.create_index(op.f(index), "webhook_events", [column], unique=False)
+
+
+def move_webhook_events(table: str) -> None:
+    """
+    Renames `webhook_events` to `table` so a new one can be created, its id sequence is kept
+    """
+    op.execute("ALTER SEQUENCE webhook_events_id_seq OWNED BY NONE;")
+    op.rename_table("webhook_events", table)
+    for index in INDEX_COLUMNS:
+        op.drop_index(op.f(index), table_name=table)
+    op.drop_constraint(op.f("webhook_events_pkey"), table)
+
+
+def upgrade() -> None:
+    move_webhook_events("webhook_events_unpartitioned")
+    # cut at the last character that starts within the byte limit, utf-8 continuation bytes are 10xxxxxx
+    op.execute(
+        f"""
+UPDATE webhook_events_unpartitioned AS e
+SET meta = e.meta || jsonb_build_object(
+    'response_text', convert_from(substring(t.bytes FROM 1 FOR t.cut), 'UTF8'),
+    'response_text_truncated', true
+)
+FROM (
+    SELECT
+        id,
+        bytes,
+        (
+            SELECT max(k)
+            FROM generate_series({RESPONSE_TEXT_MAX_BYTES} - 3, {RESPONSE_TEXT_MAX_BYTES}) AS k
+            WHERE get_byte(bytes, k) & 192 != 128
+        ) AS cut
+    FROM (
+        SELECT id, convert_to(meta->>'response_text', 'UTF8') AS bytes
+        FROM webhook_events_unpartitioned
+        WHERE octet_length(meta->>'response_text') > {RESPONSE_TEXT_MAX_BYTES}
+    ) AS long_texts
+) AS t
+WHERE e.id = t.id;
+"""  # noqa: S608
+    )
+
+    op.create_table(
+        "webhook_events",
+        *webhook_events_columns(),
+        sa.Column("latency_ms", sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint("id", "created_at", name=op.f("webhook_events_pkey")),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    # older events go to the default partition and are deleted from it once past retention
+    today = datetime.now(UTC).date()
+    for i in range(PARTITIONS_AHEAD_DAYS + 1):
+        day = today + timedelta(days=i)
+        op.execute(
+            f"CREATE TABLE webhook_events_y{day.year}m{day.month:02d}d{day.day:02d} PARTITION OF webhook_events"
+            f" FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') TO ('{day + timedelta(days=1)} 00:00:00+00');"
+        )
+    op.execute("CREATE TABLE webhook_events_default PARTITION OF webhook_events DEFAULT;")
+
+    op.execute(f"INSERT INTO webhook_events ({COLUMNS}) SELECT {COLUMNS} FROM webhook_events_unpartitioned;")  # noqa: S608
+    op.drop_table("webhook_events_unpartitioned")
+    op.execute("ALTER SEQUENCE webhook_events_id_seq OWNED BY webhook_events.id;")
+    create_webhook_events_indexes()
+
+    op.create_table(
+        "webhook_event_daily_rollups",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("webhook_id", sa.Integer(), nullable=False),
+        sa.Column("success_count", sa.Integer(), nullable=False),
+        sa.Column("failure_count", sa.Integer(), nullable=False),
+        sa.Column("latency_p50_ms", sa.Float(), nullable=True),
+        sa.Column("latency_p95_ms", sa.Float(), nullable=True),
+        sa.Column("latency_p99_ms", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["webhook_id"],
+            ["webhook_endpoints.id"],
+            name=op.f("webhook_event_daily_rollups_webhook_id_fkey"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("day", "webhook_id", name=op.f("webhook_event_daily_rollups_pkey")),
+    )
+    op.create_index(
+        "ix_webhook_event_daily_rollups_webhook_id_day",
+        "webhook_event_daily_rollups",
+        ["webhook_id", "day"],
+        unique=False,
+    )
+    # existing events have no latency
+    op.execute(
+        """
+INSERT INTO webhook_event_daily_rollups (day, webhook_id, success_count, failure_count, updated_at)
+SELECT
+    (created_at AT TIME ZONE 'UTC')::date,
+    webhook_id,
+    count(*) FILTER (WHERE type = 'delivery_success'),
+    count(*) FILTER (WHERE type != 'delivery_success'),
+    now()
+FROM webhook_events
+GROUP BY 1, 2;
+"""
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_webhook_event_daily_rollups_webhook_id_day", table_name="webhook_event_daily_rollups")
+    op.drop_table("webhook_event_daily_rollups")
+
+    move_webhook_events("webhook_events_partitioned")
+    op.create_table(
+        "webhook_events",
+        *webhook_events_columns(),
+        sa.PrimaryKeyConstraint("id", name=op.f("webhook_events_pkey")),
+    )
+    op.execute(f"INSERT INTO webhook_events ({COLUMNS}) SELECT {COLUMNS} FROM webhook_events_partitioned;")  # noqa: S608
+    # drops the partitions with it
+    op.drop_table("webhook_events_partitioned")
+    op.execute("ALTER SEQUENCE webhook_events_id_seq OWNED BY webhook_events.id;")
+    create_webhook_events_indexes()
@@ -0,0 +1,116 @@
+# Compares recent entries queries on a synthetic multi-year espi_ebi, unpartitioned and partitioned by month
+# PYTHONPATH=. python benchmarks/espi_ebi_partitions.py --years 5 --per-day 400 -n 50
+#
+# Tables are created in the `DB_URL` database as `bench_espi_ebi_plain` and `bench_espi_ebi_partitioned`
+# and dropped afterwards
+
+import argparse
+import asyncio
+import time
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from gpw_scraper.config import settings
+from gpw_scraper.services.espi_ebi import month_partitions
+
+COLUMNS = """
+    id integer NOT NULL,
+    type text NOT NULL,
+    title text NOT NULL,
+    company text NOT NULL,
+    source text NOT NULL,
+    date timestamp NOT NULL
+"""
+
+ROWS_SQL = """
+INSERT INTO {table} (id, type, title, company, source, date)
+SELECT
+    i,
+    CASE WHEN i % 3 = 0 THEN 'EBI' ELSE 'ESPI' END,
+    'Raport bieżący nr ' || i,
+    'SPÓŁKA ' || (i % 800) || ' S.A.',
+    'https://espiebi.pap.pl/node/' || i,
+    :start + (i * (:seconds / :rows)) * interval '1 second'
+FROM generate_series(1, :rows) AS i
+"""
+
+QUERIES = {
+    "last page": "SELECT * FROM {table} ORDER BY date DESC, id DESC LIMIT 20",
+    "last 7 days": "SELECT * FROM {table} WHERE date >= :recent ORDER BY date DESC, id DESC LIMIT 20",
+    "last 7 days ebi": (
+        "SELECT * FROM {table} WHERE type = 'EBI' AND date >= :recent ORDER BY date DESC, id DESC LIMIT 20"
+    ),
+    "count last 30 days": "SELECT count(*) FROM {table} WHERE date >= :month_ago",
+}
+
+
+async def create_tables(conn: AsyncConnection, start: date, end: date, rows: int):
+    await conn.execute(text(f"CREATE TABLE bench_espi_ebi_plain ({COLUMNS}, PRIMARY KEY (id))"))
+    await conn.execute(
+        text(f"CREATE TABLE bench_espi_ebi_partitioned ({COLUMNS}, PRIMARY KEY (id, date)) PARTITION BY RANGE (date)")
+    )
+    for partition in month_partitions(start, end):
+        await conn.execute(
+            text(
+                f"CREATE TABLE bench_{partition.name} PARTITION OF bench_espi_ebi_partitioned"
+                f" FOR VALUES FROM ('{partition.start.isoformat()}') TO ('{partition.end.isoformat()}')"
+            )
+        )
+
+    params = {"start": start, "seconds": int((end - start).total_seconds()), "rows": rows}
+    for table in ("bench_espi_ebi_plain", "bench_espi_ebi_partitioned"):
+        await conn.execute(text(ROWS_SQL.format(table=table)), params)
+        await conn.execute(text(f"CREATE INDEX ON {table} (date, id)"))
+        await conn.execute(text(f"CREATE INDEX ON {table} (type, date)"))
+        await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def bench(conn: AsyncConnection, end: date, number: int):
+    params = {"recent": end - timedelta(days=7), "month_ago": end - timedelta(days=30)}
+    for name, query in QUERIES.items():
+        results = []
+        for table in ("bench_espi_ebi_plain", "bench_espi_ebi_partitioned"):
+            stmt = text(query.format(table=table)).bindparams(
+                **{key: value for key, value in params.items() if f":{key}" in query}
+            )
+            await conn.execute(stmt)  # warm up
+
+            started = time.perf_counter()
+            for _ in range(number):
+                (await conn.execute(stmt)).all()
+            results.append((time.perf_counter() - started) / number * 1e3)
+
+        plain, partitioned = results
+        print(f"{name:<20} plain {plain:>8.3f} ms  partitioned {partitioned:>8.3f} ms  ({plain / partitioned:.2f}x)")
+
+
+async def main(years: int, per_day: int, number: int):
+    end = datetime.now(UTC).date()
+    start = end - timedelta(days=365 * years)
+    rows = 365 * years * per_day
+
+    engine = create_async_engine(settings.DB_URL)
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS bench_espi_ebi_plain, bench_espi_ebi_partitioned"))
+        print(f"Inserting {rows} rows per table, {start} - {end}")
+        await create_tables(conn, start, end, rows)
+
+    try:
+        async with engine.connect() as conn:
+            await bench(conn, end, number)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP TABLE bench_espi_ebi_plain, bench_espi_ebi_partitioned"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--per-day", type=int, default=400)
+    parser.add_argument("-n", "--number", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.years, args.per_day, args.number))
@@ -0,0 +1,53 @@
+# Compares arq job payloads serialized with pickle (arq default) and with `gpw_scraper.worker.job_serializer`
+# PYTHONPATH=. python benchmarks/job_serializer.py -n 10000
+
+import argparse
+import pickle
+import timeit
+from datetime import UTC, datetime
+from typing import Any
+
+from gpw_scraper.models.espi_ebi import EntryType, EspiEbi
+from gpw_scraper.models.webhook import WebhookEndpoint
+from gpw_scraper.worker import job_deserializer, job_serializer
+
+
+def send_webhook_job(*args: Any) -> dict[str, Any]:
+    return {"t": 1, "f": "send_webhook", "a": args, "k": {}, "et": 1721606400000}
+
+
+def bench(name: str, job: dict[str, Any], dumps, loads, number: int):
+    raw = dumps(job)
+    dumps_time = timeit.timeit(lambda: dumps(job), number=number)
+    loads_time = timeit.timeit(lambda: loads(raw), number=number)
+    print(
+        f"{name:<20} {len(raw):>6} B"
+        f"  dumps {dumps_time / number * 1e6:>8.2f} us"
+        f"  loads {loads_time / number * 1e6:>8.2f} us"
+    )
+
+
+def main(number: int):
+    espi_ebi = EspiEbi(
+        id=1,
+        type=EntryType.ESPI,
+        title="SPÓŁKA S.A. (1/2024) Zawarcie istotnej umowy",
+        description="Zarząd Spółki informuje o zawarciu istotnej umowy. " * 40,
+        company="SPÓŁKA S.A.",
+        source="https://biznes.pap.pl/node/123456",
+        parsed_by_llm="Spółka zawarła istotną umowę.",
+        date=datetime(2024, 7, 22, 8, 30, tzinfo=UTC),
+    )
+    endpoint = WebhookEndpoint(id=1, url="https://example.com/webhook", secret="secret", user_id=1)
+
+    # what was enqueued before jobs took ids
+    bench("pickle (orm objects)", send_webhook_job(espi_ebi, endpoint), pickle.dumps, pickle.loads, number)
+    bench("pickle (ids)", send_webhook_job(1, 1), pickle.dumps, pickle.loads, number)
+    bench("json (ids)", send_webhook_job(1, 1), job_serializer, job_deserializer, number)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=10_000)
+    args = parser.parse_args()
+    main(args.number)
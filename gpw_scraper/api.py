@@ -4,6 +4,8 @@ from typing import TypedDict
 
 from fastapi import FastAPI
 
+from gpw_scraper.routers.backfill import router as backfill_router
+from gpw_scraper.routers.companies import router as companies_router
 from gpw_scraper.routers.espi_ebi import router as espi_ebi_router
 from gpw_scraper.routers.webhook import router as webhook_router
 
@@ -25,5 +27,7 @@ def create_app() -> FastAPI:
 
     app.include_router(espi_ebi_router, prefix="/api/v1")
     app.include_router(webhook_router, prefix="/api/v1")
+    app.include_router(backfill_router, prefix="/api/v1")
+    app.include_router(companies_router, prefix="/api/v1")
 
     return app
@@ -0,0 +1,31 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from gpw_scraper.services.company import SQLACompanyService, company_key
+
+
+class CompanyResolver:
+    """
+    Company ids of scraped issuer names, kept in process so only names not seen yet go to the db
+    """
+
+    _sessionmaker: async_sessionmaker[AsyncSession]
+    _max_size: int
+    _cache: dict[str, int]
+
+    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession], *, max_size: int = 10_000) -> None:
+        self._sessionmaker = sessionmaker
+        self._max_size = max_size
+        self._cache = {}
+
+    async def resolve(self, name: str) -> int:
+        key = company_key(name)
+        if (company_id := self._cache.get(key)) is not None:
+            return company_id
+
+        async with self._sessionmaker() as session:
+            company = await SQLACompanyService(session).get_or_create_by_name(name)
+
+        if len(self._cache) >= self._max_size:
+            self._cache.clear()
+        self._cache[key] = company.id
+        return company.id
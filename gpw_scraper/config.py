@@ -53,6 +53,60 @@ class Settings(BaseSettings):
     SEND_WEBHOOK_TASKS_ENABLED: bool = True
     LOG_LEVEL: str = "DEBUG"
 
+    # scrape cadence, windows are "HH:MM-HH:MM" on weekdays in Warsaw time
+    SCRAPE_PEAK_WINDOWS: list[str] = ["07:55-08:30", "16:55-17:45"]
+    SCRAPE_PEAK_INTERVAL: float = 60.0
+    SCRAPE_INTERVAL_MIN: float = 90.0
+    SCRAPE_INTERVAL_MAX: float = 30 * 60
+    SCRAPE_TARGET_ITEMS_PER_RUN: float = 4.0
+    SCRAPE_ARRIVAL_RATE_DAYS: int = 28
+    SCRAPE_LOCK_LEASE_SECONDS: float = 60.0
+    SCRAPE_LOCK_MAX_RERUNS: int = 1
+    SCRAPE_FAILURE_RETRY_SECONDS: float = 60.0
+
+    PAP_FETCH_STRATEGIES: list[Literal["direct", "proxy"]] = ["direct", "proxy"]
+    PAP_FETCH_BLOCK_COOLDOWN: int = 10 * 60
+    PAP_HTTP_LIMIT: int = 20
+    PAP_HTTP_LIMIT_PER_HOST: int = 10
+    PAP_HTTP_KEEPALIVE_TIMEOUT: float = 60
+    PAP_HTTP_DNS_TTL: int = 5 * 60
+    PAP_HTTP_CONNECT_TIMEOUT: float = 10
+    PAP_HTTP_READ_TIMEOUT: float = 30
+    PAP_HTTP_TOTAL_TIMEOUT: float = 60
+    PAP_MAX_PAGE_BYTES: int = 5 * 1024 * 1024
+    PAP_LISTING_VARIANT_TTL: int = 6 * 60 * 60
+    PAP_LISTING_PREFETCH_DEPTH: int = 1
+    PAP_LISTING_CACHE_TTL: int = 7 * 24 * 60 * 60
+    PAP_LISTING_CACHE_PAST_DAY_MAX_AGE: int = 24 * 60 * 60
+
+    SCRAPE_SHARD_HEAVY_DAY_STRIDE: int = 2
+    SCRAPE_SHARD_ITEMS_PER_JOB: int = 10
+
+    BACKFILL_QUEUE_NAME: str = "arq:queue:backfill"
+    BACKFILL_PARALLELISM: int = 2
+    BACKFILL_UNIT_LEASE_SECONDS: float = 30 * 60
+    BACKFILL_UNIT_MAX_ATTEMPTS: int = 3
+    BACKFILL_YIELD_SECONDS: float = 60.0
+
+    API_COUNT_CACHE_TTL: float = 60.0
+    API_RESPONSE_CACHE_TTL: int = 30
+
+    COMPANY_RESOLVER_CACHE_SIZE: int = 10_000
+
+    ESPI_EBI_PARTITIONS_AHEAD_MONTHS: int = 3
+
+    WEBHOOK_MAX_TRIES: int = 5
+    WEBHOOK_BACKOFF_BASE: float = 5.0
+    WEBHOOK_BACKOFF_MAX: float = 900.0
+    WEBHOOK_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    WEBHOOK_CIRCUIT_OPEN_SECONDS: float = 300.0
+    WEBHOOK_MAX_IN_FLIGHT_PER_ENDPOINT: int = 2
+    WEBHOOK_IN_FLIGHT_TTL: float = 60 * 60
+    WEBHOOK_SCHEDULER_BATCH_SIZE: int = 100
+    WEBHOOK_RESPONSE_TEXT_MAX_BYTES: int = 2048  # of failed responses, stored in `WebhookEvent.meta`
+    WEBHOOK_EVENTS_RETENTION_DAYS: int = 30  # at least 2, yesterday is rolled up before it's dropped
+    WEBHOOK_EVENTS_PARTITIONS_AHEAD_DAYS: int = 7
+
     OPENROUTER_BASE_URL: str = "https://openrouter.ai"
     OPENROUTER_URL_PATH: str = "/api/v1/chat/completions"
     OPENROUTER_API_KEY: str
@@ -108,6 +162,8 @@ class Settings(BaseSettings):
     REDIS_PASSWORD: str | None = None
     REDIS_PORT: int
 
+    ARQ_JOB_SERIALIZER: Literal["json", "pickle"] = "json"
+
     @computed_field
     @property
     def DB_URL(self) -> str:  # noqa: N802
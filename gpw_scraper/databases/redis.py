@@ -0,0 +1,10 @@
+import redis.asyncio as redis
+
+from gpw_scraper.config import settings
+
+redis_client = redis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    password=settings.REDIS_PASSWORD,
+    decode_responses=True,
+)
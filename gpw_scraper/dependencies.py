@@ -1,12 +1,19 @@
 from typing import Annotated
 
+import redis.asyncio as redis
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from gpw_scraper import response_cache, webhook_delivery
+from gpw_scraper.config import settings
 from gpw_scraper.databases.db import sessionmaker as db_sessionmaker
+from gpw_scraper.databases.redis import redis_client
+from gpw_scraper.services.backfill import SQLABackfillService
+from gpw_scraper.services.company import SQLACompanyService
 from gpw_scraper.services.espi_ebi import SQLAEspiEbiService
 from gpw_scraper.services.webhook import (
     SQLAWebhookEndpointService,
+    SQLAWebhookEventDailyRollupService,
     SQLAWebhookUserService,
 )
 
@@ -25,6 +32,13 @@ async def get_db_session():
 DbSession = Annotated[AsyncSession, Depends(get_db_session)]
 
 
+async def get_redis() -> redis.Redis:  # noqa: RUF029
+    return redis_client
+
+
+Redis = Annotated[redis.Redis, Depends(get_redis)]
+
+
 async def get_espi_ebi_service(db: DbSession) -> SQLAEspiEbiService:  # noqa: RUF029
     return SQLAEspiEbiService(db)
 
@@ -32,6 +46,20 @@ async def get_espi_ebi_service(db: DbSession) -> SQLAEspiEbiService:  # noqa: RU
 EspiEbiService = Annotated[SQLAEspiEbiService, Depends(get_espi_ebi_service)]
 
 
+async def get_company_service(db: DbSession) -> SQLACompanyService:  # noqa: RUF029
+    return SQLACompanyService(db)
+
+
+CompanyService = Annotated[SQLACompanyService, Depends(get_company_service)]
+
+
+async def get_backfill_service(db: DbSession) -> SQLABackfillService:  # noqa: RUF029
+    return SQLABackfillService(db)
+
+
+BackfillService = Annotated[SQLABackfillService, Depends(get_backfill_service)]
+
+
 async def get_webhook_user_service(db: DbSession) -> SQLAWebhookUserService:  # noqa: RUF029
     return SQLAWebhookUserService(db)
 
@@ -44,3 +72,34 @@ async def get_webhook_endpoint_service(db: DbSession) -> SQLAWebhookEndpointServ
 
 
 WebhookEndpointService = Annotated[SQLAWebhookEndpointService, Depends(get_webhook_endpoint_service)]
+
+
+async def get_webhook_event_daily_rollup_service(db: DbSession) -> SQLAWebhookEventDailyRollupService:  # noqa: RUF029
+    return SQLAWebhookEventDailyRollupService(db)
+
+
+WebhookEventDailyRollupService = Annotated[
+    SQLAWebhookEventDailyRollupService,
+    Depends(get_webhook_event_daily_rollup_service),
+]
+
+
+async def get_webhook_delivery_scheduler(redis_: Redis) -> webhook_delivery.WebhookDeliveryScheduler:  # noqa: RUF029
+    return webhook_delivery.WebhookDeliveryScheduler(
+        redis_,
+        max_in_flight_per_endpoint=settings.WEBHOOK_MAX_IN_FLIGHT_PER_ENDPOINT,
+        in_flight_ttl=settings.WEBHOOK_IN_FLIGHT_TTL,
+    )
+
+
+WebhookDeliveryScheduler = Annotated[
+    webhook_delivery.WebhookDeliveryScheduler,
+    Depends(get_webhook_delivery_scheduler),
+]
+
+
+async def get_response_cache(redis_: Redis) -> response_cache.ResponseCache:  # noqa: RUF029
+    return response_cache.ResponseCache(redis_, ttl=settings.API_RESPONSE_CACHE_TTL)
+
+
+ResponseCache = Annotated[response_cache.ResponseCache, Depends(get_response_cache)]
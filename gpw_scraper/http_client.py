@@ -0,0 +1,83 @@
+import importlib.util
+from types import SimpleNamespace
+from typing import NamedTuple
+
+import aiohttp
+
+# optional, both come with `aiohttp[speedups]`
+HAS_AIODNS = importlib.util.find_spec("aiodns") is not None
+HAS_BROTLI = importlib.util.find_spec("brotli") is not None or importlib.util.find_spec("brotlicffi") is not None
+
+
+class ConnectionStats(NamedTuple):
+    created: int = 0
+    reused: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+
+    @property
+    def reuse_rate(self) -> float:
+        total = self.created + self.reused
+        return self.reused / total if total > 0 else 0.0
+
+
+class ConnectionTracer:
+    """
+    Counts new and reused connections of sessions created with it, see `create_session`
+    """
+
+    trace_config: aiohttp.TraceConfig
+    _stats: ConnectionStats
+
+    def __init__(self) -> None:
+        self._stats = ConnectionStats()
+        self.trace_config = aiohttp.TraceConfig()
+        self.trace_config.on_connection_create_end.append(self._count("created"))
+        self.trace_config.on_connection_reuseconn.append(self._count("reused"))
+        self.trace_config.on_dns_cache_hit.append(self._count("dns_cache_hits"))
+        self.trace_config.on_dns_cache_miss.append(self._count("dns_cache_misses"))
+
+    def _count(self, field: str):
+        async def on_signal(session: aiohttp.ClientSession, ctx: SimpleNamespace, params: object) -> None:  # noqa: RUF029
+            self._stats = self._stats._replace(**{field: getattr(self._stats, field) + 1})
+
+        return on_signal
+
+    def pop_stats(self) -> ConnectionStats:
+        """
+        Stats since the last call
+        """
+        stats, self._stats = self._stats, ConnectionStats()
+        return stats
+
+
+def create_session(
+    base_url: str,
+    *,
+    limit: int,
+    limit_per_host: int,
+    keepalive_timeout: float,
+    dns_ttl: int,
+    connect_timeout: float,
+    read_timeout: float,
+    total_timeout: float,
+    tracer: ConnectionTracer | None = None,
+) -> aiohttp.ClientSession:
+    """
+    Client session with bounded connection pool, kept alive connections, cached dns and timeouts on every step
+    so a hung server can't hold a job until its timeout. Uses aiodns and brotli if they are installed.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=dns_ttl,
+        resolver=aiohttp.AsyncResolver() if HAS_AIODNS else None,
+    )
+    return aiohttp.ClientSession(
+        base_url=base_url,
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=total_timeout, sock_connect=connect_timeout, sock_read=read_timeout),
+        headers={"Accept-Encoding": "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"},
+        trace_configs=None if tracer is None else [tracer.trace_config],
+    )
@@ -0,0 +1,46 @@
+import enum
+from datetime import date, datetime
+
+from sqlalchemy import TIMESTAMP, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from gpw_scraper.models.base import BaseModel
+from gpw_scraper.models.mixins import TimestampMixin
+
+
+class BackfillStatus(enum.StrEnum):
+    pending = "pending"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+class Backfill(BaseModel, TimestampMixin):
+    __tablename__ = "backfills"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True, autoincrement=True)
+    date_start: Mapped[date] = mapped_column()
+    date_end: Mapped[date] = mapped_column()
+    status: Mapped[BackfillStatus] = mapped_column(default=BackfillStatus.pending, index=True)
+
+
+class BackfillUnit(BaseModel, TimestampMixin):
+    """
+    Single day of a backfill, `locked_until` is the lease of the worker running it,
+    units of crashed workers are picked up again once it passes
+    """
+
+    __tablename__ = "backfill_units"
+    __table_args__ = (
+        UniqueConstraint("backfill_id", "day"),
+        Index("ix_backfill_units_status_locked_until", "status", "locked_until"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True, autoincrement=True)
+    backfill_id: Mapped[int] = mapped_column(ForeignKey("backfills.id", ondelete="CASCADE"), index=True)
+    day: Mapped[date] = mapped_column()
+    status: Mapped[BackfillStatus] = mapped_column(default=BackfillStatus.pending)
+    attempts: Mapped[int] = mapped_column(default=0)
+    items_created: Mapped[int] = mapped_column(default=0)
+    locked_until: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), default=None)
+    error: Mapped[str | None] = mapped_column(default=None)
@@ -0,0 +1,40 @@
+from sqlalchemy import Index, String
+from sqlalchemy import func as sqla_func
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from gpw_scraper.models.base import BaseModel
+from gpw_scraper.models.mixins import TimestampMixin
+
+
+class Company(BaseModel, TimestampMixin):
+    """
+    Issuers of espi/ebi reports, `name` is the canonical one, `aliases` are keys (see `company_key`)
+    of every name the company was reported under
+    """
+
+    __tablename__ = "companies"
+    __table_args__ = (
+        # similarity search, requires pg_trgm
+        Index(
+            "ix_companies_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        # `aliases @> ARRAY[key]`
+        Index("ix_companies_aliases", "aliases", postgresql_using="gin"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(unique=True)
+    aliases: Mapped[list[str]] = mapped_column(ARRAY(String), default=list, server_default="{}")
+    ticker: Mapped[str | None] = mapped_column(unique=True, default=None)
+
+
+# prefix search, `lower(name) LIKE 'q%'`
+Index(
+    "ix_companies_name_lower_prefix",
+    sqla_func.lower(Company.name).label("name_lower"),
+    postgresql_ops={"name_lower": "text_pattern_ops"},
+)
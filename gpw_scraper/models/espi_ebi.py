@@ -2,12 +2,13 @@ import enum
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import TIMESTAMP, Computed, Index
+from sqlalchemy import DDL, TIMESTAMP, BigInteger, Computed, ForeignKey, Index, event
 from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
 from gpw_scraper import utils
 from gpw_scraper.models.base import BaseModel
+from gpw_scraper.models.mixins import TimestampMixin
 
 
 class EntryType(enum.StrEnum):
@@ -15,7 +16,34 @@ class EntryType(enum.StrEnum):
     EBI = "ebi"
 
 
+class ScrapeErrorKind(enum.StrEnum):
+    transient = "transient"  # connection errors, timeouts, 5xx
+    throttled = "throttled"  # 403/429, pap or the proxy is rate limiting
+    parse = "parse"  # page doesn't look like the parser expects
+    unsupported = "unsupported"  # not an ESPI/EBI report, or gone
+
+
+class EspiEbiKey(BaseModel):
+    """
+    Id, source and node id of every `EspiEbi`, kept by a trigger on `espi_ebi`.
+    Partitioned `espi_ebi` can only enforce uniqueness within a partition, this table does it globally
+    and is what other tables reference
+    """
+
+    __tablename__ = "espi_ebi_keys"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    date: Mapped[datetime] = mapped_column(index=True)
+    source: Mapped[str] = mapped_column(unique=True)
+    pap_node_id: Mapped[int | None] = mapped_column(BigInteger, unique=True)
+
+
 class EspiEbi(BaseModel):
+    """
+    Range partitioned by `date`, a partition per month, see `SQLAEspiEbiService.create_partitions`.
+    Rows outside of every monthly partition go to `espi_ebi_default`
+    """
+
     __tablename__ = "espi_ebi"
     __table_args__ = (
         Index(
@@ -23,16 +51,33 @@ class EspiEbi(BaseModel):
             "_tsvector",
             postgresql_using="gin",
         ),
+        # newest first listing and its keyset pagination
+        Index("ix_espi_ebi_date_id", "date", "id"),
+        # listing filtered by type, scanned backwards for newest first
+        Index("ix_espi_ebi_type_date", "type", "date"),
+        # `company ILIKE`, with leading `%` too, requires pg_trgm
+        Index(
+            "ix_espi_ebi_company_trgm",
+            "company",
+            postgresql_using="gin",
+            postgresql_ops={"company": "gin_trgm_ops"},
+        ),
+        # per company feed, newest first
+        Index("ix_espi_ebi_company_id_date", "company_id", "date"),
+        {"postgresql_partition_by": "RANGE (date)"},
     )
 
+    # primary key of a partitioned table has to include the partition key
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     type: Mapped[EntryType] = mapped_column()
     title: Mapped[str] = mapped_column()
     description: Mapped[str | None] = mapped_column()
-    company: Mapped[str] = mapped_column()
-    source: Mapped[str] = mapped_column(unique=True)
+    company: Mapped[str] = mapped_column()  # as reported
+    company_id: Mapped[int | None] = mapped_column(ForeignKey("companies.id", ondelete="SET NULL"), default=None)
+    source: Mapped[str] = mapped_column()  # unique, see `EspiEbiKey`
+    pap_node_id: Mapped[int | None] = mapped_column(BigInteger)  # `/node/<id>` of `source`, unique
     parsed_by_llm: Mapped[str | None] = mapped_column()
-    date: Mapped[datetime] = mapped_column()
+    date: Mapped[datetime] = mapped_column(primary_key=True)
     created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=utils.utc_now)
 
     _tsvector: Mapped[Any] = mapped_column(
@@ -48,3 +93,50 @@ setweight(to_tsvector('pl_ispell', company), 'D')
         deferred=True,
         deferred_raiseload=True,
     )
+
+
+ESPI_EBI_KEYS_TRIGGER_SQL = (
+    """
+CREATE OR REPLACE FUNCTION espi_ebi_keys_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO espi_ebi_keys (id, date, source, pap_node_id)
+        VALUES (NEW.id, NEW.date, NEW.source, NEW.pap_node_id);
+    ELSIF TG_OP = 'UPDATE' THEN
+        UPDATE espi_ebi_keys
+        SET id = NEW.id, date = NEW.date, source = NEW.source, pap_node_id = NEW.pap_node_id
+        WHERE id = OLD.id;
+    ELSE
+        DELETE FROM espi_ebi_keys WHERE id = OLD.id;
+    END IF;
+    RETURN NULL;
+END
+$$;
+""",
+    """
+CREATE TRIGGER espi_ebi_keys_sync
+AFTER INSERT OR UPDATE OF id, date, source, pap_node_id OR DELETE ON espi_ebi
+FOR EACH ROW EXECUTE FUNCTION espi_ebi_keys_sync();
+""",
+)
+ESPI_EBI_DEFAULT_PARTITION_SQL = "CREATE TABLE espi_ebi_default PARTITION OF espi_ebi DEFAULT;"
+
+# `create_all` only creates the parent table, migrations run the same sql
+for sql in (ESPI_EBI_DEFAULT_PARTITION_SQL, *ESPI_EBI_KEYS_TRIGGER_SQL):
+    event.listen(EspiEbi.__table__, "after_create", DDL(sql))
+
+
+class EspiEbiQuarantine(BaseModel, TimestampMixin):
+    """
+    Items that failed to parse, scrapes skip them until they are removed from here.
+    `source` is the page that failed, same format as `EspiEbi.source`
+    """
+
+    __tablename__ = "espi_ebi_quarantine"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True, autoincrement=True)
+    source: Mapped[str] = mapped_column(unique=True)
+    date: Mapped[datetime] = mapped_column(index=True)
+    error_kind: Mapped[ScrapeErrorKind] = mapped_column()
+    error: Mapped[str] = mapped_column()
+    attempts: Mapped[int] = mapped_column(default=1)
@@ -1,10 +1,12 @@
 import enum
+from datetime import date, datetime
 from typing import Any
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import DDL, TIMESTAMP, ForeignKey, Index, String, event
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
+from gpw_scraper import utils
 from gpw_scraper.models.base import BaseModel
 from gpw_scraper.models.mixins import TimestampMixin
 
@@ -33,11 +35,65 @@ class WebhookEventType(enum.StrEnum):
 
 
 class WebhookEvent(BaseModel, TimestampMixin):
+    """
+    Range partitioned by `created_at`, a partition per utc day, see `SQLAWebhookEventService`.
+    Old partitions are dropped after they are rolled up into `WebhookEventDailyRollup`
+    """
+
     __tablename__ = "webhook_events"
+    __table_args__ = ({"postgresql_partition_by": "RANGE (created_at)"},)
 
+    # primary key of a partitioned table has to include the partition key
     id: Mapped[int] = mapped_column(primary_key=True, index=True, autoincrement=True)
     type: Mapped[WebhookEventType] = mapped_column()
     webhook_id: Mapped[int] = mapped_column(ForeignKey("webhook_endpoints.id"), index=True)
     http_code: Mapped[int | None] = mapped_column(default=None)
-    espi_ebi_id: Mapped[int] = mapped_column(ForeignKey("espi_ebi.id"), index=True)
+    latency_ms: Mapped[float | None] = mapped_column(default=None)  # until the response body is read
+    espi_ebi_id: Mapped[int] = mapped_column(ForeignKey("espi_ebi_keys.id"), index=True)
     meta: Mapped[dict[str, Any] | None] = mapped_column(JSONB(none_as_null=True))
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        default=utils.utc_now,
+        primary_key=True,
+        index=True,
+    )
+
+
+WEBHOOK_EVENTS_DEFAULT_PARTITION_SQL = "CREATE TABLE webhook_events_default PARTITION OF webhook_events DEFAULT;"
+
+# `create_all` only creates the parent table, migrations run the same sql
+event.listen(WebhookEvent.__table__, "after_create", DDL(WEBHOOK_EVENTS_DEFAULT_PARTITION_SQL))
+
+
+class WebhookEventDailyRollup(BaseModel):
+    """
+    Delivery stats of an endpoint over a utc day, made from `webhook_events` so dashboards don't scan them
+    """
+
+    __tablename__ = "webhook_event_daily_rollups"
+    __table_args__ = (Index("ix_webhook_event_daily_rollups_webhook_id_day", "webhook_id", "day"),)
+
+    day: Mapped[date] = mapped_column(primary_key=True)
+    webhook_id: Mapped[int] = mapped_column(ForeignKey("webhook_endpoints.id", ondelete="CASCADE"), primary_key=True)
+    success_count: Mapped[int] = mapped_column(default=0)
+    failure_count: Mapped[int] = mapped_column(default=0)
+    latency_p50_ms: Mapped[float | None] = mapped_column(default=None)
+    latency_p95_ms: Mapped[float | None] = mapped_column(default=None)
+    latency_p99_ms: Mapped[float | None] = mapped_column(default=None)
+    updated_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=utils.utc_now)
+
+
+class WebhookDeadLetterReason(enum.StrEnum):
+    retries_exhausted = "retries_exhausted"
+    circuit_open = "circuit_open"
+
+
+class WebhookDeadLetter(BaseModel, TimestampMixin):
+    __tablename__ = "webhook_dead_letters"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True, autoincrement=True)
+    reason: Mapped[WebhookDeadLetterReason] = mapped_column()
+    webhook_id: Mapped[int] = mapped_column(ForeignKey("webhook_endpoints.id", ondelete="CASCADE"), index=True)
+    espi_ebi_id: Mapped[int] = mapped_column(ForeignKey("espi_ebi_keys.id"), index=True)
+    attempts: Mapped[int] = mapped_column(default=0)
+    replayed_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), default=None, index=True)
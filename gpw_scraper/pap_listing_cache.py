@@ -0,0 +1,115 @@
+import json
+from datetime import datetime, time, timedelta
+from typing import NamedTuple
+
+import redis.asyncio as redis
+
+from gpw_scraper import utils
+from gpw_scraper.scrape_cadence import WARSAW_TZ
+from gpw_scraper.scrapers.pap_fetch import FetchStrategy
+
+
+class CachedListingPage(NamedTuple):
+    hrefs: list[tuple[str, datetime]] | None  # parsed page, None if the listing ended before it
+    content_hash: str
+    fetched_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """
+        Conditional request headers, pap only answers with 304 if it sent the validators in the first place
+        """
+        headers: dict[str, str] = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PapListingPageCache:
+    """
+    Parsed listing pages with their http validators and content hash, so pages that didn't change
+    since the last run are neither downloaded (304) nor parsed (same hash).
+    Pages are kept per `FetchStrategy`, validators and hashes of one upstream don't apply to the other.
+
+    Pages of a day fetched after it ended are served without a request for `past_day_max_age` seconds,
+    the ones fetched earlier are always revalidated.
+    """
+
+    past_day_max_age: float
+    _redis: redis.Redis
+    _ttl: int
+    _key_prefix: str
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        *,
+        ttl: int,
+        past_day_max_age: float,
+        key_prefix: str = "pap:listing-page",
+    ) -> None:
+        self.past_day_max_age = past_day_max_age
+        self._redis = redis_client
+        self._ttl = ttl
+        self._key_prefix = key_prefix
+
+    def _key(self, date: datetime, date_params: tuple[str, str], page: int, strategy: FetchStrategy) -> str:
+        created, enddate = date_params
+        return f"{self._key_prefix}:{strategy}:{date.strftime('%Y-%m-%d')}:{created}:{enddate}:{page}"
+
+    def max_age(self, date: datetime, fetched_at: float) -> float:
+        """
+        Seconds a page of `date` fetched at `fetched_at` is used without revalidation,
+        pages fetched before the day ended (midnight in Warsaw) could still get new items
+        """
+        day_end = datetime.combine(date.date() + timedelta(days=1), time.min, tzinfo=WARSAW_TZ)
+        return self.past_day_max_age if fetched_at >= day_end.timestamp() else 0
+
+    def is_fresh(self, date: datetime, page: CachedListingPage) -> bool:
+        return utils.utc_now().timestamp() - page.fetched_at < self.max_age(date, page.fetched_at)
+
+    async def get(
+        self, date: datetime, date_params: tuple[str, str], page: int, strategy: FetchStrategy
+    ) -> CachedListingPage | None:
+        data = await self._redis.hgetall(self._key(date, date_params, page, strategy))  # type: ignore
+        if not data:
+            return None
+
+        hrefs = json.loads(data["hrefs"])
+        return CachedListingPage(
+            hrefs=None if hrefs is None else [(href, datetime.fromisoformat(date_)) for href, date_ in hrefs],
+            content_hash=data["content_hash"],
+            fetched_at=float(data["fetched_at"]),
+            etag=data.get("etag"),
+            last_modified=data.get("last_modified"),
+        )
+
+    async def set(
+        self,
+        date: datetime,
+        date_params: tuple[str, str],
+        page: int,
+        strategy: FetchStrategy,
+        cached: CachedListingPage,
+    ) -> None:
+        key = self._key(date, date_params, page, strategy)
+        hrefs = None if cached.hrefs is None else [[href, date_.isoformat()] for href, date_ in cached.hrefs]
+        mapping = {
+            "hrefs": json.dumps(hrefs),
+            "content_hash": cached.content_hash,
+            "fetched_at": cached.fetched_at,
+        }
+        if cached.etag is not None:
+            mapping["etag"] = cached.etag
+        if cached.last_modified is not None:
+            mapping["last_modified"] = cached.last_modified
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, self._ttl)
+            await pipe.execute()
@@ -0,0 +1,56 @@
+import enum
+from datetime import datetime
+
+import redis.asyncio as redis
+
+
+class ListingDateVariant(enum.StrEnum):
+    """
+    How `created`/`enddate` listing params are set for a date, pap doesn't always list a day under its own date
+    """
+
+    same = "same"  # created=date, enddate=date
+    shift_both = "shift_both"  # created=date+1, enddate=date+1
+    shift_end = "shift_end"  # created=date, enddate=date+1
+
+
+class PapListingVariantCache:
+    """
+    Remembers which `ListingDateVariant` lists a date so the scraper doesn't probe them on every run
+    """
+
+    _redis: redis.Redis
+    _ttl: int
+    _key_prefix: str
+
+    def __init__(self, redis_client: redis.Redis, *, ttl: int, key_prefix: str = "pap:listing-variant") -> None:
+        self._redis = redis_client
+        self._ttl = ttl
+        self._key_prefix = key_prefix
+
+    def _key(self, date: datetime) -> str:
+        return f"{self._key_prefix}:{date.strftime('%Y-%m-%d')}"
+
+    @property
+    def _usage_key(self) -> str:
+        return f"{self._key_prefix}:usage"
+
+    async def get(self, date: datetime) -> ListingDateVariant | None:
+        variant = await self._redis.get(self._key(date))
+        return None if variant is None else ListingDateVariant(variant)
+
+    async def set(self, date: datetime, variant: ListingDateVariant) -> None:
+        await self._redis.set(self._key(date), variant.value, ex=self._ttl)
+
+    async def record_usage(self, variant: ListingDateVariant, *, probed: bool) -> None:
+        """
+        `probed` - variant was found by probing, the remembered one was missing or stopped working
+        """
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hincrby(self._usage_key, variant.value, 1)
+            if probed:
+                pipe.hincrby(self._usage_key, "probed", 1)
+            await pipe.execute()
+
+    async def usage(self) -> dict[str, int]:
+        return {key: int(value) for key, value in (await self._redis.hgetall(self._usage_key)).items()}  # type: ignore
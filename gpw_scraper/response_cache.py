@@ -0,0 +1,92 @@
+import hashlib
+import json
+from collections.abc import Mapping
+from typing import Any, NamedTuple
+
+import redis.asyncio as redis
+
+# listing cache keys are versioned, the worker bumps the version whenever it saves new entries
+ESPI_EBI_ENDPOINT = "espi-ebi"
+
+
+class ResponseCacheStats(NamedTuple):
+    hits: int = 0
+    misses: int = 0
+    hit_seconds_total: float = 0.0
+    miss_seconds_total: float = 0.0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    @property
+    def hit_seconds_avg(self) -> float:
+        return self.hit_seconds_total / self.hits if self.hits > 0 else 0.0
+
+    @property
+    def miss_seconds_avg(self) -> float:
+        return self.miss_seconds_total / self.misses if self.misses > 0 else 0.0
+
+
+class ResponseCache:
+    """
+    Json responses of api endpoints, keyed by the endpoint and its params, kept for `ttl` seconds.
+
+    Endpoints whose data changes can key their responses with a version, see `version` and `bump_version`,
+    bumping it makes every cached response of the endpoint stale at once.
+    """
+
+    _redis: redis.Redis
+    _ttl: int
+    _key_prefix: str
+
+    def __init__(self, redis_client: redis.Redis, *, ttl: int, key_prefix: str = "api:cache") -> None:
+        self._redis = redis_client
+        self._ttl = ttl
+        self._key_prefix = key_prefix
+
+    def _key(self, endpoint: str, params: Mapping[str, Any], version: int | None = None) -> str:
+        digest = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        if version is None:
+            return f"{self._key_prefix}:{endpoint}:{digest}"
+        return f"{self._key_prefix}:{endpoint}:v{version}:{digest}"
+
+    async def get(self, endpoint: str, params: Mapping[str, Any]) -> Any | None:
+        value = await self._redis.get(self._key(endpoint, params))
+        return None if value is None else json.loads(value)
+
+    async def set(self, endpoint: str, params: Mapping[str, Any], value: Any) -> None:
+        await self._redis.set(self._key(endpoint, params), json.dumps(value), ex=self._ttl)
+
+    async def get_serialized(self, endpoint: str, params: Mapping[str, Any], *, version: int) -> str | None:
+        """
+        Response as it was serialized, returned without parsing it
+        """
+        return await self._redis.get(self._key(endpoint, params, version))
+
+    async def set_serialized(self, endpoint: str, params: Mapping[str, Any], value: str, *, version: int) -> None:
+        await self._redis.set(self._key(endpoint, params, version), value, ex=self._ttl)
+
+    async def version(self, endpoint: str) -> int:
+        value = await self._redis.get(f"{self._key_prefix}:{endpoint}:version")
+        return 0 if value is None else int(value)
+
+    async def bump_version(self, endpoint: str) -> int:
+        return await self._redis.incr(f"{self._key_prefix}:{endpoint}:version")
+
+    async def record(self, endpoint: str, *, hit: bool, seconds: float) -> None:
+        count_field, seconds_field = ("hits", "hit_seconds_total") if hit else ("misses", "miss_seconds_total")
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hincrby(f"{self._key_prefix}:stats", f"{endpoint}:{count_field}", 1)
+            pipe.hincrbyfloat(f"{self._key_prefix}:stats", f"{endpoint}:{seconds_field}", seconds)
+            await pipe.execute()
+
+    async def stats(self, endpoint: str) -> ResponseCacheStats:
+        data = await self._redis.hgetall(f"{self._key_prefix}:stats")  # type: ignore
+        return ResponseCacheStats(
+            hits=int(data.get(f"{endpoint}:hits", 0)),
+            misses=int(data.get(f"{endpoint}:misses", 0)),
+            hit_seconds_total=float(data.get(f"{endpoint}:hit_seconds_total", 0)),
+            miss_seconds_total=float(data.get(f"{endpoint}:miss_seconds_total", 0)),
+        )
@@ -0,0 +1,30 @@
+from fastapi import status
+from fastapi.exceptions import HTTPException
+from fastapi.routing import APIRouter
+
+from gpw_scraper import dependencies as deps
+from gpw_scraper.schemas.backfill import BackfillProgress
+
+router = APIRouter(prefix="/backfills", tags=["backfills"])
+
+
+@router.get(
+    "/{backfill_id}",
+    response_model=BackfillProgress,
+    responses={"404": {"description": "Not found"}},
+)
+async def get_backfill(backfill_id: int, backfill_service: deps.BackfillService):
+    backfill = await backfill_service.get_one_or_none(id=backfill_id)
+    if backfill is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    progress = await backfill_service.progress(backfill_id)
+
+    return {
+        "id": backfill.id,
+        "date_start": backfill.date_start,
+        "date_end": backfill.date_end,
+        "status": backfill.status,
+        "units": progress.units_by_status,
+        "items_created": progress.items_created,
+    }
@@ -0,0 +1,30 @@
+from typing import Annotated
+
+from fastapi import Query
+from fastapi.routing import APIRouter
+
+from gpw_scraper import dependencies as deps
+from gpw_scraper.schemas.company import CompanyItem
+
+router = APIRouter(prefix="/companies", tags=["companies"])
+
+
+@router.get("", response_model=list[CompanyItem])
+async def get_companies(
+    company_service: deps.CompanyService,
+    response_cache: deps.ResponseCache,
+    q: Annotated[
+        str,
+        Query(min_length=1, max_length=100, description="Start of a company name, or a word similar to one in it"),
+    ],
+    limit: Annotated[int, Query(gt=0, le=50)] = 10,
+):
+    params = {"q": q.strip().lower(), "limit": limit}
+    cached = await response_cache.get("companies", params)
+    if cached is not None:
+        return cached
+
+    companies = await company_service.search(q, limit)
+    items = [CompanyItem.model_validate(company).model_dump(mode="json") for company in companies]
+    await response_cache.set("companies", params, items)
+    return items
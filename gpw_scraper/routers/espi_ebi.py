@@ -1,24 +1,38 @@
+import time
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Any, Literal
 
-from fastapi import Depends, Query
+from fastapi import Depends, Query, status
+from fastapi.exceptions import HTTPException
+from fastapi.responses import Response
 from fastapi.routing import APIRouter
-from sqlalchemy import func, literal_column, select, text
+from sqlalchemy import Select, func, literal_column, select, text
 
 from gpw_scraper import dependencies as deps
+from gpw_scraper.config import settings
 from gpw_scraper.models.espi_ebi import EntryType, EspiEbi
+from gpw_scraper.response_cache import ESPI_EBI_ENDPOINT
 from gpw_scraper.schemas.espi_ebi import EspiEbiItem
-from gpw_scraper.schemas.pagination import PaginatedResponse, PaginationParams
-from gpw_scraper.services.sqlalchemy import OrderByBase
+from gpw_scraper.schemas.pagination import (
+    Cursor,
+    CursorPaginatedResponse,
+    PaginatedResponse,
+    PaginationParams,
+)
+from gpw_scraper.services.sqlalchemy import CountStrategy, OrderByBase
 
 RANK_WEIGHTS = literal_column("ARRAY[0.1, 0.2, 0.8, 1.0]")
 
 router = APIRouter()
 
 
-@router.get("/espi-ebi", response_model=PaginatedResponse[EspiEbiItem])
+@router.get(
+    "/espi-ebi",
+    response_model=PaginatedResponse[EspiEbiItem] | CursorPaginatedResponse[EspiEbiItem],
+)
 async def get_espi_ebi(
     espi_ebi_service: deps.EspiEbiService,
+    response_cache: deps.ResponseCache,
     pagination: Annotated[
         PaginationParams,
         Depends(),
@@ -33,6 +47,10 @@ async def get_espi_ebi(
             description="Filter by company; uses `ILIKE q`\n\n`%` allowed, e.g. `%orlen%`",
         ),
     ] = None,
+    company_id: Annotated[
+        int | None,
+        Query(alias="company-id", description="Filter by company id, see `/companies`"),
+    ] = None,
     date_start: Annotated[
         datetime | None,
         Query(
@@ -53,21 +71,77 @@ async def get_espi_ebi(
         str | None,
         Query(description="FTS"),
     ] = None,
+    paging: Annotated[
+        Literal["offset", "cursor"],
+        Query(
+            description="`cursor` - newest first, pages are followed with `nextCursor`/`prevCursor`,"
+            " `offset` is ignored and `fts` is not supported",
+        ),
+    ] = "offset",
+    cursor: Annotated[
+        str | None,
+        Query(description="`nextCursor` or `prevCursor` of a previous page, implies `paging=cursor`"),
+    ] = None,
+    count: Annotated[
+        CountStrategy | None,
+        Query(
+            description="How `total` is counted with offset paging: `exact` - counts every matching row,"
+            " `cached` - exact but reused for a while, `estimate` - query planner's estimate, `none` - not counted,"
+            " use `hasMore`\n\nDefaults to `estimate` without filters and `cached` with them",
+        ),
+    ] = None,
 ):
-    stmt = select(EspiEbi)
+    started = time.perf_counter()
+    use_cursor = paging == "cursor" or cursor is not None
+    if use_cursor and fts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="fts results are ordered by rank, use offset paging",
+        )
 
-    if espi_or_ebi:
-        stmt = stmt.where(EspiEbi.type == espi_or_ebi)
+    if count is None:
+        # planner's estimate is way off for narrow filters
+        filters = (espi_or_ebi, company, company_id, date_start, date_end, fts)
+        count = "estimate" if all(value is None for value in filters) else "cached"
 
-    if date_start:
-        stmt = stmt.where(EspiEbi.date >= date_start)
+    # `ILIKE` and fts ignore case, params the chosen paging ignores are left out
+    params: dict[str, Any] = {
+        "filter": espi_or_ebi,
+        "company": company.lower() if company else None,
+        "company_id": company_id,
+        "date_start": date_start,
+        "date_end": date_end,
+        "fts": fts.strip().lower() if fts else None,
+        "limit": pagination.limit,
+        **({"cursor": cursor} if use_cursor else {"offset": pagination.offset, "count": count}),
+    }
+    version = await response_cache.version(ESPI_EBI_ENDPOINT)
+    cached = await response_cache.get_serialized(ESPI_EBI_ENDPOINT, params, version=version)
+    if cached is not None:
+        await response_cache.record(ESPI_EBI_ENDPOINT, hit=True, seconds=time.perf_counter() - started)
+        return Response(content=cached, media_type="application/json", headers={"X-Cache": "HIT"})
 
-    if date_end:
-        stmt = stmt.where(EspiEbi.date <= date_end)
+    stmt = filter_espi_ebi(espi_or_ebi, company, date_start, date_end, company_id)
+    if use_cursor:
+        page = await get_espi_ebi_page(espi_ebi_service, stmt, pagination.limit, cursor)
+        content = CursorPaginatedResponse[EspiEbiItem].model_validate(page, from_attributes=True)
+    else:
+        page = await get_espi_ebi_offset_page(espi_ebi_service, stmt, pagination, fts, count)
+        content = PaginatedResponse[EspiEbiItem].model_validate(page, from_attributes=True)
+
+    serialized = content.model_dump_json(by_alias=True)
+    await response_cache.set_serialized(ESPI_EBI_ENDPOINT, params, serialized, version=version)
+    await response_cache.record(ESPI_EBI_ENDPOINT, hit=False, seconds=time.perf_counter() - started)
+    return Response(content=serialized, media_type="application/json", headers={"X-Cache": "MISS"})
 
-    if company:
-        stmt = stmt.where(EspiEbi.company.ilike(company))
 
+async def get_espi_ebi_offset_page(
+    espi_ebi_service: deps.EspiEbiService,
+    stmt: Select[tuple[EspiEbi]],
+    pagination: PaginationParams,
+    fts: str | None,
+    count: CountStrategy,
+):
     if fts:
         ts_fts = func.plainto_tsquery("pl_ispell", fts)
 
@@ -77,17 +151,86 @@ async def get_espi_ebi(
             .order_by(text("rank desc"))
         )
 
-    items, total = await espi_ebi_service.list_and_count(
+    page = await espi_ebi_service.list_page(
         statement=stmt,
+        count=count,
+        count_cache_ttl=settings.API_COUNT_CACHE_TTL,
         limit=pagination.limit,
         offset=pagination.offset,
         order_by=OrderByBase(field="date", order="desc"),
     )
 
     return {
-        "items": items,
-        "items_count": len(items),
-        "total": total,
+        "items": page.items,
+        "items_count": len(page.items),
+        "total": page.total,
+        "has_more": page.has_more,
         "limit": pagination.limit,
         "offset": pagination.offset,
     }
+
+
+def filter_espi_ebi(
+    espi_or_ebi: EntryType | None = None,
+    company: str | None = None,
+    date_start: datetime | None = None,
+    date_end: datetime | None = None,
+    company_id: int | None = None,
+) -> Select[tuple[EspiEbi]]:
+    """
+    Listing filters, each one has an index on `espi_ebi` that serves it ordered by `date`
+    """
+    stmt = select(EspiEbi)
+
+    if espi_or_ebi:
+        stmt = stmt.where(EspiEbi.type == espi_or_ebi)
+
+    if date_start:
+        stmt = stmt.where(EspiEbi.date >= date_start)
+
+    if date_end:
+        stmt = stmt.where(EspiEbi.date <= date_end)
+
+    if company:
+        stmt = stmt.where(EspiEbi.company.ilike(company))
+
+    if company_id is not None:
+        stmt = stmt.where(EspiEbi.company_id == company_id)
+
+    return stmt
+
+
+async def get_espi_ebi_page(
+    espi_ebi_service: deps.EspiEbiService,
+    stmt: Select[tuple[EspiEbi]],
+    limit: int,
+    cursor: str | None,
+):
+    keys = ("date", "id")
+    try:
+        position = None if cursor is None else Cursor.decode(cursor)
+        items, has_more = await espi_ebi_service.list_keyset(
+            stmt,
+            keys=keys,
+            order="desc",
+            limit=limit,
+            after=None if position is None or position.before else position.values,
+            before=None if position is None or not position.before else position.values,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+    backward = position is not None and position.before
+    has_next = has_more if not backward else position is not None
+    has_prev = has_more if backward else position is not None
+
+    def cursor_of(item: EspiEbi, *, before: bool) -> str:
+        return Cursor([getattr(item, key) for key in keys], before=before).encode()
+
+    return {
+        "items": items,
+        "items_count": len(items),
+        "limit": limit,
+        "next_cursor": cursor_of(items[-1], before=False) if items and has_next else None,
+        "prev_cursor": cursor_of(items[0], before=True) if items and has_prev else None,
+    }
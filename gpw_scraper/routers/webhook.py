@@ -1,13 +1,20 @@
 import secrets
+from datetime import date, timedelta
 from typing import Annotated
 
-from fastapi import Depends, status
+from fastapi import Depends, Query, status
 from fastapi.exceptions import HTTPException
 from fastapi.responses import Response
 from fastapi.routing import APIRouter
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from gpw_scraper.dependencies import WebhookEndpointService, WebhookUserService
+from gpw_scraper import utils
+from gpw_scraper.dependencies import (
+    WebhookDeliveryScheduler,
+    WebhookEndpointService,
+    WebhookEventDailyRollupService,
+    WebhookUserService,
+)
 from gpw_scraper.models import webhook as webhook_models
 from gpw_scraper.schemas import webhook as webhook_schemas
 
@@ -87,3 +94,56 @@ async def delete_webook_endpoint(
     await webhook_endpoint_service.delete(endpoint_id)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get(
+    "/endpoints/{endpoint_id}/queue",
+    response_model=webhook_schemas.WebhookEndpointQueueStats,
+    responses={
+        "401": {"description": "Unauthorized, expected bearer header"},
+        "403": {"description": "Forbidden"},
+    },
+)
+async def get_webhook_endpoint_queue(
+    endpoint_id: int,
+    user: WebhookUser,
+    webhook_endpoint_service: WebhookEndpointService,
+    scheduler: WebhookDeliveryScheduler,
+):
+    endpoint = await webhook_endpoint_service.get_one_or_none(id=endpoint_id)
+    if endpoint is None or endpoint.user_id != user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    stats = await scheduler.stats(endpoint_id)
+
+    return {"depth": stats.depth, "oldest_age_seconds": stats.oldest_age, "in_flight": stats.in_flight}
+
+
+@router.get(
+    "/endpoints/{endpoint_id}/stats",
+    response_model=list[webhook_schemas.WebhookEndpointDailyStats],
+    responses={
+        "401": {"description": "Unauthorized, expected bearer header"},
+        "403": {"description": "Forbidden"},
+    },
+)
+async def get_webhook_endpoint_stats(
+    endpoint_id: int,
+    *,
+    user: WebhookUser,
+    webhook_endpoint_service: WebhookEndpointService,
+    rollup_service: WebhookEventDailyRollupService,
+    date_start: Annotated[date | None, Query(alias="date-start")] = None,
+    date_end: Annotated[date | None, Query(alias="date-end")] = None,
+):
+    """
+    Daily delivery stats (utc days), last 30 days by default
+    """
+    endpoint = await webhook_endpoint_service.get_one_or_none(id=endpoint_id)
+    if endpoint is None or endpoint.user_id != user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    date_end = date_end or utils.utc_now().date()
+    date_start = date_start or date_end - timedelta(days=30)
+
+    return await rollup_service.list_for_endpoint(endpoint_id, date_start, date_end)
@@ -0,0 +1,20 @@
+from datetime import date
+
+from gpw_scraper.models.backfill import BackfillStatus
+from gpw_scraper.schemas.base import BaseSchema
+
+
+class BackfillUnitsProgress(BaseSchema):
+    pending: int
+    running: int
+    done: int
+    failed: int
+
+
+class BackfillProgress(BaseSchema):
+    id: int
+    date_start: date
+    date_end: date
+    status: BackfillStatus
+    units: BackfillUnitsProgress
+    items_created: int
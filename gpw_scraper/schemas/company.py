@@ -0,0 +1,7 @@
+from gpw_scraper.schemas.base import BaseSchema
+
+
+class CompanyItem(BaseSchema):
+    id: int
+    name: str
+    ticker: str | None
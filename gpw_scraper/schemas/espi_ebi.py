@@ -23,6 +23,7 @@ class EspiEbiItem(BaseSchema):
     title: str
     description: str | None
     company: str
+    company_id: int | None
     source: str
     parsed_by_llm: str | None
     date: datetime
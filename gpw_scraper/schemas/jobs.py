@@ -0,0 +1,81 @@
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Any, Self
+
+from pydantic import ConfigDict
+
+from gpw_scraper.schemas.base import BaseSchema
+from gpw_scraper.scrapers.pap import PapHrefItem
+
+
+class JobArgs(BaseSchema):
+    """
+    Arguments of an arq job, fields must be named and ordered like the job function parameters
+    """
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    @classmethod
+    def from_call(cls, args: Sequence[Any], kwargs: dict[str, Any]) -> Self:
+        return cls.model_validate({**dict(zip(cls.model_fields, args, strict=False)), **kwargs})
+
+
+class ScrapePapEspiEbiArgs(JobArgs):
+    date_start: datetime
+    date_end: datetime
+
+
+class ScrapePapEspiEbiShardedArgs(JobArgs):
+    date_start: datetime
+    date_end: datetime
+    dispatch_webhooks: bool = True
+
+
+class ScrapePapHrefsShardArgs(JobArgs):
+    run_id: str
+    day: date
+    page_start: int
+    page_stride: int
+
+
+class MergePapHrefsShardsArgs(JobArgs):
+    run_id: str
+
+
+class ScrapePapItemsChunkArgs(JobArgs):
+    hrefs: list[PapHrefItem]
+    dispatch_webhooks: bool = True
+
+
+class DispatchSendWebhookTasksArgs(JobArgs):
+    espi_ebi_entry_id: int
+
+
+class SendWebhookArgs(JobArgs):
+    espi_ebi_id: int
+    endpoint_id: int
+    delivery_id: str | None = None
+    attempt: int = 1
+    dry_run: bool = False
+
+
+class RequeueWebhookDeliveryArgs(JobArgs):
+    endpoint_id: int
+    user_id: int
+    espi_ebi_id: int
+    delivery_id: str
+    attempt: int
+
+
+class ReplayWebhookDeadLettersArgs(JobArgs):
+    endpoint_id: int | None = None
+    limit: int | None = None
+
+
+class StartBackfillArgs(JobArgs):
+    date_start: datetime
+    date_end: datetime
+
+
+class RunBackfillArgs(JobArgs):
+    backfill_id: int
@@ -1,5 +1,8 @@
-from typing import Generic, TypeVar
+import base64
+import binascii
+from typing import Any, Generic, NamedTuple, TypeVar
 
+import pydantic_core
 from pydantic import Field
 
 from gpw_scraper.schemas.base import BaseSchema
@@ -7,6 +10,32 @@ from gpw_scraper.schemas.base import BaseSchema
 ModelT = TypeVar("ModelT")
 
 
+class Cursor(NamedTuple):
+    """
+    Opaque position in a keyset paginated listing, key values of the item next to the page
+    """
+
+    values: list[Any]
+    before: bool = False  # page before `values`, otherwise after
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(pydantic_core.to_json([self.values, self.before])).decode("ascii")
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        try:
+            values, before = pydantic_core.from_json(base64.urlsafe_b64decode(value.encode("ascii")))
+        except (binascii.Error, ValueError, TypeError) as exc:
+            msg = "Invalid cursor"
+            raise ValueError(msg) from exc
+
+        if not isinstance(values, list) or not isinstance(before, bool):
+            msg = "Invalid cursor"
+            raise ValueError(msg)
+
+        return cls(values, before)
+
+
 class PaginationParams(BaseSchema):
     limit: int = Field(default=25, gt=0, le=100)
     offset: int = Field(0, ge=0)
@@ -15,6 +44,15 @@ class PaginationParams(BaseSchema):
 class PaginatedResponse(BaseSchema, Generic[ModelT]):
     items: list[ModelT]
     items_count: int
-    total: int
+    total: int | None  # exact, cached or estimated depending on the requested count, None if not counted
+    has_more: bool
     limit: int
     offset: int
+
+
+class CursorPaginatedResponse(BaseSchema, Generic[ModelT]):
+    items: list[ModelT]
+    items_count: int
+    limit: int
+    next_cursor: str | None
+    prev_cursor: str | None
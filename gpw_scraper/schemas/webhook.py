@@ -1,3 +1,5 @@
+from datetime import date
+
 from pydantic import HttpUrl
 
 from gpw_scraper.schemas.base import BaseSchema
@@ -11,3 +13,18 @@ class WebhhookEndpointCreateResponse(BaseSchema):
     id: int
     url: HttpUrl
     secret: str
+
+
+class WebhookEndpointQueueStats(BaseSchema):
+    depth: int
+    oldest_age_seconds: float | None
+    in_flight: int
+
+
+class WebhookEndpointDailyStats(BaseSchema):
+    day: date
+    success_count: int
+    failure_count: int
+    latency_p50_ms: float | None
+    latency_p95_ms: float | None
+    latency_p99_ms: float | None
@@ -0,0 +1,132 @@
+import json
+from collections.abc import Iterable
+from datetime import datetime, time, timedelta
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+import redis.asyncio as redis
+
+WARSAW_TZ = ZoneInfo("Europe/Warsaw")
+
+
+class ActivityWindow(NamedTuple):
+    start: time
+    end: time
+
+    @classmethod
+    def parse(cls, value: str) -> "ActivityWindow":
+        """
+        "HH:MM-HH:MM" in Warsaw time
+        """
+        start, end = value.split("-")
+        return cls(time.fromisoformat(start.strip()), time.fromisoformat(end.strip()))
+
+    def __contains__(self, value: object) -> bool:
+        return isinstance(value, time) and self.start <= value < self.end
+
+
+def hourly_arrival_rates(
+    counts: dict[tuple[bool, int], int],
+    since: datetime,
+    until: datetime,
+) -> dict[tuple[bool, int], float]:
+    """
+    Average number of entries per hour keyed by (is weekend, hour), from counts over `since`-`until`
+    """
+    days = [since.date() + timedelta(days=i) for i in range((until.date() - since.date()).days + 1)]
+    weekend_days = sum(day.isoweekday() >= 6 for day in days)  # noqa: PLR2004
+    days_count = {True: max(weekend_days, 1), False: max(len(days) - weekend_days, 1)}
+    return {(weekend, hour): count / days_count[weekend] for (weekend, hour), count in counts.items()}
+
+
+def scrape_interval(
+    now: datetime,
+    arrival_rates: dict[tuple[bool, int], float],
+    empty_runs: int,
+    *,
+    peak_windows: Iterable[ActivityWindow],
+    peak_interval: float,
+    min_interval: float,
+    max_interval: float,
+    target_items: float,
+) -> float:
+    """
+    Seconds until the next scrape.
+
+    Weekdays in `peak_windows` poll every `peak_interval`, otherwise the interval is the time it
+    takes for `target_items` entries to arrive at the hour's usual rate, doubled for every
+    consecutive run that found nothing new.
+    """
+    now = now.astimezone(WARSAW_TZ)
+    is_weekend = now.isoweekday() >= 6  # noqa: PLR2004
+    if not is_weekend and any(now.time() in window for window in peak_windows):
+        return peak_interval
+
+    rate = arrival_rates.get((is_weekend, now.hour), 0.0)
+    interval = max_interval if rate <= 0 else 60 * 60 * target_items / rate
+    interval *= 2 ** min(empty_runs, 16)
+    return min(max(interval, min_interval), max_interval)
+
+
+class ScrapeCadence:
+    """
+    Keeps the next scrape time in redis, the cron fires often and `claim` decides if a scrape is due
+    """
+
+    _redis: redis.Redis
+    _key_prefix: str
+
+    def __init__(self, redis_client: redis.Redis, *, key_prefix: str = "scrape:cadence") -> None:
+        self._redis = redis_client
+        self._key_prefix = key_prefix
+
+    @property
+    def _next_run_key(self) -> str:
+        return f"{self._key_prefix}:next-run-at"
+
+    @property
+    def _empty_runs_key(self) -> str:
+        return f"{self._key_prefix}:empty-runs"
+
+    @property
+    def _arrival_rates_key(self) -> str:
+        return f"{self._key_prefix}:arrival-rates"
+
+    async def claim(self, now: datetime, hold: float) -> bool:
+        """
+        Returns True if a scrape is due, the next one is pushed back by `hold` seconds until `record_run`
+        """
+        next_run_at = await self._redis.get(self._next_run_key)
+        if next_run_at is not None and now.timestamp() < float(next_run_at):
+            return False
+
+        await self._redis.set(self._next_run_key, now.timestamp() + hold)
+        return True
+
+    async def empty_runs(self) -> int:
+        return int(await self._redis.get(self._empty_runs_key) or 0)
+
+    async def record_run(self, started_at: datetime, new_items: int, interval: float) -> None:
+        if new_items > 0:
+            await self._redis.delete(self._empty_runs_key)
+        else:
+            await self._redis.incr(self._empty_runs_key)
+
+        await self._redis.set(self._next_run_key, started_at.timestamp() + interval)
+
+    async def record_failure(self, now: datetime, retry_after: float) -> None:
+        """
+        Next scrape is due in `retry_after` seconds instead of waiting out the `claim` hold, empty runs are kept
+        """
+        await self._redis.set(self._next_run_key, now.timestamp() + retry_after)
+
+    async def get_arrival_rates(self) -> dict[tuple[bool, int], float] | None:
+        data = await self._redis.get(self._arrival_rates_key)
+        if data is None:
+            return None
+
+        return {(weekend, hour): rate for weekend, hour, rate in json.loads(data)}
+
+    async def set_arrival_rates(self, arrival_rates: dict[tuple[bool, int], float], ttl: int) -> None:
+        data = json.dumps([[weekend, hour, rate] for (weekend, hour), rate in arrival_rates.items()])
+        await self._redis.set(self._arrival_rates_key, data, ex=ttl)
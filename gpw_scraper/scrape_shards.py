@@ -0,0 +1,126 @@
+import json
+from datetime import date, datetime
+from typing import Any, NamedTuple
+
+import redis.asyncio as redis
+
+from gpw_scraper import utils
+from gpw_scraper.scrapers.pap import PapHrefItem
+
+
+class ScrapeShard(NamedTuple):
+    day: date
+    page_start: int = 0
+    page_stride: int = 1
+
+    @property
+    def key(self) -> str:
+        return f"{self.day.isoformat()}:{self.page_start}/{self.page_stride}"
+
+
+class ShardTiming(NamedTuple):
+    seconds: float
+    hrefs: int
+    error: str | None = None
+
+
+def plan_shards(date_start: datetime, date_end: datetime, *, heavy_day_stride: int) -> list[ScrapeShard]:
+    """
+    A shard per day, weekdays have most of the reports so their listing pages are split
+    between `heavy_day_stride` shards
+    """
+    shards: list[ScrapeShard] = []
+    for day in utils.date_range(date_start, date_end):
+        stride = heavy_day_stride if day.isoweekday() < 6 else 1  # noqa: PLR2004
+        shards.extend(ScrapeShard(day.date(), page_start, stride) for page_start in range(stride))
+
+    return shards
+
+
+class ShardedScrapeRun:
+    """
+    Redis state of a sharded scrape, shards add their hrefs and timings, the last one to finish
+    hands the run over to the merge step
+    """
+
+    run_id: str
+    _redis: redis.Redis
+    _ttl: int
+    _key_prefix: str
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        run_id: str,
+        *,
+        ttl: int = 60 * 60 * 24,
+        key_prefix: str = "scrape:shards",
+    ) -> None:
+        self.run_id = run_id
+        self._redis = redis_client
+        self._ttl = ttl
+        self._key_prefix = key_prefix
+
+    @property
+    def _meta_key(self) -> str:
+        return f"{self._key_prefix}:{self.run_id}"
+
+    @property
+    def _hrefs_key(self) -> str:
+        return f"{self._key_prefix}:{self.run_id}:hrefs"
+
+    @property
+    def _timings_key(self) -> str:
+        return f"{self._key_prefix}:{self.run_id}:timings"
+
+    async def start(self, date_start: datetime, date_end: datetime, shards: int, **meta: Any) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                self._meta_key,
+                mapping={
+                    "date_start": date_start.isoformat(),
+                    "date_end": date_end.isoformat(),
+                    "pending": shards,
+                    "meta": json.dumps(meta),
+                },
+            )
+            pipe.expire(self._meta_key, self._ttl)
+            await pipe.execute()
+
+    async def date_range(self) -> tuple[datetime, datetime]:
+        date_start, date_end = await self._redis.hmget(self._meta_key, ["date_start", "date_end"])  # type: ignore
+        return datetime.fromisoformat(date_start), datetime.fromisoformat(date_end)
+
+    async def meta(self) -> dict[str, Any]:
+        return json.loads(await self._redis.hget(self._meta_key, "meta") or "{}")  # type: ignore
+
+    async def record_shard(self, shard: ScrapeShard, hrefs: list[PapHrefItem], timing: ShardTiming) -> bool:
+        """
+        Returns True if it was the last pending shard of the run
+        """
+        async with self._redis.pipeline(transaction=True) as pipe:
+            if len(hrefs) > 0:
+                pipe.sadd(self._hrefs_key, *(json.dumps([item.href, item.date.isoformat()]) for item in hrefs))
+            pipe.hset(self._timings_key, shard.key, json.dumps(timing._asdict()))
+            pipe.hincrby(self._meta_key, "pending", -1)
+            pipe.expire(self._hrefs_key, self._ttl)
+            pipe.expire(self._timings_key, self._ttl)
+            *_, pending, _, _ = await pipe.execute()
+
+        return int(pending) == 0
+
+    async def hrefs(self) -> list[PapHrefItem]:
+        """
+        Hrefs of every shard, deduplicated
+        """
+        items: dict[int, PapHrefItem] = {}
+        for entry in await self._redis.smembers(self._hrefs_key):  # type: ignore
+            href, date_ = json.loads(entry)
+            item = PapHrefItem(href=href, date=datetime.fromisoformat(date_))
+            items.setdefault(item.node_id, item)
+
+        return sorted(items.values(), key=lambda item: item.date)
+
+    async def timings(self) -> dict[str, ShardTiming]:
+        data = await self._redis.hgetall(self._timings_key)  # type: ignore
+        return {key: ShardTiming(**json.loads(value)) for key, value in data.items()}
@@ -1,10 +1,11 @@
 import asyncio
+import hashlib
 import itertools
 import re
-from collections.abc import Sequence
+from collections import deque
+from collections.abc import Collection, Mapping, Sequence
 from datetime import datetime, timedelta
 from typing import (
-    ClassVar,
     Literal,
     NamedTuple,
     cast,
@@ -16,7 +17,20 @@ from loguru import logger
 
 from gpw_scraper import llm, utils
 from gpw_scraper.beautifulsoup import BeautifulSoup
-from gpw_scraper.models.espi_ebi import EspiEbi
+from gpw_scraper.company_resolver import CompanyResolver
+from gpw_scraper.models.espi_ebi import EspiEbi, ScrapeErrorKind
+from gpw_scraper.pap_listing_cache import CachedListingPage, PapListingPageCache
+from gpw_scraper.pap_listing_variants import ListingDateVariant, PapListingVariantCache
+from gpw_scraper.scrapers.pap_errors import (
+    DEFAULT_RETRY_POLICIES,
+    ParseError,
+    RetryPolicy,
+    UnsupportedSourceError,
+    classify_error,
+    retry_after,
+)
+from gpw_scraper.scrapers.pap_fetch import FetchStrategy, PageText, PapFetcher, read_text
+from gpw_scraper.webhook_delivery import backoff_delay
 
 
 class EspiEbiScrapedInfo(NamedTuple):
@@ -28,116 +42,341 @@ class EspiEbiScrapedInfo(NamedTuple):
     llm: str | None = None
 
 
+def parse_node_id(url: str) -> int | None:
+    """
+    `/node/<id>` of a pap href or url
+    """
+    m = re.search(r"/node/(\d+)", url)
+    return None if m is None else int(m.group(1))
+
+
 class PapHrefItem(NamedTuple):
     href: str
     date: datetime
 
+    @property
+    def node_id(self) -> int:
+        return int(self.href.rsplit("/", 1)[1])
+
+
+class ListingPageResponse(NamedTuple):
+    content: str | None  # None if not modified
+    url: str
+    strategy: FetchStrategy
+    etag: str | None
+    last_modified: str | None
+
 
 class EspiEbiPapScraper:
     url = "https://espiebi-pap-pl.translate.goog"
     db_source_base_url = "https://espiebi.pap.pl"
-    node_pattern = r"(/node/\d+)\?"
-    google_translate_params: ClassVar[dict[str, str]] = {"_x_tr_sl": "en", "_x_tr_tl": "pl", "_x_tr_hl": "en"}
+    node_pattern = r"(/node/\d+)(?:[?#]|$)"  # absolute with proxy params, or relative on the origin
+
+    variant_cache: PapListingVariantCache | None
+    page_cache: PapListingPageCache | None
+    company_resolver: CompanyResolver | None
+    prefetch_depth: int
+    listing_pages_fetched: int
+    listing_pages_cached: int
+    listing_pages_unchanged: int
+    listing_bytes_fetched: int
+    listing_prefetches_wasted: int
+    max_page_bytes: int
+    pages_oversize: int
+
+    def __init__(
+        self,
+        variant_cache: PapListingVariantCache | None = None,
+        page_cache: PapListingPageCache | None = None,
+        *,
+        company_resolver: CompanyResolver | None = None,
+        prefetch_depth: int = 0,
+        max_page_bytes: int = 5 * 1024 * 1024,
+    ) -> None:
+        self.variant_cache = variant_cache
+        self.page_cache = page_cache
+        self.company_resolver = company_resolver
+        self.prefetch_depth = prefetch_depth
+        self.max_page_bytes = max_page_bytes
+        self.pages_oversize = 0
+        self.listing_pages_fetched = 0
+        self.listing_pages_cached = 0
+        self.listing_pages_unchanged = 0
+        self.listing_bytes_fetched = 0
+        self.listing_prefetches_wasted = 0
+
+    @staticmethod
+    def listing_date_params(date: datetime) -> dict[ListingDateVariant, tuple[str, str]]:
+        """
+        (created, enddate) listing params for every variant, in the order they are tried
+        """
+        day = date.strftime("%Y-%m-%d")
+        next_day = (date + timedelta(days=1)).strftime("%Y-%m-%d")
+        return {
+            ListingDateVariant.same: (day, day),
+            ListingDateVariant.shift_both: (next_day, next_day),
+            ListingDateVariant.shift_end: (day, next_day),
+        }
+
+    @staticmethod
+    def listing_section_pattern(date: datetime) -> re.Pattern[str]:
+        """
+        Matches once items of `date` are read, the rest of the listing page is not needed
+        """
+        return re.compile(rf"<h2[^>]*>\s*{date.strftime('%Y-%m-%d')}\s*</h2>.*?</ul>", re.DOTALL)
+
+    async def read_page(self, response: aiohttp.ClientResponse, stop_at: re.Pattern[str] | None = None) -> PageText:
+        page = await read_text(response, max_bytes=self.max_page_bytes, stop_at=stop_at)
+        if page.oversize:
+            self.pages_oversize += 1
+            logger.warning(f"{response.url} is over {self.max_page_bytes} bytes, only the beginning is used")
+
+        return page
+
+    async def fetch_listing_page(
+        self,
+        pap_session: PapFetcher,
+        date_params: tuple[str, str],
+        page: int,
+        validators: Mapping[FetchStrategy, dict[str, str]] | None = None,
+        stop_at: re.Pattern[str] | None = None,
+    ) -> ListingPageResponse:
+        created_param, end_date_param = date_params
+        logger.info(f"Scraping items at {page=}")
+        self.listing_pages_fetched += 1
+        response = await pap_session.get(
+            "/wyszukiwarka",
+            params={
+                "created": created_param,
+                "enddate": end_date_param,
+                "page": page,
+            },
+            strategy_headers=validators,
+        )
+        response.raise_for_status()
 
-    async def scrape_hrefs(  # noqa: PLR0914, PLR6301
+        content = None
+        if response.status != 304:  # noqa: PLR2004
+            page_text = await self.read_page(response, stop_at)
+            self.listing_bytes_fetched += page_text.size
+            content = page_text.text
+
+        return ListingPageResponse(
+            content=content,
+            url=str(response.url),
+            strategy=pap_session.strategy_of(response),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+    async def load_listing_page(
         self,
-        pap_session: aiohttp.ClientSession,
+        pap_session: PapFetcher,
         date: datetime,
-        ignore_list: Sequence[str] = [],
-    ) -> list[PapHrefItem]:
-        created_param = date.strftime("%Y-%m-%d")
-        end_date_param = created_param
-        pap_being_stupid = False
-        pap_being_stupid_2 = False
-        page = 0
+        date_params: tuple[str, str],
+        page: int,
+    ) -> list[PapHrefItem] | None:
+        """
+        Hrefs listed under `date` at listing `page`, None if the page has no items for `date`.
+        With `page_cache` pages are revalidated and only parsed if they changed since they were cached.
+        """
+        if self.page_cache is None:
+            response = await self.fetch_listing_page(
+                pap_session, date_params, page, stop_at=self.listing_section_pattern(date)
+            )
+            return self.parse_listing_page(cast(str, response.content), response.url, date)
+
+        # validators and content hashes are only comparable within the upstream that served them
+        strategy = pap_session.strategies[0]
+        cached = await self.page_cache.get(date, date_params, page, strategy)
+        if cached is not None and self.page_cache.is_fresh(date, cached):
+            self.listing_pages_cached += 1
+            return None if cached.hrefs is None else [PapHrefItem(*item) for item in cached.hrefs]
+
+        response = await self.fetch_listing_page(
+            pap_session,
+            date_params,
+            page,
+            validators=None if cached is None else {strategy: cached.validators},
+            stop_at=self.listing_section_pattern(date),
+        )
+        if response.strategy != strategy:  # fell back
+            cached = await self.page_cache.get(date, date_params, page, response.strategy)
+
+        content_hash = None if response.content is None else hashlib.sha256(response.content.encode()).hexdigest()
+        fetched_at = utils.utc_now().timestamp()
+
+        # 304, or same content from a proxy that drops the validators
+        if cached is not None and content_hash in {None, cached.content_hash}:
+            logger.debug(f"Listing {page=} not modified")
+            self.listing_pages_unchanged += 1
+            await self.page_cache.set(
+                date,
+                date_params,
+                page,
+                response.strategy,
+                cached._replace(
+                    fetched_at=fetched_at,
+                    etag=response.etag or cached.etag,
+                    last_modified=response.last_modified or cached.last_modified,
+                ),
+            )
+            return None if cached.hrefs is None else [PapHrefItem(*item) for item in cached.hrefs]
+
+        hrefs = self.parse_listing_page(cast(str, response.content), response.url, date)
+        await self.page_cache.set(
+            date,
+            date_params,
+            page,
+            response.strategy,
+            CachedListingPage(
+                hrefs=hrefs,  # type: ignore
+                content_hash=cast(str, content_hash),
+                fetched_at=fetched_at,
+                etag=response.etag,
+                last_modified=response.last_modified,
+            ),
+        )
+        return hrefs
+
+    async def scrape_listing_page(
+        self,
+        pap_session: PapFetcher,
+        date: datetime,
+        date_params: tuple[str, str],
+        page: int,
+        ignore_list: Collection[int] = (),
+    ) -> list[PapHrefItem] | None:
+        hrefs = await self.load_listing_page(pap_session, date, date_params, page)
+        return None if hrefs is None else [item for item in hrefs if item.node_id not in ignore_list]
+
+    def parse_listing_page(self, content: str, url: str, date: datetime) -> list[PapHrefItem] | None:  # noqa: PLR6301
+        logger.debug("Parsing html")
+        soup = BeautifulSoup(content, features="html.parser")
+
+        date_str = date.strftime("%Y-%m-%d")
+        logger.debug("Looking for h2 tag with target date")
+        day_h2 = soup.find("h2", string=date_str)
+        if day_h2 is None:
+            logger.info(f"h2 with {date_str} not found at {url}")
+            return None
+
+        logger.debug("Looking for ul with items")
+        news_ul = day_h2.find_next("ul")
+        if news_ul is None:
+            logger.info(f"ul with news not found at {url}")
+            return None
+
+        logger.debug("Looking for li;s within ul")
+        li_elements = cast(Tag, news_ul).find_all("li")
+        if len(li_elements) == 0:
+            logger.error(f"li elements not found at {url}")
+            return None
 
         hrefs: list[PapHrefItem] = []
-        while True:
-            logger.info(f"Scraping items at {page=}")
-            response = await pap_session.get(
-                "/wyszukiwarka",
-                params={
-                    "created": created_param,
-                    "enddate": end_date_param,
-                    "page": page,
-                    **EspiEbiPapScraper.google_translate_params,
-                },
-            )
-            response.raise_for_status()
-            content = await response.text()
-            logger.debug("Parsing html")
-            soup = BeautifulSoup(content, features="html.parser")
-
-            date_str = date.strftime("%Y-%m-%d")
-            logger.debug("Looking for h2 tag with target date")
-            day_h2 = soup.find("h2", string=date_str)
-            if day_h2 is None:
-                logger.info(f"h2 with {date_str} not found at {response.url!s}")
-                if page == 0:
-                    if pap_being_stupid is False:
-                        logger.info("Trying +1 day in created and end url param, maybe pap espi ebi page is stupid?")
-                        pap_being_stupid = True
-                        created_param = (date + timedelta(days=1)).strftime("%Y-%m-%d")
-                        end_date_param = created_param
-                        continue
-                    if pap_being_stupid_2 is False:
-                        logger.info(
-                            "Trying real date in created and +1 day in end, maybe pap espi ebi page is stupid?(squared)"
+        for item in li_elements:
+            logger.debug(f"Parsing item {item!s}")
+            hour = item.select_one(".hour").text  # type: ignore
+            a_tag = item.select("a")[0] if len(item.select("a")) > 0 else None  # type: ignore
+            if hour is None or a_tag is None:
+                logger.error(f"Required data not found for {item!s}")
+                continue
+
+            hour_str = hour.strip()
+            item_href = a_tag["href"]
+            m = re.search(EspiEbiPapScraper.node_pattern, item_href)  # type: ignore
+            if m is None:
+                logger.error(f"Regex failed on {item_href}")
+                continue
+
+            item_hh, item_mm = map(int, hour_str.split(":"))
+            hrefs.append(PapHrefItem(href=m.group(1), date=date.replace(hour=item_hh, minute=item_mm)))
+
+        return hrefs
+
+    async def resolve_listing_date_params(
+        self,
+        pap_session: PapFetcher,
+        date: datetime,
+        ignore_list: Collection[int] = (),
+    ) -> tuple[tuple[str, str], list[PapHrefItem]] | None:
+        """
+        Finds listing params that list `date`, returns them with hrefs of the first page.
+        Variant remembered in `variant_cache` is tried first, the rest only if it stops working.
+        """
+        variants = self.listing_date_params(date)
+        remembered = None if self.variant_cache is None else await self.variant_cache.get(date)
+        order = sorted(variants, key=lambda variant: variant != remembered)
+
+        for variant in order:
+            if variant != order[0]:
+                logger.info(f"Trying {variant=!s} listing params, maybe pap espi ebi page is stupid?")
+
+            hrefs = await self.scrape_listing_page(pap_session, date, variants[variant], 0, ignore_list)
+            if hrefs is None:
+                continue
+
+            if self.variant_cache is not None:
+                if variant != remembered:
+                    await self.variant_cache.set(date, variant)
+                await self.variant_cache.record_usage(variant, probed=variant != remembered)
+
+            return variants[variant], hrefs
+
+        return None
+
+    async def scrape_hrefs(
+        self,
+        pap_session: PapFetcher,
+        date: datetime,
+        ignore_list: Collection[int] = (),
+        *,
+        page_start: int = 0,
+        page_stride: int = 1,
+    ) -> list[PapHrefItem]:
+        """
+        Hrefs of listing pages `page_start`, `page_start + page_stride`, ... until the listing ends,
+        `page_stride` shards a heavy day between `page_stride` scrapers
+        """
+        resolved = await self.resolve_listing_date_params(pap_session, date, ignore_list)
+        if resolved is None:
+            return []
+
+        date_params, first_page_hrefs = resolved
+        hrefs = first_page_hrefs if page_start == 0 else []
+        pages = itertools.count(page_start if page_start > 0 else page_stride, page_stride)
+
+        # next `prefetch_depth` pages are in flight while the current one is handled
+        fetches: deque[asyncio.Task[list[PapHrefItem] | None]] = deque()
+        try:
+            while True:
+                while len(fetches) <= self.prefetch_depth:
+                    fetches.append(
+                        asyncio.create_task(
+                            self.scrape_listing_page(pap_session, date, date_params, next(pages), ignore_list)
                         )
-                        pap_being_stupid_2 = True
-                        created_param = date.strftime("%Y-%m-%d")
-                        end_date_param = (date + timedelta(days=1)).strftime("%Y-%m-%d")
-                        continue
-                break
-
-            logger.debug("Looking for ul with items")
-            news_ul = day_h2.find_next("ul")
-            if news_ul is None:
-                logger.info(f"ul with news not found at {response.url!s}")
-                break
-
-            logger.debug("Looking for li;s within ul")
-            li_elements = cast(Tag, news_ul).find_all("li")
-            if len(li_elements) == 0:
-                logger.error(f"li elements not found at {response.url!s}")
-                break
-
-            for item in li_elements:
-                logger.debug(f"Parsing item {item!s}")
-                hour = item.select_one(".hour").text  # type: ignore
-                a_tag = item.select("a")[0] if len(item.select("a")) > 0 else None  # type: ignore
-                if hour is None or a_tag is None:
-                    logger.error(f"Required data not found for {item!s}")
-                    continue
-
-                hour_str = hour.strip()
-                href_absolute = a_tag["href"]  # absolute because of google translate
-                m = re.search(EspiEbiPapScraper.node_pattern, href_absolute)  # type: ignore
-                if m is None:
-                    logger.error(f"Regex failed on {href_absolute}")
-                    continue
-
-                href = m.group(1)
-
-                if href in ignore_list:
-                    logger.info(f"item in ignore list {item!s}")
-                    continue
-
-                item_hh, item_mm = map(int, hour_str.split(":"))
-                item_date = date.replace(hour=item_hh, minute=item_mm)
-
-                hrefs.append(PapHrefItem(date=item_date, href=href))
-
-            page += 1
+                    )
+
+                page_hrefs = await fetches.popleft()
+                if page_hrefs is None:
+                    break
+
+                hrefs.extend(page_hrefs)
+        finally:
+            # pages past the end of the listing
+            self.listing_prefetches_wasted += len(fetches)
+            for fetch in fetches:
+                fetch.cancel()
+            await asyncio.gather(*fetches, return_exceptions=True)
 
         return hrefs
 
     async def scrape_hrefs_in_range(
         self,
-        pap_session: aiohttp.ClientSession,
+        pap_session: PapFetcher,
         date_start: datetime,
         date_end: datetime,
-        ignore_list: Sequence[str] = [],
+        ignore_list: Collection[int] = (),
     ) -> list[PapHrefItem]:
         href_tasks = [
             self.scrape_hrefs(pap_session, date, ignore_list) for date in utils.date_range(date_start, date_end)
@@ -147,15 +386,15 @@ class EspiEbiPapScraper:
 
     async def scrape_item_data(
         self,
-        pap_session: aiohttp.ClientSession,
+        pap_session: PapFetcher,
         href_item: PapHrefItem,
         clients: Sequence[llm.LLMClientManaged],
     ) -> EspiEbi:
         logger.info(f"{href_item} Scraping item")
-        response = await pap_session.get(href_item.href, params=EspiEbiPapScraper.google_translate_params)
+        response = await pap_session.get(href_item.href)
         response.raise_for_status()
 
-        content = await response.text()
+        content = (await self.read_page(response)).text
         logger.debug(f"{href_item.href} Parsing item html")
         soup = BeautifulSoup(content, features="html.parser")
 
@@ -164,19 +403,19 @@ class EspiEbiPapScraper:
         if source_sibling_div is None:
             msg = f"Source sibling div not found in {href_item.href}"
             logger.warning(msg)
-            raise ValueError(msg)
+            raise ParseError(msg)
 
         source_div = source_sibling_div.find_next("div")
         if source_div is None:
             msg = f"Source div not found in {href_item.href}"
             logger.error(msg)
-            raise ValueError(msg)
+            raise ParseError(msg)
 
         source = source_div.text.strip()
         if source not in {"ESPI", "EBI"}:
             msg = f"Unexpected source: {source!r} in {href_item.href}"
             logger.error(msg)
-            raise ValueError(msg)
+            raise UnsupportedSourceError(msg)
 
         if source == "ESPI":
             parsed = await self._parse_espi(
@@ -192,12 +431,40 @@ class EspiEbiPapScraper:
             title=parsed.title,
             description=parsed.description,
             company=parsed.company,
+            company_id=None if self.company_resolver is None else await self.company_resolver.resolve(parsed.company),
             source=EspiEbiPapScraper.db_source_base_url + parsed.url,
+            pap_node_id=href_item.node_id,
             parsed_by_llm=parsed.llm,
             date=href_item.date,
         )
         return item
 
+    async def scrape_item_data_with_retry(
+        self,
+        pap_session: PapFetcher,
+        href_item: PapHrefItem,
+        clients: Sequence[llm.LLMClientManaged],
+        retry_policies: dict[ScrapeErrorKind, RetryPolicy] = DEFAULT_RETRY_POLICIES,
+    ) -> EspiEbi:
+        """
+        `scrape_item_data` retried with backoff of the error's kind, see `classify_error`
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await self.scrape_item_data(pap_session, href_item, clients)
+            except Exception as exc:
+                kind = classify_error(exc)
+                policy = None if kind is None else retry_policies.get(kind)
+                if policy is None or attempt >= policy.max_attempts:
+                    raise
+
+                delay = backoff_delay(attempt, base=policy.base_delay, max_delay=policy.max_delay)
+                delay = min(max(delay, retry_after(exc) or 0), policy.max_delay)
+                logger.warning(f"{href_item.href} {kind!s} error {exc!r}, retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
     async def _parse_espi(  # noqa: PLR6301
         self,
         url: str,
@@ -224,13 +491,13 @@ class EspiEbiPapScraper:
         if company_name is None:
             msg = f"{url} Company name not found in {url}"
             logger.error(msg)
-            raise ValueError(msg)
+            raise ParseError(msg)
 
         page_content = soup.find("div", {"id": "main", "class": "container"})
         if page_content is None:
             msg = f"{url} Page content div not found"
             logger.error(msg)
-            raise ValueError(msg)
+            raise ParseError(msg)
 
         item_title = item_title_from_header or item_title_from_content
         item_description = item_content
@@ -248,7 +515,7 @@ class EspiEbiPapScraper:
 
         if item_title is None:
             msg = f"{url} item title is None"
-            raise ValueError(msg)
+            raise ParseError(msg)
 
         item_title = utils.normalize_raw_text(item_title)
         if item_description:
@@ -271,14 +538,14 @@ class EspiEbiPapScraper:
         if company_name_text is None:
             msg = f"Company text not found in {url}"
             logger.error(msg)
-            raise ValueError(msg)
+            raise ParseError(msg)
 
         logger.debug(f"{url} Looking for item title in html")
         item_title = soup.pap_get_text_after_semicolon(soup.find("strong", string="Tytuł:"))  # type: ignore
         if item_title is None:
             msg = f"Item title not found in {url}"
             logger.error(msg)
-            raise ValueError(msg)
+            raise ParseError(msg)
         item_title = item_title.lstrip("Tytuł:").strip()
 
         logger.debug(f"{url} Looking for item content in html")
@@ -286,7 +553,7 @@ class EspiEbiPapScraper:
         if item_content_div is None:
             msg = f"Item content div not found in {url}"
             logger.error(msg)
-            raise ValueError(msg)
+            raise ParseError(msg)
 
         item_title = utils.normalize_raw_text(item_title)
         item_content = utils.normalize_raw_text(item_content_div.text)
@@ -301,10 +568,10 @@ class EspiEbiPapScraper:
 
     async def scrape(
         self,
-        pap_session: aiohttp.ClientSession,
+        pap_session: PapFetcher,
         date_start: datetime,
         date_end: datetime,
-        ignore_list: Sequence[str],
+        ignore_list: Collection[int],
         clients: Sequence[llm.LLMClientManaged],
     ) -> list[EspiEbi]:
         logger.info("Scraping")
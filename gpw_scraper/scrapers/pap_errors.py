@@ -0,0 +1,65 @@
+from typing import NamedTuple
+
+import aiohttp
+
+from gpw_scraper.models.espi_ebi import ScrapeErrorKind
+
+
+class ParseError(ValueError):
+    """
+    Page doesn't have what the parser expects
+    """
+
+
+class UnsupportedSourceError(ParseError):
+    """
+    Page is not an ESPI or EBI report
+    """
+
+
+class RetryPolicy(NamedTuple):
+    max_attempts: int
+    base_delay: float = 0
+    max_delay: float = 0
+
+
+DEFAULT_RETRY_POLICIES: dict[ScrapeErrorKind, RetryPolicy] = {
+    ScrapeErrorKind.transient: RetryPolicy(max_attempts=3, base_delay=1, max_delay=10),
+    ScrapeErrorKind.throttled: RetryPolicy(max_attempts=3, base_delay=5, max_delay=60),
+    ScrapeErrorKind.parse: RetryPolicy(max_attempts=1),
+    ScrapeErrorKind.unsupported: RetryPolicy(max_attempts=1),
+}
+
+# retrying won't change anything, these are kept out of scrapes
+QUARANTINED_KINDS = {ScrapeErrorKind.parse, ScrapeErrorKind.unsupported}
+
+
+def classify_error(exc: BaseException) -> ScrapeErrorKind | None:
+    """
+    None if the error is not about the fetched page
+    """
+    if isinstance(exc, UnsupportedSourceError):
+        return ScrapeErrorKind.unsupported
+    if isinstance(exc, ParseError):
+        return ScrapeErrorKind.parse
+    if isinstance(exc, aiohttp.ClientResponseError):
+        if exc.status in {403, 429}:
+            return ScrapeErrorKind.throttled
+        if exc.status in {404, 410}:
+            return ScrapeErrorKind.unsupported
+        # other statuses may go away, retried without being quarantined
+        return ScrapeErrorKind.transient
+    if isinstance(exc, (aiohttp.ClientError, TimeoutError)):
+        return ScrapeErrorKind.transient
+    return None
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """
+    Seconds from the Retry-After header of a throttled response
+    """
+    if not isinstance(exc, aiohttp.ClientResponseError) or exc.headers is None:
+        return None
+
+    value = exc.headers.get("Retry-After")
+    return float(value) if value is not None and value.isdigit() else None
@@ -0,0 +1,209 @@
+import codecs
+import enum
+import re
+import time
+from collections.abc import Mapping, Sequence
+from typing import Any, ClassVar, NamedTuple
+
+import aiohttp
+from loguru import logger
+
+
+class FetchStrategy(enum.StrEnum):
+    direct = "direct"  # espiebi.pap.pl
+    proxy = "proxy"  # google translate proxy of espiebi.pap.pl
+
+
+class FetchStrategyStats(NamedTuple):
+    requests: int = 0
+    failures: int = 0
+    seconds_total: float = 0.0
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.requests if self.requests > 0 else 0.0
+
+    @property
+    def seconds_avg(self) -> float:
+        return self.seconds_total / self.requests if self.requests > 0 else 0.0
+
+
+class PageText(NamedTuple):
+    text: str
+    size: int  # bytes read
+    oversize: bool  # hit `max_bytes`, text is cut
+    stopped_early: bool  # `stop_at` matched before the end of the body
+
+
+_META_CHARSET_PATTERN = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+# `stop_at` is searched for in each new chunk and this many characters before it, for matches split between chunks
+_STOP_AT_OVERLAP = 1024
+
+
+def detect_encoding(response: aiohttp.ClientResponse, head: bytes) -> str:
+    """
+    Charset from Content-Type, then from a meta tag in the first chunk, utf-8 otherwise
+    """
+    candidates = [response.charset]
+    if (m := _META_CHARSET_PATTERN.search(head)) is not None:
+        candidates.append(m.group(1).decode("ascii"))
+
+    for candidate in candidates:
+        if candidate is None:
+            continue
+        try:
+            return codecs.lookup(candidate).name
+        except LookupError:
+            continue
+
+    return "utf-8"
+
+
+async def read_text(
+    response: aiohttp.ClientResponse,
+    *,
+    max_bytes: int,
+    chunk_size: int = 64 * 1024,
+    stop_at: re.Pattern[str] | None = None,
+) -> PageText:
+    """
+    Reads and decodes the body chunk by chunk, at most `max_bytes` of it are kept in memory.
+    Stops once `stop_at` matches the text read so far, the connection is closed then instead of reading the rest.
+    """
+    text = ""
+    decoder: codecs.IncrementalDecoder | None = None
+    size = 0
+    oversize = stopped_early = False
+    try:
+        async for chunk in response.content.iter_chunked(chunk_size):
+            is_cut = size + len(chunk) > max_bytes
+            kept = chunk[: max_bytes - size]
+            size += len(kept)
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(detect_encoding(response, kept))(errors="replace")
+            search_from = max(len(text) - _STOP_AT_OVERLAP, 0)
+            text += decoder.decode(kept)
+
+            if stop_at is not None and stop_at.search(text, search_from) is not None:
+                stopped_early = True
+                break
+            if is_cut:
+                oversize = True
+                break
+
+        if decoder is not None:
+            text += decoder.decode(b"", final=True)
+    finally:
+        if oversize or stopped_early:
+            response.close()
+        else:
+            response.release()
+
+    return PageText(text=text, size=size, oversize=oversize, stopped_early=stopped_early)
+
+
+class PapFetcher:
+    """
+    Sends pap requests with the first working `FetchStrategy`, a strategy that fails or gets blocked
+    falls back to the next one. Blocked strategies are skipped for `block_cooldown` seconds.
+
+    Both strategies serve the same paths, the proxy one only needs `proxy_params` on every request.
+    """
+
+    proxy_params: ClassVar[dict[str, str]] = {"_x_tr_sl": "en", "_x_tr_tl": "pl", "_x_tr_hl": "en"}
+    blocked_statuses: ClassVar[set[int]] = {403, 429}
+
+    sessions: dict[FetchStrategy, aiohttp.ClientSession]
+    block_cooldown: float
+    _blocked_until: dict[FetchStrategy, float]
+    _stats: dict[FetchStrategy, FetchStrategyStats]
+
+    def __init__(self, sessions: Mapping[FetchStrategy, aiohttp.ClientSession], *, block_cooldown: float = 0) -> None:
+        """
+        `sessions` in the order strategies are tried
+        """
+        self.sessions = dict(sessions)
+        self.block_cooldown = block_cooldown
+        self._blocked_until = {}
+        self._stats = {}
+
+    @property
+    def strategies(self) -> Sequence[FetchStrategy]:
+        now = time.monotonic()
+        available = [strategy for strategy in self.sessions if self._blocked_until.get(strategy, 0) <= now]
+        return available or list(self.sessions)
+
+    @classmethod
+    def strategy_of(cls, response: aiohttp.ClientResponse) -> FetchStrategy:
+        """
+        Strategy that served `response`, proxy requests carry `proxy_params`
+        """
+        proxied = all(param in response.url.query for param in cls.proxy_params)
+        return FetchStrategy.proxy if proxied else FetchStrategy.direct
+
+    async def get(
+        self,
+        path: str,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        strategy_headers: Mapping[FetchStrategy, dict[str, str]] | None = None,
+    ) -> aiohttp.ClientResponse:
+        """
+        `headers` are sent with every strategy, `strategy_headers` only with the one they are mapped to,
+        e.g. validators that only the upstream that issued them understands
+        """
+        strategies = self.strategies
+        for strategy in strategies:
+            is_last = strategy == strategies[-1]
+            strategy_params = {**(params or {}), **(self.proxy_params if strategy == FetchStrategy.proxy else {})}
+            request_headers = {**(headers or {}), **(strategy_headers or {}).get(strategy, {})}
+
+            started = time.perf_counter()
+            try:
+                response = await self.sessions[strategy].get(
+                    path, params=strategy_params, headers=request_headers or None
+                )
+            except (aiohttp.ClientError, TimeoutError) as exc:
+                self._record(strategy, time.perf_counter() - started, failed=True)
+                if is_last:
+                    raise
+
+                logger.warning(f"{strategy!s} fetch of {path} failed: {exc!r}, falling back")
+                continue
+
+            failed = response.status in self.blocked_statuses or response.status >= 500  # noqa: PLR2004
+            self._record(strategy, time.perf_counter() - started, failed=failed)
+            if response.status in self.blocked_statuses:
+                logger.warning(
+                    f"{strategy!s} fetch blocked ({response.status}), skipping it for {self.block_cooldown}s"
+                )
+                self._blocked_until[strategy] = time.monotonic() + self.block_cooldown
+
+            if not failed or is_last:
+                return response
+
+            response.release()
+
+        msg = "No fetch strategies configured"
+        raise RuntimeError(msg)
+
+    def _record(self, strategy: FetchStrategy, seconds: float, *, failed: bool) -> None:
+        stats = self._stats.get(strategy, FetchStrategyStats())
+        self._stats[strategy] = FetchStrategyStats(
+            requests=stats.requests + 1,
+            failures=stats.failures + failed,
+            seconds_total=stats.seconds_total + seconds,
+        )
+
+    def pop_stats(self) -> dict[FetchStrategy, FetchStrategyStats]:
+        """
+        Stats since the last call
+        """
+        stats, self._stats = self._stats, {}
+        return stats
+
+    async def close(self) -> None:
+        for session in self.sessions.values():
+            await session.close()
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy import func as sqla_func
+
+from gpw_scraper import utils
+from gpw_scraper.models.backfill import Backfill, BackfillStatus, BackfillUnit
+from gpw_scraper.services.sqlalchemy import SQLAlchemyService, sql_error_handler
+
+
+class BackfillProgress(NamedTuple):
+    units_by_status: dict[BackfillStatus, int]
+    items_created: int
+
+
+class SQLABackfillService(SQLAlchemyService[Backfill, int]):
+    model = Backfill
+
+    async def create_with_units(self, date_start: datetime, date_end: datetime) -> Backfill:
+        """
+        Backfill of `date_start`-`date_end` with a unit for every day, newest days are picked up first
+        """
+        with sql_error_handler():
+            backfill = Backfill(date_start=date_start.date(), date_end=date_end.date())
+            self.session.add(backfill)
+            await self.session.flush()
+
+            self.session.add_all(
+                BackfillUnit(backfill_id=backfill.id, day=day.date()) for day in utils.date_range(date_start, date_end)
+            )
+            await self.session.commit()
+            await self.session.refresh(backfill)
+            return backfill
+
+    async def list_unfinished(self) -> list[Backfill]:
+        stmt = select(Backfill).where(Backfill.status.in_([BackfillStatus.pending, BackfillStatus.running]))
+        return await self.list_(statement=stmt)
+
+    async def progress(self, backfill_id: int) -> BackfillProgress:
+        stmt = (
+            select(BackfillUnit.status, sqla_func.count(), sqla_func.sum(BackfillUnit.items_created))
+            .where(BackfillUnit.backfill_id == backfill_id)
+            .group_by(BackfillUnit.status)
+        )
+        with sql_error_handler():
+            rows = (await self.session.execute(stmt)).all()
+
+        return BackfillProgress(
+            units_by_status=dict.fromkeys(BackfillStatus, 0) | {status: count for status, count, _ in rows},
+            items_created=sum(items or 0 for *_, items in rows),
+        )
+
+    async def refresh_status(self, backfill_id: int) -> BackfillStatus:
+        """
+        Sets backfill status from its units, done once there is nothing left to run
+        """
+        progress = await self.progress(backfill_id)
+        units = progress.units_by_status
+        if units[BackfillStatus.pending] > 0 or units[BackfillStatus.running] > 0:
+            status = BackfillStatus.running
+        elif units[BackfillStatus.failed] > 0:
+            status = BackfillStatus.failed
+        else:
+            status = BackfillStatus.done
+
+        with sql_error_handler():
+            await self.session.execute(update(Backfill).where(Backfill.id == backfill_id).values(status=status))
+            await self.session.commit()
+
+        return status
+
+
+class SQLABackfillUnitService(SQLAlchemyService[BackfillUnit, int]):
+    model = BackfillUnit
+
+    async def claim(self, backfill_id: int, lease_seconds: float) -> BackfillUnit | None:
+        """
+        Claims next pending unit, or a running one whose worker lease expired.
+        `SKIP LOCKED` lets parallel workers claim different units without waiting on each other.
+        """
+        now = utils.utc_now()
+        stmt = (
+            select(BackfillUnit)
+            .where(
+                BackfillUnit.backfill_id == backfill_id,
+                or_(
+                    BackfillUnit.status == BackfillStatus.pending,
+                    and_(BackfillUnit.status == BackfillStatus.running, BackfillUnit.locked_until < now),
+                ),
+            )
+            .order_by(BackfillUnit.day.desc())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        with sql_error_handler():
+            unit = (await self.session.execute(stmt)).scalar_one_or_none()
+            if unit is None:
+                return None
+
+            unit.status = BackfillStatus.running
+            unit.attempts += 1
+            unit.locked_until = now + timedelta(seconds=lease_seconds)
+            await self.session.execute(
+                update(Backfill)
+                .where(Backfill.id == backfill_id, Backfill.status == BackfillStatus.pending)
+                .values(status=BackfillStatus.running)
+            )
+            await self.session.commit()
+            await self.session.refresh(unit)
+            return unit
+
+    async def count_in_progress(self, backfill_id: int) -> int:
+        return await self.count(
+            statement=select(BackfillUnit).where(
+                BackfillUnit.backfill_id == backfill_id,
+                BackfillUnit.status == BackfillStatus.running,
+                BackfillUnit.locked_until >= utils.utc_now(),
+            )
+        )
+
+    async def finish(self, unit: BackfillUnit, items_created: int) -> None:
+        with sql_error_handler():
+            unit.status = BackfillStatus.done
+            unit.items_created = items_created
+            unit.locked_until = None
+            unit.error = None
+            await self.session.commit()
+
+    async def fail(self, unit: BackfillUnit, error: str, max_attempts: int) -> None:
+        """
+        Unit goes back to pending until it runs out of attempts
+        """
+        with sql_error_handler():
+            unit.status = BackfillStatus.failed if unit.attempts >= max_attempts else BackfillStatus.pending
+            unit.locked_until = None
+            unit.error = error
+            await self.session.commit()
@@ -0,0 +1,77 @@
+from sqlalchemy import func as sqla_func
+from sqlalchemy import select
+
+from gpw_scraper.models.company import Company
+from gpw_scraper.services.sqlalchemy import SQLAlchemyService, sql_error_handler
+
+# shorter queries have no trigrams to match
+TRIGRAM_MIN_LENGTH = 3
+
+
+# full legal forms and the abbreviations reports use interchangeably, as they look in `company_key`
+LEGAL_FORM_KEYS = {
+    "SPÓŁKAAKCYJNA": "SA",
+    "SPÓŁKAEUROPEJSKA": "SE",
+    "SPÓŁKAZOGRANICZONĄODPOWIEDZIALNOŚCIĄ": "SPZOO",
+}
+
+
+def company_key(name: str) -> str:
+    """
+    Name with only upper case letters and digits and an abbreviated legal form,
+    so spelling variants like `ORLEN S.A.` and `Orlen Spółka Akcyjna` match
+    """
+    key = "".join(char for char in name.upper() if char.isalnum())
+    for legal_form, abbreviation in LEGAL_FORM_KEYS.items():
+        if key.endswith(legal_form):
+            return key.removesuffix(legal_form) + abbreviation
+    return key
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SQLACompanyService(SQLAlchemyService[Company, int]):
+    model = Company
+
+    async def search(self, query: str, limit: int) -> list[Company]:
+        """
+        Companies starting with `query` first, shortest names first, then the ones with a word similar to it
+        """
+        query = query.strip()
+        prefix_stmt = (
+            select(Company)
+            .where(sqla_func.lower(Company.name).like(f"{escape_like(query.lower())}%", escape="\\"))
+            .order_by(sqla_func.length(Company.name), Company.name)
+            .limit(limit)
+        )
+        with sql_error_handler():
+            companies = list((await self.session.scalars(prefix_stmt)).all())
+            if len(companies) >= limit or len(query) < TRIGRAM_MIN_LENGTH:
+                return companies
+
+            similarity = sqla_func.word_similarity(query, Company.name)
+            similar_stmt = (
+                select(Company)
+                .where(Company.name.op("%>")(query), Company.id.not_in([company.id for company in companies]))
+                .order_by(similarity.desc(), Company.name)
+                .limit(limit - len(companies))
+            )
+            companies.extend((await self.session.scalars(similar_stmt)).all())
+            return companies
+
+    async def get_or_create_by_name(self, name: str) -> Company:
+        """
+        Company reported under a name with the same key as `name`, a new one named `name` if there is none
+        """
+        key = company_key(name)
+        with sql_error_handler():
+            # serializes creating the same company across workers
+            await self.session.execute(select(sqla_func.pg_advisory_xact_lock(sqla_func.hashtext(key))))
+            company = await self.session.scalar(select(Company).where(Company.aliases.contains([key])))
+            if company is None:
+                company = Company(name=name, aliases=[key])
+                self.session.add(company)
+            await self.session.commit()
+            return company
@@ -1,15 +1,99 @@
-from datetime import datetime
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta
 
+from sqlalchemy import extract, select
 from sqlalchemy import func as sqla_func
-from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 
-from gpw_scraper.models.espi_ebi import EspiEbi
-from gpw_scraper.services.sqlalchemy import SQLAlchemyService
+from gpw_scraper import utils
+from gpw_scraper.models.espi_ebi import EspiEbi, EspiEbiKey, EspiEbiQuarantine, ScrapeErrorKind
+from gpw_scraper.services.partitions import Partition, create_partitions
+from gpw_scraper.services.sqlalchemy import SQLAlchemyService, sql_error_handler
+
+
+def day_bounds(date_start: datetime, date_end: datetime) -> tuple[datetime, datetime]:
+    """
+    Half-open range covering whole days from `date_start` to `date_end`, compared to the column as is
+    so its index can be used, unlike `func.date(column)`
+    """
+    return datetime.combine(date_start.date(), time()), datetime.combine(date_end.date() + timedelta(days=1), time())
+
+
+def month_partition(month: date) -> Partition:
+    start = month.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return Partition(name=f"espi_ebi_y{start.year}m{start.month:02d}", start=start, end=end)
+
+
+def month_partitions(date_start: date, date_end: date) -> list[Partition]:
+    """
+    Monthly partitions covering `date_start` to `date_end`, both inclusive
+    """
+    partitions = [month_partition(date_start)]
+    while partitions[-1].end <= date_end:
+        partitions.append(month_partition(partitions[-1].end))
+    return partitions
 
 
 class SQLAEspiEbiService(SQLAlchemyService[EspiEbi, int]):
     model = EspiEbi
 
-    async def list_in_date_range(self, date_start: datetime, date_end: datetime) -> list[EspiEbi]:
-        stmt = select(EspiEbi).where(sqla_func.date(EspiEbi.date).between(date_start.date(), date_end.date()))
-        return await self.list_(statement=stmt)
+    async def list_pap_node_ids_in_date_range(self, date_start: datetime, date_end: datetime) -> set[int]:
+        """
+        Pap node ids of entries from `date_start` to `date_end` days, both inclusive
+        """
+        start, end = day_bounds(date_start, date_end)
+        # narrow keys table instead of the partitions
+        stmt = select(EspiEbiKey.pap_node_id).where(
+            EspiEbiKey.date >= start, EspiEbiKey.date < end, EspiEbiKey.pap_node_id.is_not(None)
+        )
+        with sql_error_handler():
+            return {node_id for node_id in await self.session.scalars(stmt) if node_id is not None}
+
+    async def count_by_weekend_and_hour(self, since: datetime) -> dict[tuple[bool, int], int]:
+        """
+        Number of entries published since `since` per (is weekend, hour), `date` is stored in Warsaw local time
+        """
+        is_weekend = extract("isodow", EspiEbi.date) >= 6  # noqa: PLR2004
+        hour = extract("hour", EspiEbi.date)
+        stmt = select(is_weekend, hour, sqla_func.count()).where(EspiEbi.date >= since).group_by(is_weekend, hour)
+        with sql_error_handler():
+            result = await self.session.execute(stmt)
+            return {(weekend, int(hour_)): count for weekend, hour_, count in result.all()}
+
+    async def create_partitions(self, partitions: Iterable[Partition]) -> list[str]:
+        """
+        Creates missing monthly partitions, returns names of the created ones
+        """
+        with sql_error_handler():
+            created = await create_partitions(self.session, "espi_ebi", "date", partitions)
+            await self.session.commit()
+            return created
+
+
+class SQLAEspiEbiQuarantineService(SQLAlchemyService[EspiEbiQuarantine, int]):
+    model = EspiEbiQuarantine
+
+    async def quarantine(self, source: str, date: datetime, error_kind: ScrapeErrorKind, error: str) -> None:
+        """
+        Adds the item, or bumps its attempts if it is already quarantined
+        """
+        stmt = insert(EspiEbiQuarantine).values(source=source, date=date, error_kind=error_kind, error=error)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[EspiEbiQuarantine.source],
+            set_={
+                "error_kind": stmt.excluded.error_kind,
+                "error": stmt.excluded.error,
+                "attempts": EspiEbiQuarantine.attempts + 1,
+                "updated_at": utils.utc_now(),
+            },
+        )
+        with sql_error_handler():
+            await self.session.execute(stmt)
+            await self.session.commit()
+
+    async def list_sources_in_date_range(self, date_start: datetime, date_end: datetime) -> set[str]:
+        start, end = day_bounds(date_start, date_end)
+        stmt = select(EspiEbiQuarantine.source).where(EspiEbiQuarantine.date >= start, EspiEbiQuarantine.date < end)
+        with sql_error_handler():
+            return set((await self.session.scalars(stmt)).all())
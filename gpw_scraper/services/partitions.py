@@ -0,0 +1,71 @@
+from collections.abc import Iterable
+from datetime import date
+from typing import NamedTuple
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class Partition(NamedTuple):
+    name: str
+    start: date
+    end: date  # exclusive
+
+    @property
+    def bounds(self) -> tuple[str, str]:
+        """
+        Bound literals, midnight utc. Time zone is ignored by `timestamp` columns and respected by `timestamptz`
+        """
+        return f"{self.start.isoformat()} 00:00:00+00", f"{self.end.isoformat()} 00:00:00+00"
+
+
+# table names and bounds below come from code, never from user input
+
+
+async def list_partitions(session: AsyncSession, table: str) -> set[str]:
+    stmt = text(
+        "SELECT child.relname FROM pg_inherits"
+        " JOIN pg_class parent ON parent.oid = pg_inherits.inhparent"
+        " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+        " WHERE parent.relname = :table"
+    )
+    return set((await session.scalars(stmt, {"table": table})).all())
+
+
+async def create_partitions(
+    session: AsyncSession, table: str, column: str, partitions: Iterable[Partition]
+) -> list[str]:
+    """
+    Creates missing range partitions of `table` on `column`, returns names of the created ones.
+
+    A partition can't be created while `<table>_default` has rows in its range,
+    those are skipped and logged, the rows have to be moved by hand.
+    Concurrent calls for the same table wait for each other until the end of the transaction.
+    """
+    await session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:table))"), {"table": table})
+    existing = await list_partitions(session, table)
+    created: list[str] = []
+    for partition in partitions:
+        if partition.name in existing:
+            continue
+
+        start, end = partition.bounds
+        in_default = await session.scalar(
+            text(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {column} >= '{start}' AND {column} < '{end}')")  # noqa: S608
+        )
+        if in_default:
+            logger.error(f"{table}_default has rows of {partition.name}, not creating it")
+            continue
+
+        await session.execute(
+            text(f"CREATE TABLE {partition.name} PARTITION OF {table} FOR VALUES FROM ('{start}') TO ('{end}')")
+        )
+        created.append(partition.name)
+
+    return created
+
+
+async def drop_partitions(session: AsyncSession, names: Iterable[str]) -> None:
+    for name in names:
+        await session.execute(text(f"DROP TABLE {name}"))
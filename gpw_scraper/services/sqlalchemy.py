@@ -1,12 +1,19 @@
-from collections.abc import Iterable
+import json
+import time
+from collections.abc import Iterable, Sequence
 from contextlib import contextmanager
-from typing import Any, Generic, Literal, NamedTuple, TypeVar
+from typing import Any, ClassVar, Generic, Literal, NamedTuple, TypeVar
 
 from loguru import logger
-from sqlalchemy import Column, Select, asc, desc, over, select, text
+from pydantic import TypeAdapter
+from sqlalchemy import Column, Select, asc, desc, over, select, text, tuple_
 from sqlalchemy import func as sqla_func
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
 
 class SQLAlchemyServiceError(Exception): ...
@@ -43,6 +50,33 @@ T = TypeVar("T")
 U = TypeVar("U")
 SelectT = TypeVar("SelectT", bound=Select[Any])
 
+# exact - counted with the page, cached - separate count query cached per filter set,
+# estimate - planner's row estimate, none - no total, only `has_more`
+CountStrategy = Literal["exact", "cached", "estimate", "none"]
+
+
+class Explain(Executable, ClauseElement):
+    """
+    `EXPLAIN (FORMAT JSON)` of a statement, its params are bound like in the statement itself
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select[Any]) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler: SQLCompiler, **kwargs: Any) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kwargs)}"
+
+
+class Page(NamedTuple, Generic[T]):
+    items: list[T]
+    total: int | None
+    has_more: bool
+
+
 # List of kwargs which we don;t want to touch when "_where_from_kwargs" runs
 RESERVED_KWARGS = {"offset", "limit", "order_by"}
 
@@ -52,6 +86,10 @@ class SQLAlchemyService(Generic[T, U]):
     model_id_attr_name: str = "id"
     model_id_type: type[U]
 
+    # sql -> (expires at, count), shared by all services of the process
+    _count_cache: ClassVar[dict[str, tuple[float, int]]] = {}
+    _count_cache_max_size: ClassVar[int] = 1024
+
     def __init__(
         self,
         session: AsyncSession,
@@ -275,29 +313,127 @@ class SQLAlchemyService(Generic[T, U]):
         auto_expunge: bool | None = None,
         **kwargs: Any,
     ) -> tuple[list[T], int]:
+        page = await self.list_page(statement, count="exact", auto_expunge=auto_expunge, **kwargs)
+        return page.items, page.total or 0
+
+    async def list_page(
+        self,
+        statement: Select[Any] | None = None,
+        *,
+        count: CountStrategy = "exact",
+        count_cache_ttl: float = 60,
+        auto_expunge: bool | None = None,
+        **kwargs: Any,
+    ) -> Page[T]:
+        """
+        Page of items, total is counted with `count` strategy.
+        One extra row is fetched to tell if there are more items after the page.
+        """
+        limit: int | None = kwargs.get("limit")
         with sql_error_handler():
-            stmt = self._get_statement(statement)
-            stmt = self._where_from_kwargs(stmt, **kwargs)
-            stmt = self._order_by_from_kwargs(stmt, **kwargs)
-            stmt = self._paginate_from_kwargs(stmt, **kwargs)
+            filtered = self._get_statement(statement)
+            filtered = self._where_from_kwargs(filtered, **kwargs)
 
-            stmt = stmt.add_columns(over(sqla_func.count()))
+            stmt = self._order_by_from_kwargs(filtered, **kwargs)
+            stmt = self._offset_from_kwargs(stmt, **kwargs)
+            if limit:
+                stmt = stmt.limit(limit + 1)
+            if count == "exact":
+                stmt = stmt.add_columns(over(sqla_func.count()))
 
-            result = await self.session.execute(stmt)
-            rows = result.all()
+            rows = (await self.session.execute(stmt)).all()
+            has_more = limit is not None and len(rows) > limit
+            rows = rows[:limit] if limit else rows
 
-            total_count = 0
             items: list[T] = []
-
-            for i, row in enumerate(rows):
+            for row in rows:
                 instance = row[0]
-                count_value = row[-1]
                 self._expunge(instance, auto_expunge=auto_expunge)
                 items.append(instance)
-                if i == 0:
-                    total_count = count_value
 
-            return items, total_count
+            total = None
+            if count == "exact":
+                # window count is missing on pages past the end
+                total = rows[0][-1] if rows else await self.count(filtered.order_by(None))
+            elif count == "cached":
+                total = await self._cached_count(filtered.order_by(None), ttl=count_cache_ttl)
+            elif count == "estimate":
+                total = await self._estimate_count(filtered.order_by(None))
+
+            return Page(items=items, total=total, has_more=has_more)
+
+    @staticmethod
+    def _count_cache_key(statement: Select[Any]) -> str:
+        compiled = statement.compile(dialect=postgresql.dialect())
+        return f"{compiled}\n{json.dumps(compiled.params, sort_keys=True, default=str)}"
+
+    async def _cached_count(self, statement: Select[Any], *, ttl: float) -> int:
+        key = self._count_cache_key(statement)
+        now = time.monotonic()
+        cached = self._count_cache.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        total = await self.count(statement)
+        if len(self._count_cache) >= self._count_cache_max_size:
+            self._count_cache.clear()
+        self._count_cache[key] = (now + ttl, total)
+        return total
+
+    async def _estimate_count(self, statement: Select[Any]) -> int:
+        """
+        Row estimate of the planner, close for unfiltered or broad filters and only as fresh as table statistics
+        """
+        result = await self.session.execute(Explain(statement))
+        plan = result.scalar_one()
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def list_keyset(
+        self,
+        statement: Select[tuple[T]] | None = None,
+        *,
+        keys: Sequence[str] = ("id",),
+        order: Literal["asc", "desc"] = "desc",
+        limit: int,
+        after: Sequence[Any] | None = None,
+        before: Sequence[Any] | None = None,
+        auto_expunge: bool | None = None,
+    ) -> tuple[list[T], bool]:
+        """
+        Keyset pagination, `keys` have to be unique together (e.g. date and id) and should be indexed in that order.
+        Returns `limit` items in `order` right after `after` or right before `before` key values, and whether there
+        are more in that direction. Cost doesn't depend on how deep the page is, unlike offset.
+        """
+        columns = [getattr(self.model, key) for key in keys]
+        backward = before is not None
+        bound = before if backward else after
+
+        with sql_error_handler():
+            stmt = self._get_statement(statement)
+            if bound is not None:
+                # cursor values come from json, e.g. dates as strings
+                values = [
+                    TypeAdapter(column.type.python_type).validate_python(v)
+                    for column, v in zip(columns, bound, strict=True)
+                ]
+                if (order == "desc") != backward:
+                    stmt = stmt.where(tuple_(*columns) < tuple_(*values))
+                else:
+                    stmt = stmt.where(tuple_(*columns) > tuple_(*values))
+
+            ascending = (order == "asc") != backward
+            stmt = stmt.order_by(*(asc(column) if ascending else desc(column) for column in columns)).limit(limit + 1)
+
+            items = list((await self.session.execute(stmt)).scalars())
+            has_more = len(items) > limit
+            items = items[:limit]
+            if backward:
+                items.reverse()
+
+            for item in items:
+                self._expunge(item, auto_expunge=auto_expunge)
+
+            return items, has_more
 
     async def update(
         self,
@@ -1,5 +1,37 @@
+import re
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, time, timedelta
+
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+
+from gpw_scraper import utils
 from gpw_scraper.models import webhook as webhooks_models
-from gpw_scraper.services.sqlalchemy import SQLAlchemyService
+from gpw_scraper.services.partitions import Partition, create_partitions, drop_partitions, list_partitions
+from gpw_scraper.services.sqlalchemy import SQLAlchemyService, sql_error_handler
+
+_DAY_PARTITION_PATTERN = re.compile(r"^webhook_events_y(\d{4})m(\d{2})d(\d{2})$")
+
+
+def day_partition(day: date) -> Partition:
+    return Partition(
+        name=f"webhook_events_y{day.year}m{day.month:02d}d{day.day:02d}",
+        start=day,
+        end=day + timedelta(days=1),
+    )
+
+
+def day_partitions(date_start: date, date_end: date) -> list[Partition]:
+    """
+    Daily partitions from `date_start` to `date_end`, both inclusive
+    """
+    return [day_partition(date_start + timedelta(days=i)) for i in range((date_end - date_start).days + 1)]
+
+
+def parse_day_partition(name: str) -> date | None:
+    if (m := _DAY_PARTITION_PATTERN.match(name)) is None:
+        return None
+    return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
 
 
 class SQLAWebhookUserService(SQLAlchemyService[webhooks_models.WebhookUser, int]):
@@ -12,3 +44,127 @@ class SQLAWebhookEndpointService(SQLAlchemyService[webhooks_models.WebhookEndpoi
 
 class SQLAWebhookEventService(SQLAlchemyService[webhooks_models.WebhookEvent, int]):
     model = webhooks_models.WebhookEvent
+
+    async def create_partitions(self, partitions: Iterable[Partition]) -> list[str]:
+        """
+        Creates missing daily partitions, returns names of the created ones
+        """
+        with sql_error_handler():
+            created = await create_partitions(self.session, "webhook_events", "created_at", partitions)
+            await self.session.commit()
+            return created
+
+    async def drop_partitions_before(self, day: date) -> list[str]:
+        """
+        Drops daily partitions of days before `day` and deletes rows of those days left in the default one,
+        returns names of the dropped partitions
+        """
+        with sql_error_handler():
+            dropped = sorted(
+                name
+                for name in await list_partitions(self.session, "webhook_events")
+                if (partition_day := parse_day_partition(name)) is not None and partition_day < day
+            )
+            await drop_partitions(self.session, dropped)
+            # every partition left starts at `day` or later, only the default one is scanned
+            await self.session.execute(
+                delete(webhooks_models.WebhookEvent).where(
+                    webhooks_models.WebhookEvent.created_at < datetime.combine(day, time(), tzinfo=UTC)
+                )
+            )
+            await self.session.commit()
+            return dropped
+
+    async def rollup_day(self, day: date) -> int:
+        """
+        (Re)computes `WebhookEventDailyRollup` rows of `day`, returns the number of endpoints rolled up
+        """
+        event = webhooks_models.WebhookEvent
+        rollup = webhooks_models.WebhookEventDailyRollup
+        start = datetime.combine(day, time(), tzinfo=UTC)
+        is_success = event.type == webhooks_models.WebhookEventType.delivery_success
+
+        select_stmt = (
+            select(
+                literal(day),
+                event.webhook_id,
+                func.count().filter(is_success),
+                func.count().filter(~is_success),
+                func.percentile_cont(0.5).within_group(event.latency_ms),
+                func.percentile_cont(0.95).within_group(event.latency_ms),
+                func.percentile_cont(0.99).within_group(event.latency_ms),
+                literal(utils.utc_now()),
+            )
+            .where(event.created_at >= start, event.created_at < start + timedelta(days=1))
+            .group_by(event.webhook_id)
+        )
+        columns = [
+            rollup.day,
+            rollup.webhook_id,
+            rollup.success_count,
+            rollup.failure_count,
+            rollup.latency_p50_ms,
+            rollup.latency_p95_ms,
+            rollup.latency_p99_ms,
+            rollup.updated_at,
+        ]
+        stmt = insert(rollup).from_select(columns, select_stmt)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[rollup.day, rollup.webhook_id],
+            set_={column.key: stmt.excluded[column.key] for column in columns[2:]},
+        )
+        with sql_error_handler():
+            result = await self.session.execute(stmt)
+            await self.session.commit()
+            return result.rowcount  # type: ignore
+
+
+class SQLAWebhookEventDailyRollupService(SQLAlchemyService[webhooks_models.WebhookEventDailyRollup, tuple[date, int]]):
+    model = webhooks_models.WebhookEventDailyRollup
+
+    async def list_for_endpoint(
+        self,
+        webhook_id: int,
+        date_start: date,
+        date_end: date,
+    ) -> list[webhooks_models.WebhookEventDailyRollup]:
+        """
+        Rollups of `webhook_id` from `date_start` to `date_end`, both inclusive
+        """
+        rollup = webhooks_models.WebhookEventDailyRollup
+        stmt = (
+            select(rollup)
+            .where(rollup.webhook_id == webhook_id, rollup.day >= date_start, rollup.day <= date_end)
+            .order_by(rollup.day.asc())
+        )
+        return await self.list_(statement=stmt)
+
+
+class SQLAWebhookDeadLetterService(SQLAlchemyService[webhooks_models.WebhookDeadLetter, int]):
+    model = webhooks_models.WebhookDeadLetter
+
+    async def list_pending(
+        self,
+        webhook_id: int | None = None,
+        limit: int | None = None,
+    ) -> list[webhooks_models.WebhookDeadLetter]:
+        stmt = (
+            select(webhooks_models.WebhookDeadLetter)
+            .where(webhooks_models.WebhookDeadLetter.replayed_at.is_(None))
+            .order_by(webhooks_models.WebhookDeadLetter.id.asc())
+        )
+        if webhook_id is not None:
+            stmt = stmt.where(webhooks_models.WebhookDeadLetter.webhook_id == webhook_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        return await self.list_(statement=stmt)
+
+    async def list_pending_webhook_ids(self) -> list[int]:
+        stmt = (
+            select(webhooks_models.WebhookDeadLetter.webhook_id)
+            .where(webhooks_models.WebhookDeadLetter.replayed_at.is_(None))
+            .distinct()
+        )
+        with sql_error_handler():
+            return list((await self.session.execute(stmt)).scalars())
@@ -0,0 +1,186 @@
+import asyncio
+import contextlib
+import time
+from typing import NamedTuple
+
+import redis.asyncio as redis
+from loguru import logger
+
+# only the current holder can extend or release the lease
+_RENEW_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlightStats(NamedTuple):
+    runs: int
+    skipped: int
+    held_seconds_total: float
+    held_seconds_last: float | None
+
+
+class Lease:
+    """
+    Held single flight lock, `token` is a fencing token - it grows with every acquisition
+    so a holder whose lease expired can tell it has been superseded
+    """
+
+    token: int
+    acquired_at: float
+    _lock: "SingleFlightLock"
+    _renew_task: asyncio.Task | None
+    _lost: bool
+
+    def __init__(self, lock: "SingleFlightLock", token: int) -> None:
+        self.token = token
+        self.acquired_at = time.monotonic()
+        self._lock = lock
+        self._renew_task = None
+        self._lost = False
+
+    @property
+    def lost(self) -> bool:
+        return self._lost
+
+    async def is_valid(self) -> bool:
+        """
+        Checked before side effects, False once the lease expired or was taken over
+        """
+        if self._lost:
+            return False
+
+        if await self._lock.holder() != self.token:
+            self._lost = True
+
+        return not self._lost
+
+    def start_renewal(self) -> None:
+        self._renew_task = asyncio.create_task(self._renew_loop())
+
+    async def stop_renewal(self) -> None:
+        if self._renew_task is None:
+            return
+
+        self._renew_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._renew_task
+
+    async def _renew_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._lock.lease_seconds / 3)
+            if not await self._lock.renew(self):
+                logger.warning(f"Lost {self._lock.name!r} lease #{self.token}")
+                self._lost = True
+                return
+
+
+class SingleFlightLock:
+    """
+    Redis lock that lets only one run of a job through at a time.
+
+    The lease expires after `lease_seconds` unless renewed, `Lease` renews it in the background
+    while held so a crashed worker doesn't block the job for long. A run that finds the lock taken is
+    skipped and leaves a "run again" flag, `release` returns it so the holder can do one more run
+    instead of every skipped trigger piling up.
+    """
+
+    name: str
+    lease_seconds: float
+    _redis: redis.Redis
+    _key_prefix: str
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        name: str,
+        *,
+        lease_seconds: float,
+        key_prefix: str = "single-flight",
+    ) -> None:
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self._redis = redis_client
+        self._key_prefix = key_prefix
+        self._renew_script = redis_client.register_script(_RENEW_SCRIPT)
+        self._release_script = redis_client.register_script(_RELEASE_SCRIPT)
+
+    @property
+    def _key(self) -> str:
+        return f"{self._key_prefix}:{self.name}"
+
+    @property
+    def _token_key(self) -> str:
+        return f"{self._key_prefix}:{self.name}:token"
+
+    @property
+    def _rerun_key(self) -> str:
+        return f"{self._key_prefix}:{self.name}:rerun"
+
+    @property
+    def _stats_key(self) -> str:
+        return f"{self._key_prefix}:{self.name}:stats"
+
+    @property
+    def _lease_ms(self) -> int:
+        return int(self.lease_seconds * 1000)
+
+    async def acquire(self) -> Lease | None:
+        """
+        Returns None if someone else holds the lock, the run is counted as skipped and a rerun is requested
+        """
+        token = await self._redis.incr(self._token_key)
+        if not await self._redis.set(self._key, token, nx=True, px=self._lease_ms):
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.set(self._rerun_key, 1)
+                pipe.hincrby(self._stats_key, "skipped", 1)
+                await pipe.execute()
+            return None
+
+        # rerun requests made before this run started are covered by it
+        await self._redis.delete(self._rerun_key)
+        lease = Lease(self, token)
+        lease.start_renewal()
+        return lease
+
+    async def holder(self) -> int | None:
+        token = await self._redis.get(self._key)
+        return None if token is None else int(token)
+
+    async def renew(self, lease: Lease) -> bool:
+        return bool(await self._renew_script(keys=[self._key], args=[lease.token, self._lease_ms]))
+
+    async def release(self, lease: Lease) -> bool:
+        """
+        Returns True if a run was skipped while the lease was held and the caller should run again
+        """
+        await lease.stop_renewal()
+        held = time.monotonic() - lease.acquired_at
+        await self._release_script(keys=[self._key], args=[lease.token])
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(self._stats_key, "runs", 1)
+            pipe.hincrbyfloat(self._stats_key, "held_seconds_total", held)
+            pipe.hset(self._stats_key, "held_seconds_last", str(held))
+            pipe.getdel(self._rerun_key)
+            *_, rerun = await pipe.execute()
+
+        return rerun is not None
+
+    async def stats(self) -> SingleFlightStats:
+        data = await self._redis.hgetall(self._stats_key)  # type: ignore
+        return SingleFlightStats(
+            runs=int(data.get("runs", 0)),
+            skipped=int(data.get("skipped", 0)),
+            held_seconds_total=float(data.get("held_seconds_total", 0)),
+            held_seconds_last=float(data["held_seconds_last"]) if "held_seconds_last" in data else None,
+        )
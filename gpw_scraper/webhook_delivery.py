@@ -0,0 +1,304 @@
+import enum
+import json
+import random
+import time
+import uuid
+from collections.abc import Mapping
+from typing import NamedTuple
+
+import redis.asyncio as redis
+
+
+def backoff_delay(job_try: int, *, base: float, max_delay: float) -> float:
+    """
+    Exponential backoff with "equal jitter", half of the delay is fixed and the other half is random
+    so retries of many deliveries that failed at the same time don't hit the endpoint together
+    """
+    ceiling = min(max_delay, base * 2 ** max(job_try - 1, 0))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)  # noqa: S311
+
+
+class CircuitState(enum.StrEnum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class EndpointCircuitBreaker:
+    """
+    Per endpoint circuit breaker kept in redis so every worker shares it.
+
+    After `failure_threshold` consecutive failures the circuit opens and deliveries are not attempted
+    for `open_seconds`, after that a single probe delivery is let through (half open), success closes the circuit,
+    failure opens it again.
+    """
+
+    _redis: redis.Redis
+    _failure_threshold: int
+    _open_seconds: float
+    _key_prefix: str
+    _state_ttl: int
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        *,
+        failure_threshold: int,
+        open_seconds: float,
+        key_prefix: str = "webhook:circuit",
+        state_ttl: int = 60 * 60 * 24,
+    ) -> None:
+        self._redis = redis_client
+        self._failure_threshold = failure_threshold
+        self._open_seconds = open_seconds
+        self._key_prefix = key_prefix
+        self._state_ttl = state_ttl
+
+    def _key(self, endpoint_id: int) -> str:
+        return f"{self._key_prefix}:{endpoint_id}"
+
+    def _probe_key(self, endpoint_id: int) -> str:
+        return f"{self._key_prefix}:{endpoint_id}:probe"
+
+    async def state(self, endpoint_id: int) -> CircuitState:
+        failures, opened_at = await self._redis.hmget(self._key(endpoint_id), ["failures", "opened_at"])  # type: ignore
+        if failures is None or opened_at is None or int(failures) < self._failure_threshold:
+            return CircuitState.closed
+
+        if time.time() - float(opened_at) < self._open_seconds:
+            return CircuitState.open
+
+        return CircuitState.half_open
+
+    async def acquire(self, endpoint_id: int) -> bool:
+        """
+        Returns True if delivery to the endpoint should be attempted
+        """
+        state = await self.state(endpoint_id)
+        if state == CircuitState.closed:
+            return True
+        if state == CircuitState.open:
+            return False
+
+        # half open, only one probe at a time
+        probe_acquired = await self._redis.set(
+            self._probe_key(endpoint_id),
+            1,
+            nx=True,
+            ex=max(int(self._open_seconds), 1),
+        )
+        return bool(probe_acquired)
+
+    async def record_success(self, endpoint_id: int) -> CircuitState:
+        """
+        Closes the circuit, returns state from before the success
+        """
+        state = await self.state(endpoint_id)
+        await self._redis.delete(self._key(endpoint_id), self._probe_key(endpoint_id))
+        return state
+
+    async def record_failure(self, endpoint_id: int) -> CircuitState:
+        """
+        Returns state after the failure
+        """
+        key = self._key(endpoint_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(key, "failures", 1)
+            pipe.expire(key, self._state_ttl)
+            failures, _ = await pipe.execute()
+
+        if int(failures) < self._failure_threshold:
+            return CircuitState.closed
+
+        await self._redis.hset(key, "opened_at", time.time())  # type: ignore
+        await self._redis.delete(self._probe_key(endpoint_id))
+        return CircuitState.open
+
+
+class QueuedDelivery(NamedTuple):
+    endpoint_id: int
+    espi_ebi_id: int
+    delivery_id: str  # unique per delivery, the same report can be queued for an endpoint more than once
+    enqueued_at: float
+    attempt: int = 1
+
+
+class EndpointQueueStats(NamedTuple):
+    depth: int
+    oldest_age: float | None
+    in_flight: int
+
+
+class WebhookDeliveryScheduler:
+    """
+    Per endpoint delivery queues kept in redis.
+
+    Deliveries wait in their endpoint queue until the endpoint has less than `max_in_flight_per_endpoint`
+    deliveries in progress, `next_batch` hands them out round robin between users and between endpoints
+    of the same user, so a slow endpoint can't take every worker slot.
+    """
+
+    _redis: redis.Redis
+    _max_in_flight_per_endpoint: int
+    _in_flight_ttl: float
+    _key_prefix: str
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        *,
+        max_in_flight_per_endpoint: int,
+        in_flight_ttl: float,
+        key_prefix: str = "webhook:queue",
+    ) -> None:
+        self._redis = redis_client
+        self._max_in_flight_per_endpoint = max_in_flight_per_endpoint
+        self._in_flight_ttl = in_flight_ttl
+        self._key_prefix = key_prefix
+
+    def _queue_key(self, endpoint_id: int) -> str:
+        return f"{self._key_prefix}:{endpoint_id}"
+
+    def _in_flight_key(self, endpoint_id: int) -> str:
+        return f"{self._key_prefix}:{endpoint_id}:in-flight"
+
+    @property
+    def _active_key(self) -> str:
+        return f"{self._key_prefix}:active"
+
+    @property
+    def _owners_key(self) -> str:
+        return f"{self._key_prefix}:owners"
+
+    @property
+    def _rotation_key(self) -> str:
+        return f"{self._key_prefix}:rotation"
+
+    @property
+    def _lock_key(self) -> str:
+        return f"{self._key_prefix}:lock"
+
+    async def push(
+        self,
+        endpoint_id: int,
+        user_id: int,
+        espi_ebi_id: int,
+        *,
+        delivery_id: str | None = None,
+        attempt: int = 1,
+    ) -> str:
+        """
+        Queues a delivery, returns its id. A retried delivery is pushed again with its id and next `attempt`
+        """
+        delivery_id = delivery_id or uuid.uuid4().hex
+        entry = json.dumps(
+            {"id": delivery_id, "espi_ebi_id": espi_ebi_id, "enqueued_at": time.time(), "attempt": attempt}
+        )
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(self._queue_key(endpoint_id), entry)
+            pipe.hset(self._owners_key, str(endpoint_id), str(user_id))
+            pipe.sadd(self._active_key, endpoint_id)
+            await pipe.execute()
+
+        return delivery_id
+
+    async def in_flight(self, endpoint_id: int) -> int:
+        key = self._in_flight_key(endpoint_id)
+        await self._redis.zremrangebyscore(key, "-inf", time.time())
+        return await self._redis.zcard(key)
+
+    async def release(self, endpoint_id: int, delivery_id: str) -> None:
+        await self._redis.zrem(self._in_flight_key(endpoint_id), delivery_id)
+
+    async def stats(self, endpoint_id: int) -> EndpointQueueStats:
+        depth = await self._redis.llen(self._queue_key(endpoint_id))  # type: ignore
+        oldest = await self._redis.lindex(self._queue_key(endpoint_id), 0)  # type: ignore
+        oldest_age = time.time() - json.loads(oldest)["enqueued_at"] if isinstance(oldest, str | bytes) else None
+        return EndpointQueueStats(depth=depth, oldest_age=oldest_age, in_flight=await self.in_flight(endpoint_id))
+
+    async def active_endpoint_ids(self) -> list[int]:
+        return sorted(int(endpoint_id) for endpoint_id in await self._redis.smembers(self._active_key))  # type: ignore
+
+    async def next_batch(self, limit: int, *, max_in_flight: Mapping[int, int] | None = None) -> list[QueuedDelivery]:
+        """
+        Pops up to `limit` deliveries and marks them as in flight, caller is expected to
+        `release` every returned delivery once it is done.
+        `max_in_flight` overrides `max_in_flight_per_endpoint` of some endpoints, 0 leaves their deliveries queued.
+        """
+        max_in_flight = max_in_flight or {}
+        lock = self._redis.lock(self._lock_key, timeout=30)
+        if not await lock.acquire(blocking=False):
+            # someone else is handing out deliveries right now
+            return []
+
+        try:
+            endpoint_ids = await self.active_endpoint_ids()
+            if len(endpoint_ids) == 0:
+                return []
+
+            owners = await self._redis.hmget(self._owners_key, [str(endpoint_id) for endpoint_id in endpoint_ids])  # type: ignore
+            endpoints_by_user: dict[int, list[int]] = {}
+            for endpoint_id, user_id in zip(endpoint_ids, owners, strict=True):
+                endpoints_by_user.setdefault(int(user_id or 0), []).append(endpoint_id)
+
+            # rotate start positions every batch so nobody is always first in line
+            rotation = await self._redis.incr(self._rotation_key)
+            users = _rotate(sorted(endpoints_by_user), rotation)
+            for user_id in users:
+                endpoints_by_user[user_id] = _rotate(endpoints_by_user[user_id], rotation)
+
+            in_flight = {endpoint_id: await self.in_flight(endpoint_id) for endpoint_id in endpoint_ids}
+
+            batch: list[QueuedDelivery] = []
+            while len(batch) < limit and any(endpoints_by_user[user_id] for user_id in users):
+                for user_id in users:
+                    if len(batch) >= limit:
+                        break
+
+                    # one delivery per user per round, taken from the user's next endpoint with free capacity
+                    user_endpoints = endpoints_by_user[user_id]
+                    while user_endpoints:
+                        endpoint_id = user_endpoints.pop(0)
+                        if in_flight[endpoint_id] >= max_in_flight.get(endpoint_id, self._max_in_flight_per_endpoint):
+                            continue
+
+                        delivery = await self._pop(endpoint_id)
+                        if delivery is None:
+                            continue
+
+                        in_flight[endpoint_id] += 1
+                        batch.append(delivery)
+                        user_endpoints.append(endpoint_id)
+                        break
+
+            return batch
+        finally:
+            await lock.release()
+
+    async def _pop(self, endpoint_id: int) -> QueuedDelivery | None:
+        entry = await self._redis.lpop(self._queue_key(endpoint_id))  # type: ignore
+        if not isinstance(entry, str | bytes):
+            await self._redis.srem(self._active_key, endpoint_id)  # type: ignore
+            if await self._redis.llen(self._queue_key(endpoint_id)) > 0:  # type: ignore
+                # pushed in the meantime
+                await self._redis.sadd(self._active_key, endpoint_id)  # type: ignore
+            return None
+
+        data = json.loads(entry)
+        # entries queued before deliveries had ids get one here
+        delivery_id = data.get("id") or uuid.uuid4().hex
+        await self._redis.zadd(self._in_flight_key(endpoint_id), {delivery_id: time.time() + self._in_flight_ttl})
+        return QueuedDelivery(
+            endpoint_id=endpoint_id,
+            espi_ebi_id=data["espi_ebi_id"],
+            delivery_id=delivery_id,
+            enqueued_at=data["enqueued_at"],
+            attempt=data.get("attempt", 1),
+        )
+
+
+def _rotate(items: list[int], n: int) -> list[int]:
+    if len(items) == 0:
+        return items
+    n %= len(items)
+    return items[n:] + items[:n]
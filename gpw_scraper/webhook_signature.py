@@ -0,0 +1,59 @@
+"""
+Webhook payload signing, stdlib only so subscribers can copy `verify_signature` as is.
+
+Every webhook request carries two headers:
+    x-webhook-timestamp: unix timestamp of the delivery attempt
+    x-webhook-signature: v1=<hex HMAC-SHA256 of f"{timestamp}." + raw body, keyed with the endpoint secret>
+"""
+
+import hashlib
+import hmac
+import json
+import time
+from typing import Any
+
+TIMESTAMP_HEADER = "x-webhook-timestamp"
+SIGNATURE_HEADER = "x-webhook-signature"
+SIGNATURE_VERSION = "v1"
+
+
+def serialize_payload(payload: dict[str, Any]) -> bytes:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def sign_payload(secret: str, timestamp: int, body: bytes) -> str:
+    digest = hmac.new(secret.encode("utf-8"), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"{SIGNATURE_VERSION}={digest}"
+
+
+def signature_headers(secret: str, body: bytes, timestamp: int | None = None) -> dict[str, str]:
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    return {
+        TIMESTAMP_HEADER: str(timestamp),
+        SIGNATURE_HEADER: sign_payload(secret, timestamp, body),
+    }
+
+
+def verify_signature(
+    secret: str,
+    body: bytes,
+    timestamp: str | int,
+    signature: str,
+    *,
+    tolerance: float = 300,
+    now: float | None = None,
+) -> bool:
+    """
+    `body` must be the raw request body, re-serialized json won't match the signature.
+    Requests older (or newer) than `tolerance` seconds are rejected to limit replays.
+    """
+    try:
+        timestamp = int(timestamp)
+    except ValueError:
+        return False
+
+    now = time.time() if now is None else now
+    if abs(now - timestamp) > tolerance:
+        return False
+
+    return hmac.compare_digest(sign_payload(secret, timestamp, body), signature)
@@ -1,141 +1,777 @@
 import asyncio
-import base64
-from datetime import UTC, datetime
+import time
+import uuid
+from collections import Counter
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
 
 import aiohttp
+import pydantic_core
 import redis.asyncio as redis
-from arq import Retry, create_pool, cron
+from arq import create_pool, cron
+from arq.connections import ArqRedis
 from arq.cron import CronJob
+from arq.worker import func
 from loguru import logger
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from gpw_scraper import http_client, utils, webhook_signature
+from gpw_scraper.company_resolver import CompanyResolver
 from gpw_scraper.config import settings
 from gpw_scraper.databases.db import sessionmaker
 from gpw_scraper.llm import LLMClientManaged, ModelManager
-from gpw_scraper.models.espi_ebi import EspiEbi
-from gpw_scraper.models.webhook import WebhookEndpoint, WebhookEvent, WebhookEventType
+from gpw_scraper.models.espi_ebi import EspiEbi, ScrapeErrorKind
+from gpw_scraper.models.webhook import (
+    WebhookDeadLetter,
+    WebhookDeadLetterReason,
+    WebhookEndpoint,
+    WebhookEvent,
+    WebhookEventType,
+)
+from gpw_scraper.pap_listing_cache import PapListingPageCache
+from gpw_scraper.pap_listing_variants import PapListingVariantCache
+from gpw_scraper.response_cache import ESPI_EBI_ENDPOINT, ResponseCache
+from gpw_scraper.schemas import jobs as jobs_schemas
 from gpw_scraper.schemas.espi_ebi import EspiEbiItem
-from gpw_scraper.scrapers.pap import EspiEbiPapScraper, PapHrefItem
-from gpw_scraper.services.espi_ebi import SQLAEspiEbiService
-from gpw_scraper.services.sqlalchemy import ConflictError
+from gpw_scraper.scrape_cadence import (
+    WARSAW_TZ,
+    ActivityWindow,
+    ScrapeCadence,
+    hourly_arrival_rates,
+    scrape_interval,
+)
+from gpw_scraper.scrape_shards import ScrapeShard, ShardedScrapeRun, ShardTiming, plan_shards
+from gpw_scraper.scrapers.pap import EspiEbiPapScraper, PapHrefItem, parse_node_id
+from gpw_scraper.scrapers.pap_errors import QUARANTINED_KINDS, classify_error
+from gpw_scraper.scrapers.pap_fetch import FetchStrategy, PapFetcher, read_text
+from gpw_scraper.services.backfill import SQLABackfillService, SQLABackfillUnitService
+from gpw_scraper.services.espi_ebi import SQLAEspiEbiQuarantineService, SQLAEspiEbiService, month_partitions
+from gpw_scraper.services.sqlalchemy import ConflictError, NotFoundError
 from gpw_scraper.services.webhook import (
+    SQLAWebhookDeadLetterService,
     SQLAWebhookEndpointService,
     SQLAWebhookEventService,
+    day_partitions,
 )
+from gpw_scraper.single_flight import Lease, SingleFlightLock
+from gpw_scraper.webhook_delivery import (
+    CircuitState,
+    EndpointCircuitBreaker,
+    WebhookDeliveryScheduler,
+    backoff_delay,
+)
+
+SCRAPE_CRON_TIMEOUT = 500
+
+JOB_ARGS_SCHEMAS: dict[str, type[jobs_schemas.JobArgs]] = {
+    "scrape_pap_espi_ebi": jobs_schemas.ScrapePapEspiEbiArgs,
+    "dispatch_send_webhook_tasks": jobs_schemas.DispatchSendWebhookTasksArgs,
+    "send_webhook": jobs_schemas.SendWebhookArgs,
+    "requeue_webhook_delivery": jobs_schemas.RequeueWebhookDeliveryArgs,
+    "replay_webhook_dead_letters": jobs_schemas.ReplayWebhookDeadLettersArgs,
+    "scrape_pap_espi_ebi_sharded": jobs_schemas.ScrapePapEspiEbiShardedArgs,
+    "scrape_pap_hrefs_shard": jobs_schemas.ScrapePapHrefsShardArgs,
+    "merge_pap_hrefs_shards": jobs_schemas.MergePapHrefsShardsArgs,
+    "scrape_pap_items_chunk": jobs_schemas.ScrapePapItemsChunkArgs,
+    "start_backfill": jobs_schemas.StartBackfillArgs,
+    "run_backfill": jobs_schemas.RunBackfillArgs,
+}
+
+
+def job_serializer(data: dict[str, Any]) -> bytes:
+    """
+    json instead of arq's default pickle, arguments of jobs listed in `JOB_ARGS_SCHEMAS`
+    are validated and stored as kwargs
+    """
+    schema = JOB_ARGS_SCHEMAS.get(data["f"])
+    if schema is not None:
+        data = {**data, "a": (), "k": schema.from_call(data["a"], data["k"])}
+
+    # args model is encoded as is, `fallback` covers job results, e.g. exceptions of failed jobs
+    return pydantic_core.to_json(data, by_alias=False, fallback=repr)
+
+
+def job_deserializer(raw: bytes) -> dict[str, Any]:
+    data = pydantic_core.from_json(raw)
+    schema = JOB_ARGS_SCHEMAS.get(data["f"])
+    if schema is not None:
+        # copy of the fields, iterating the model is several times slower
+        data["k"] = dict(schema.model_validate(data["k"]).__dict__)
+
+    return data
+
+
+def get_job_serializers() -> dict[str, Any]:
+    if settings.ARQ_JOB_SERIALIZER == "pickle":
+        return {"job_serializer": None, "job_deserializer": None}
+
+    return {"job_serializer": job_serializer, "job_deserializer": job_deserializer}
+
+
+async def create_arq_pool() -> ArqRedis:
+    return await create_pool(settings.ARQ_REDIS_SETTINGS, **get_job_serializers())
 
 
 async def scrape_pap_espi_ebi(ctx, date_start: datetime, date_end: datetime):
-    pool = await create_pool(settings.ARQ_REDIS_SETTINGS)
-    scraper = EspiEbiPapScraper()
+    await _scrape_pap_espi_ebi(ctx, date_start, date_end)
+
+
+def get_pap_listing_variant_cache(ctx) -> PapListingVariantCache:
+    return PapListingVariantCache(ctx["redis_client"], ttl=settings.PAP_LISTING_VARIANT_TTL)
+
+
+def get_pap_listing_page_cache(ctx) -> PapListingPageCache:
+    return PapListingPageCache(
+        ctx["redis_client"],
+        ttl=settings.PAP_LISTING_CACHE_TTL,
+        past_day_max_age=settings.PAP_LISTING_CACHE_PAST_DAY_MAX_AGE,
+    )
+
+
+def get_pap_scraper(ctx) -> EspiEbiPapScraper:
+    return EspiEbiPapScraper(
+        variant_cache=get_pap_listing_variant_cache(ctx),
+        page_cache=get_pap_listing_page_cache(ctx),
+        company_resolver=ctx.get("company_resolver"),
+        prefetch_depth=settings.PAP_LISTING_PREFETCH_DEPTH,
+        max_page_bytes=settings.PAP_MAX_PAGE_BYTES,
+    )
+
+
+async def record_pap_scraper_stats(ctx, scraper: EspiEbiPapScraper) -> None:
     redis_client: redis.Redis = ctx["redis_client"]
-    pap_session: aiohttp.ClientSession = ctx["pap_session"]
-    openrouter_session: LLMClientManaged = ctx["openrouter_session"]
-    cloudflare_ai_session: LLMClientManaged = ctx["cloudflare_ai_session"]
-    openai_session: LLMClientManaged = ctx["openai_session"]
+    stats = {
+        "listing_pages_fetched": scraper.listing_pages_fetched,
+        "listing_pages_cached": scraper.listing_pages_cached,
+        "listing_pages_unchanged": scraper.listing_pages_unchanged,
+        "listing_bytes_fetched": scraper.listing_bytes_fetched,
+        "listing_prefetches_wasted": scraper.listing_prefetches_wasted,
+        "pages_oversize": scraper.pages_oversize,
+    }
+    logger.info(f"PAP scraper {stats}")
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key, value in stats.items():
+            pipe.hincrby("pap:scraper:stats", key, value)
+        await pipe.execute()
+
+
+def create_pap_fetcher(tracer: http_client.ConnectionTracer | None = None) -> PapFetcher:
+    base_urls = {
+        FetchStrategy.direct: EspiEbiPapScraper.db_source_base_url,
+        FetchStrategy.proxy: EspiEbiPapScraper.url,
+    }
+    sessions = {
+        FetchStrategy(strategy): http_client.create_session(
+            base_urls[FetchStrategy(strategy)],
+            limit=settings.PAP_HTTP_LIMIT,
+            limit_per_host=settings.PAP_HTTP_LIMIT_PER_HOST,
+            keepalive_timeout=settings.PAP_HTTP_KEEPALIVE_TIMEOUT,
+            dns_ttl=settings.PAP_HTTP_DNS_TTL,
+            connect_timeout=settings.PAP_HTTP_CONNECT_TIMEOUT,
+            read_timeout=settings.PAP_HTTP_READ_TIMEOUT,
+            total_timeout=settings.PAP_HTTP_TOTAL_TIMEOUT,
+            tracer=tracer,
+        )
+        for strategy in settings.PAP_FETCH_STRATEGIES
+    }
+    return PapFetcher(sessions, block_cooldown=settings.PAP_FETCH_BLOCK_COOLDOWN)
+
+
+async def record_pap_fetch_stats(ctx) -> None:
+    redis_client: redis.Redis = ctx["redis_client"]
+    pap_session: PapFetcher = ctx["pap_session"]
+    stats = pap_session.pop_stats()
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for strategy, strategy_stats in stats.items():
+            logger.info(
+                f"PAP {strategy!s} fetch: {strategy_stats.requests} requests, "
+                f"{strategy_stats.failure_rate:.1%} failed, {strategy_stats.seconds_avg:.3f}s avg"
+            )
+            pipe.hincrby("pap:fetch:stats", f"{strategy}:requests", strategy_stats.requests)
+            pipe.hincrby("pap:fetch:stats", f"{strategy}:failures", strategy_stats.failures)
+            pipe.hincrbyfloat("pap:fetch:stats", f"{strategy}:seconds_total", strategy_stats.seconds_total)
+
+        if "pap_connection_tracer" in ctx:
+            connections = ctx["pap_connection_tracer"].pop_stats()
+            logger.info(f"PAP connections {connections}, {connections.reuse_rate:.1%} reused")
+            for field, value in connections._asdict().items():
+                pipe.hincrby("pap:fetch:stats", f"connections:{field}", value)
+        await pipe.execute()
+
+
+async def _scrape_pap_espi_ebi(
+    ctx,
+    date_start: datetime,
+    date_end: datetime,
+    lease: Lease | None = None,
+    *,
+    dispatch_webhooks: bool = True,
+) -> int:
+    """
+    Returns number of new entries
+    """
+    scraper = get_pap_scraper(ctx)
+    pap_session: PapFetcher = ctx["pap_session"]
     db_sessionmaker: async_sessionmaker[AsyncSession] = ctx["db_sessionmaker"]
 
     async with db_sessionmaker() as session:
         espi_ebi_service = SQLAEspiEbiService(session=session)
 
-        already_in_db_at_date_range = await espi_ebi_service.list_in_date_range(date_start, date_end)
-        ignore_list = [item.source[item.source.rindex("node") - 1 :] for item in already_in_db_at_date_range]
+        hrefs = await scraper.scrape_hrefs_in_range(pap_session, date_start, date_end)
+        await record_pap_scraper_stats(ctx, scraper)
+        filtered_hrefs = await filter_pap_hrefs(ctx, espi_ebi_service, hrefs, date_start, date_end)
 
-        logger.info(f"{ignore_list=}")
+        return await scrape_pap_items(
+            ctx,
+            espi_ebi_service,
+            filtered_hrefs,
+            lease,
+            dispatch_webhooks=dispatch_webhooks,
+        )
 
-        hrefs = await scraper.scrape_hrefs_in_range(pap_session, date_start, date_end)
 
-        filtered_hrefs: list[PapHrefItem] = []
+async def filter_pap_hrefs(
+    ctx,
+    espi_ebi_service: SQLAEspiEbiService,
+    hrefs: list[PapHrefItem],
+    date_start: datetime,
+    date_end: datetime,
+) -> list[PapHrefItem]:
+    """
+    Drops hrefs already in db, quarantined or being scraped by someone else, marks the rest as in progress
+    """
+    redis_client: redis.Redis = ctx["redis_client"]
 
-        for href_item in hrefs:
-            logger.debug(f"{href_item.href} Checking if item is in ignore list or in progress")
-            if href_item.href not in ignore_list:
-                logger.debug(f"{href_item.href} Not in ignore list")
+    ignore_list = await espi_ebi_service.list_pap_node_ids_in_date_range(date_start, date_end)
+    quarantined = await SQLAEspiEbiQuarantineService(espi_ebi_service.session).list_sources_in_date_range(
+        date_start, date_end
+    )
+    ignore_list.update(node_id for source in quarantined if (node_id := parse_node_id(source)) is not None)
 
-                if (await redis_client.get(href_item.href)) is None:
-                    logger.debug(f"{href_item.href} Not in progress")
-                    await redis_client.set(href_item.href, 1, 600)
-                    filtered_hrefs.append(href_item)
-                else:
-                    logger.debug(f"{href_item.href} Is in progress, skipping")
-            else:
-                logger.debug(f"{href_item.href} Is in ignore list, skipping")
-
-        for task in asyncio.as_completed(
-            [
-                scraper.scrape_item_data(
-                    pap_session,
-                    href,
-                    [openrouter_session, cloudflare_ai_session, openai_session],
-                )
-                for href in filtered_hrefs
-            ]
-        ):
-            item = await task
-            logger.info(f"{item.source} done")
-            logger.info(f"Adding {item.source} to db")
-            try:
-                await espi_ebi_service.create(item, auto_commit=True)
-            except ConflictError as exc:
-                logger.error(str(exc))
-            try:
-                await espi_ebi_service.create(item, auto_commit=True)
-            except ConflictError as exc:
-                logger.error(str(exc))
+    logger.info(f"{len(ignore_list)} hrefs in ignore list")
+
+    filtered_hrefs: list[PapHrefItem] = []
+
+    for href_item in hrefs:
+        logger.debug(f"{href_item.href} Checking if item is in ignore list or in progress")
+        if href_item.node_id not in ignore_list:
+            logger.debug(f"{href_item.href} Not in ignore list")
+
+            claim_key = f"pap:node:{href_item.node_id}"
+            if (await redis_client.get(claim_key)) is None:
+                logger.debug(f"{href_item.href} Not in progress")
+                await redis_client.set(claim_key, 1, 600)
+                filtered_hrefs.append(href_item)
             else:
+                logger.debug(f"{href_item.href} Is in progress, skipping")
+        else:
+            logger.debug(f"{href_item.href} Is in ignore list, skipping")
+
+    return filtered_hrefs
+
+
+def get_response_cache(ctx) -> ResponseCache:
+    return ResponseCache(ctx["redis_client"], ttl=settings.API_RESPONSE_CACHE_TTL)
+
+
+async def scrape_pap_items(
+    ctx,
+    espi_ebi_service: SQLAEspiEbiService,
+    hrefs: list[PapHrefItem],
+    lease: Lease | None = None,
+    *,
+    dispatch_webhooks: bool = True,
+) -> int:
+    """
+    Scrapes and saves items, returns number of new entries
+    """
+    pool: ArqRedis = ctx["redis"]
+    scraper = get_pap_scraper(ctx)
+    pap_session: PapFetcher = ctx["pap_session"]
+    llm_clients: list[LLMClientManaged] = [
+        ctx["openrouter_session"],
+        ctx["cloudflare_ai_session"],
+        ctx["openai_session"],
+    ]
+
+    quarantine_service = SQLAEspiEbiQuarantineService(espi_ebi_service.session)
+
+    async def scrape_item(href_item: PapHrefItem) -> tuple[PapHrefItem, EspiEbi | Exception]:
+        # one bad item doesn't take the rest of the batch down with it
+        try:
+            return href_item, await scraper.scrape_item_data_with_retry(pap_session, href_item, llm_clients)
+        except Exception as exc:
+            return href_item, exc
+
+    new_items = 0
+    failed: Counter[ScrapeErrorKind | None] = Counter()
+    for task in asyncio.as_completed([scrape_item(href) for href in hrefs]):
+        href_item, item = await task
+        if lease is not None and not await lease.is_valid():
+            # another run took over, it will pick up whatever is left
+            logger.warning(f"Scrape lease #{lease.token} lost, not saving {href_item.href}")
+            continue
+
+        if isinstance(item, Exception):
+            kind = classify_error(item)
+            failed[kind] += 1
+            logger.error(f"{href_item.href} failed ({kind}): {item!r}")
+            if kind is not None and kind in QUARANTINED_KINDS:
+                source = EspiEbiPapScraper.db_source_base_url + href_item.href
+                await quarantine_service.quarantine(source, href_item.date, kind, str(item))
+            continue
+
+        logger.info(f"{item.source} done")
+        logger.info(f"Adding {item.source} to db")
+        try:
+            await espi_ebi_service.create(item, auto_commit=True)
+        except ConflictError as exc:
+            logger.error(str(exc))
+        else:
+            new_items += 1
+            await get_response_cache(ctx).bump_version(ESPI_EBI_ENDPOINT)
+            if dispatch_webhooks:
                 await pool.enqueue_job("dispatch_send_webhook_tasks", item.id)
 
+    if failed:
+        logger.warning(f"{failed.total()} of {len(hrefs)} items failed {dict(failed)}")
+
+    await record_pap_scraper_stats(ctx, scraper)
+    await record_pap_fetch_stats(ctx)
+    return new_items
+
+
+async def scrape_pap_espi_ebi_sharded(ctx, date_start: datetime, date_end: datetime, *, dispatch_webhooks: bool = True):
+    """
+    Splits the range into shard jobs so every worker can take a part of it, see `ShardedScrapeRun`
+    """
+    pool: ArqRedis = ctx["redis"]
+    shards = plan_shards(date_start, date_end, heavy_day_stride=settings.SCRAPE_SHARD_HEAVY_DAY_STRIDE)
+    run = ShardedScrapeRun(ctx["redis_client"], uuid.uuid4().hex)
+    await run.start(date_start, date_end, len(shards), dispatch_webhooks=dispatch_webhooks)
+
+    logger.info(f"Sharded scrape {run.run_id} of {date_start} - {date_end}, {len(shards)} shards")
+    for shard in shards:
+        await pool.enqueue_job("scrape_pap_hrefs_shard", run.run_id, shard.day, shard.page_start, shard.page_stride)
+
+    return run.run_id
+
+
+async def scrape_pap_hrefs_shard(ctx, run_id: str, day: date, page_start: int, page_stride: int):
+    pool: ArqRedis = ctx["redis"]
+    run = ShardedScrapeRun(ctx["redis_client"], run_id)
+    shard = ScrapeShard(day, page_start, page_stride)
+
+    scraper = get_pap_scraper(ctx)
+    started = time.perf_counter()
+    hrefs: list[PapHrefItem] = []
+    timing: ShardTiming | None = None
+    try:
+        hrefs = await scraper.scrape_hrefs(
+            ctx["pap_session"],
+            datetime.combine(day, datetime.min.time(), tzinfo=UTC),
+            page_start=page_start,
+            page_stride=page_stride,
+        )
+        timing = ShardTiming(seconds=time.perf_counter() - started, hrefs=len(hrefs))
+    except Exception as exc:
+        # failed shard doesn't hold back the rest of the run
+        logger.error(f"Shard {shard.key} of {run_id} failed: {exc!s}")
+        timing = ShardTiming(seconds=time.perf_counter() - started, hrefs=0, error=str(exc))
+    finally:
+        # neither does a cancelled or timed out one, it's recorded before the cancellation goes on
+        if timing is None:
+            logger.error(f"Shard {shard.key} of {run_id} was cancelled")
+            timing = ShardTiming(seconds=time.perf_counter() - started, hrefs=0, error="cancelled")
+
+        logger.info(f"Shard {shard.key} of {run_id} {timing}")
+        await record_pap_scraper_stats(ctx, scraper)
+        await record_pap_fetch_stats(ctx)
+        if await run.record_shard(shard, hrefs, timing):
+            await pool.enqueue_job("merge_pap_hrefs_shards", run_id)
+
+
+async def merge_pap_hrefs_shards(ctx, run_id: str):
+    pool: ArqRedis = ctx["redis"]
+    run = ShardedScrapeRun(ctx["redis_client"], run_id)
+
+    timings = await run.timings()
+    for key, timing in sorted(timings.items(), key=lambda kv: kv[1].seconds, reverse=True):
+        logger.info(f"Shard {key} of {run_id} {timing}")
+
+    date_start, date_end = await run.date_range()
+    hrefs = await run.hrefs()
+    db_sessionmaker: async_sessionmaker[AsyncSession] = ctx["db_sessionmaker"]
+    async with db_sessionmaker() as session:
+        filtered_hrefs = await filter_pap_hrefs(ctx, SQLAEspiEbiService(session), hrefs, date_start, date_end)
+
+    logger.info(f"Sharded scrape {run_id} found {len(hrefs)} hrefs, {len(filtered_hrefs)} new")
+    dispatch_webhooks = (await run.meta()).get("dispatch_webhooks", True)
+    chunk_size = settings.SCRAPE_SHARD_ITEMS_PER_JOB
+    for i in range(0, len(filtered_hrefs), chunk_size):
+        await pool.enqueue_job(
+            "scrape_pap_items_chunk",
+            filtered_hrefs[i : i + chunk_size],
+            dispatch_webhooks=dispatch_webhooks,
+        )
+
+
+async def scrape_pap_items_chunk(ctx, hrefs: list[PapHrefItem], *, dispatch_webhooks: bool = True) -> int:
+    db_sessionmaker: async_sessionmaker[AsyncSession] = ctx["db_sessionmaker"]
+    async with db_sessionmaker() as session:
+        return await scrape_pap_items(ctx, SQLAEspiEbiService(session), hrefs, dispatch_webhooks=dispatch_webhooks)
+
+
+def get_scrape_lock(ctx) -> SingleFlightLock:
+    return SingleFlightLock(
+        ctx["redis_client"], "scrape-pap-espi-ebi", lease_seconds=settings.SCRAPE_LOCK_LEASE_SECONDS
+    )
+
+
+async def get_scrape_arrival_rates(ctx, cadence: ScrapeCadence) -> dict[tuple[bool, int], float]:
+    arrival_rates = await cadence.get_arrival_rates()
+    if arrival_rates is not None:
+        return arrival_rates
+
+    # espi ebi dates are naive Warsaw time
+    until = datetime.now(tz=WARSAW_TZ).replace(tzinfo=None)
+    since = until - timedelta(days=settings.SCRAPE_ARRIVAL_RATE_DAYS)
+    db_sessionmaker: async_sessionmaker[AsyncSession] = ctx["db_sessionmaker"]
+    async with db_sessionmaker() as session:
+        counts = await SQLAEspiEbiService(session).count_by_weekend_and_hour(since)
+
+    arrival_rates = hourly_arrival_rates(counts, since, until)
+    await cadence.set_arrival_rates(arrival_rates, ttl=60 * 60 * 24)
+    return arrival_rates
+
 
 async def cron_scrape_pap_espi_ebi(ctx):
-    await scrape_pap_espi_ebi(ctx, datetime.now(tz=UTC), datetime.now(tz=UTC))
+    cadence = ScrapeCadence(ctx["redis_client"])
+    started_at = datetime.now(tz=UTC)
+    if not await cadence.claim(started_at, hold=SCRAPE_CRON_TIMEOUT):
+        return
+
+    lock = get_scrape_lock(ctx)
+    new_items = 0
+
+    try:
+        for _ in range(settings.SCRAPE_LOCK_MAX_RERUNS + 1):
+            lease = await lock.acquire()
+            if lease is None:
+                logger.info("Scrape is already running, asked it to run again once done")
+                return
+
+            try:
+                new_items += await _scrape_pap_espi_ebi(ctx, datetime.now(tz=UTC), datetime.now(tz=UTC), lease)
+            finally:
+                rerun = await lock.release(lease)
+
+            if not rerun:
+                break
+
+            logger.info("Scrape was triggered while running, running again")
+    except BaseException:
+        # failed or timed out, retry soon instead of waiting out the claim hold
+        await cadence.record_failure(datetime.now(tz=UTC), settings.SCRAPE_FAILURE_RETRY_SECONDS)
+        raise
+
+    logger.info(f"Scrape lock {await lock.stats()}")
+    logger.info(f"PAP listing variants usage {await get_pap_listing_variant_cache(ctx).usage()}")
+    cache_stats = await get_response_cache(ctx).stats(ESPI_EBI_ENDPOINT)
+    logger.info(
+        f"API {ESPI_EBI_ENDPOINT} response cache {cache_stats}, hit ratio {cache_stats.hit_ratio:.2f},"
+        f" avg hit {cache_stats.hit_seconds_avg * 1000:.1f}ms, avg miss {cache_stats.miss_seconds_avg * 1000:.1f}ms"
+    )
+
+    empty_runs = 0 if new_items > 0 else await cadence.empty_runs() + 1
+    interval = scrape_interval(
+        datetime.now(tz=UTC),
+        await get_scrape_arrival_rates(ctx, cadence),
+        empty_runs,
+        peak_windows=[ActivityWindow.parse(window) for window in settings.SCRAPE_PEAK_WINDOWS],
+        peak_interval=settings.SCRAPE_PEAK_INTERVAL,
+        min_interval=settings.SCRAPE_INTERVAL_MIN,
+        max_interval=settings.SCRAPE_INTERVAL_MAX,
+        target_items=settings.SCRAPE_TARGET_ITEMS_PER_RUN,
+    )
+    await cadence.record_run(started_at, new_items, interval)
+    logger.info(f"Scrape found {new_items} new entries ({empty_runs} empty runs in a row), next in {interval:.0f}s")
+
+
+async def start_backfill(ctx, date_start: datetime, date_end: datetime) -> int:
+    db_sessionmaker: async_sessionmaker[AsyncSession] = ctx["db_sessionmaker"]
+    async with db_sessionmaker() as session:
+        # past months get their partitions before anything lands in the default one
+        await SQLAEspiEbiService(session).create_partitions(month_partitions(date_start.date(), date_end.date()))
+        backfill = await SQLABackfillService(session).create_with_units(date_start, date_end)
+
+    logger.info(f"Backfill #{backfill.id} of {backfill.date_start} - {backfill.date_end} created")
+    await enqueue_backfill_runs(ctx, backfill.id)
+    return backfill.id
+
+
+async def enqueue_backfill_runs(ctx, backfill_id: int, *, count: int | None = None, defer_by: float | None = None):
+    pool: ArqRedis = ctx["redis"]
+    for _ in range(settings.BACKFILL_PARALLELISM if count is None else count):
+        await pool.enqueue_job(
+            "run_backfill",
+            backfill_id,
+            _queue_name=settings.BACKFILL_QUEUE_NAME,
+            _defer_by=defer_by,
+        )
+
+
+async def run_backfill(ctx, backfill_id: int):
+    """
+    Runs a single day of the backfill and enqueues itself for the next one, every day is its own job
+    so a crash or a timeout only loses the day in progress
+    """
+    if await get_scrape_lock(ctx).holder() is not None:
+        # live scrape goes first
+        logger.debug(f"Scrape in progress, backfill #{backfill_id} waits")
+        await enqueue_backfill_runs(ctx, backfill_id, count=1, defer_by=settings.BACKFILL_YIELD_SECONDS)
+        return
+
+    db_sessionmaker: async_sessionmaker[AsyncSession] = ctx["db_sessionmaker"]
+    async with db_sessionmaker() as session:
+        unit_service = SQLABackfillUnitService(session)
+        unit = await unit_service.claim(backfill_id, lease_seconds=settings.BACKFILL_UNIT_LEASE_SECONDS)
+        if unit is None:
+            status = await SQLABackfillService(session).refresh_status(backfill_id)
+            logger.info(f"Backfill #{backfill_id} has nothing left to claim, {status=!s}")
+            return
+
+        day = datetime.combine(unit.day, datetime.min.time(), tzinfo=UTC)
+        logger.info(f"Backfill #{backfill_id} scraping {unit.day} (attempt {unit.attempts})")
+        try:
+            items_created = await _scrape_pap_espi_ebi(ctx, day, day, dispatch_webhooks=False)
+        except Exception as exc:
+            logger.error(f"Backfill #{backfill_id} {unit.day} failed: {exc!s}")
+            await unit_service.fail(unit, str(exc), max_attempts=settings.BACKFILL_UNIT_MAX_ATTEMPTS)
+        else:
+            await unit_service.finish(unit, items_created)
+
+    await enqueue_backfill_runs(ctx, backfill_id, count=1)
+
+
+async def cron_resume_backfills(ctx):
+    """
+    Tops up backfill job chains, e.g. ones that died with the worker, to `BACKFILL_PARALLELISM`
+    """
+    pool: ArqRedis = ctx["redis"]
+    queued = Counter(
+        jobs_schemas.RunBackfillArgs.from_call(job.args, job.kwargs).backfill_id
+        for job in await pool.queued_jobs(queue_name=settings.BACKFILL_QUEUE_NAME)
+        if job.function == "run_backfill"
+    )
+
+    db_sessionmaker: async_sessionmaker[AsyncSession] = ctx["db_sessionmaker"]
+    async with db_sessionmaker() as session:
+        backfill_service = SQLABackfillService(session)
+        unit_service = SQLABackfillUnitService(session)
+        for backfill in await backfill_service.list_unfinished():
+            progress = await backfill_service.progress(backfill.id)
+            logger.info(f"Backfill #{backfill.id} {progress}")
+
+            missing = (
+                settings.BACKFILL_PARALLELISM - queued[backfill.id] - await unit_service.count_in_progress(backfill.id)
+            )
+            if missing > 0:
+                await enqueue_backfill_runs(ctx, backfill.id, count=missing)
 
 
 async def dispatch_send_webhook_tasks(ctx, espi_ebi_entry_id: int):
-    pool = await create_pool(settings.ARQ_REDIS_SETTINGS)
+    scheduler = get_webhook_delivery_scheduler(ctx)
     db_sessionmaker: async_sessionmaker[AsyncSession] = ctx["db_sessionmaker"]
 
     async with db_sessionmaker() as session:
         espi_ebi_service = SQLAEspiEbiService(session)
         endpoint_service = SQLAWebhookEndpointService(session)
 
-        espi_ebi = await espi_ebi_service.get(id=espi_ebi_entry_id)
         endpoints = await endpoint_service.list_()
         logger.info(f"Queuing {len(endpoints)} webhook messages to be sent")
+        if len(endpoints) > 0:
+            # serialized once here, every endpoint delivery reuses the same bytes
+            await get_webhook_payload(ctx["redis"], espi_ebi_service, espi_ebi_entry_id)
+
         for endpoint in endpoints:
-            logger.error(settings.ENVIRONMENT.is_qa)
-            await pool.enqueue_job("send_webhook", espi_ebi, endpoint, dry_run=settings.ENVIRONMENT.is_qa)
+            await scheduler.push(endpoint.id, endpoint.user_id, espi_ebi_entry_id)
+
+    await drain_webhook_queues(ctx)
+
+
+async def get_webhook_payload(
+    redis_client: redis.Redis,
+    espi_ebi_service: SQLAEspiEbiService,
+    espi_ebi_id: int,
+) -> bytes:
+    key = f"webhook:payload:{espi_ebi_id}"
+    payload = await redis_client.get(key)
+    if payload is not None:
+        return payload.encode("utf-8") if isinstance(payload, str) else payload
+
+    espi_ebi = await espi_ebi_service.get(id=espi_ebi_id)
+    payload = webhook_signature.serialize_payload(
+        EspiEbiItem.model_validate(espi_ebi).model_dump(mode="json", by_alias=True)
+    )
+    await redis_client.set(key, payload, ex=int(settings.WEBHOOK_IN_FLIGHT_TTL) * settings.WEBHOOK_MAX_TRIES)
+    return payload
+
 
+def get_webhook_delivery_scheduler(ctx) -> WebhookDeliveryScheduler:
+    return WebhookDeliveryScheduler(
+        ctx["redis"],
+        max_in_flight_per_endpoint=settings.WEBHOOK_MAX_IN_FLIGHT_PER_ENDPOINT,
+        in_flight_ttl=settings.WEBHOOK_IN_FLIGHT_TTL,
+    )
+
+
+async def drain_webhook_queues(ctx) -> int:
+    scheduler = get_webhook_delivery_scheduler(ctx)
+    circuit_breaker = get_webhook_circuit_breaker(ctx)
+
+    # deliveries to endpoints with an open circuit stay queued, a half open one gets a single probe
+    max_in_flight: dict[int, int] = {}
+    for endpoint_id in await scheduler.active_endpoint_ids():
+        state = await circuit_breaker.state(endpoint_id)
+        if state != CircuitState.closed:
+            max_in_flight[endpoint_id] = 0 if state == CircuitState.open else 1
+
+    deliveries = await scheduler.next_batch(settings.WEBHOOK_SCHEDULER_BATCH_SIZE, max_in_flight=max_in_flight)
+    if len(deliveries) == 0:
+        return 0
+
+    logger.info(f"Enqueuing {len(deliveries)} webhook deliveries")
+    for delivery in deliveries:
+        await ctx["redis"].enqueue_job(
+            "send_webhook",
+            delivery.espi_ebi_id,
+            delivery.endpoint_id,
+            delivery_id=delivery.delivery_id,
+            attempt=delivery.attempt,
+            dry_run=settings.ENVIRONMENT.is_qa,
+        )
+
+    return len(deliveries)
+
+
+async def cron_drain_webhook_queues(ctx):
+    scheduler = get_webhook_delivery_scheduler(ctx)
+    await drain_webhook_queues(ctx)
+
+    for endpoint_id in await scheduler.active_endpoint_ids():
+        stats = await scheduler.stats(endpoint_id)
+        logger.info(f"Endpoint #{endpoint_id} delivery queue {stats}")
+
+
+def get_webhook_circuit_breaker(ctx) -> EndpointCircuitBreaker:
+    return EndpointCircuitBreaker(
+        ctx["redis"],
+        failure_threshold=settings.WEBHOOK_CIRCUIT_FAILURE_THRESHOLD,
+        open_seconds=settings.WEBHOOK_CIRCUIT_OPEN_SECONDS,
+    )
 
-async def send_webhook(ctx, espi_ebi: EspiEbi, endpoint: WebhookEndpoint, *, dry_run: bool = False):
+
+async def send_webhook(
+    ctx,
+    espi_ebi_id: int,
+    endpoint_id: int,
+    *,
+    delivery_id: str | None = None,
+    attempt: int = 1,
+    dry_run: bool = False,
+):
+    """
+    Delivers a report to the endpoint, `delivery_id` is set for deliveries handed out by `WebhookDeliveryScheduler`
+    """
+    try:
+        await _send_webhook(ctx, espi_ebi_id, endpoint_id, delivery_id=delivery_id, attempt=attempt, dry_run=dry_run)
+    finally:
+        # delivery is done or waits for its retry out of the endpoint slot, free it for the next queued one
+        if delivery_id is not None:
+            await get_webhook_delivery_scheduler(ctx).release(endpoint_id, delivery_id)
+        await drain_webhook_queues(ctx)
+
+
+async def requeue_webhook_delivery(
+    ctx,
+    endpoint_id: int,
+    user_id: int,
+    espi_ebi_id: int,
+    *,
+    delivery_id: str,
+    attempt: int,
+):
+    await get_webhook_delivery_scheduler(ctx).push(
+        endpoint_id, user_id, espi_ebi_id, delivery_id=delivery_id, attempt=attempt
+    )
+    await drain_webhook_queues(ctx)
+
+
+async def _send_webhook(  # noqa: PLR0914
+    ctx,
+    espi_ebi_id: int,
+    endpoint_id: int,
+    *,
+    delivery_id: str | None,
+    attempt: int,
+    dry_run: bool,
+):
     if not settings.SEND_WEBHOOK_TASKS_ENABLED:
-        logger.info(f"Webhook tasks are disabled, not sending webhook for {espi_ebi.id} to {endpoint.url!s}")
+        logger.info(f"Webhook tasks are disabled, not sending webhook for {espi_ebi_id} to endpoint #{endpoint_id}")
         return
 
+    circuit_breaker = get_webhook_circuit_breaker(ctx)
     db_sessionmaker: async_sessionmaker[AsyncSession] = ctx["db_sessionmaker"]
     async with db_sessionmaker() as session:
         event_service = SQLAWebhookEventService(session)
-        payload = EspiEbiItem.model_validate(espi_ebi).model_dump(mode="json", by_alias=True)
-        event = WebhookEvent(webhook_id=endpoint.id, espi_ebi_id=espi_ebi.id)
+        dead_letter_service = SQLAWebhookDeadLetterService(session)
+
+        endpoint = await SQLAWebhookEndpointService(session).get_one_or_none(id=endpoint_id)
+        if endpoint is None:
+            logger.info(f"Endpoint #{endpoint_id} no longer exists, not sending espi ebi #{espi_ebi_id}")
+            return
+
+        if not dry_run and not await circuit_breaker.acquire(endpoint.id):
+            # circuit opened after the delivery was handed out, it waits in the queue until the endpoint recovers
+            logger.info(f"Circuit open for endpoint #{endpoint.id}, queuing espi ebi #{espi_ebi_id} again")
+            await get_webhook_delivery_scheduler(ctx).push(
+                endpoint.id, endpoint.user_id, espi_ebi_id, delivery_id=delivery_id, attempt=attempt
+            )
+            return
+
+        try:
+            payload = await get_webhook_payload(ctx["redis"], SQLAEspiEbiService(session), espi_ebi_id)
+        except NotFoundError:
+            logger.info(f"Espi ebi #{espi_ebi_id} no longer exists, not sending it to endpoint #{endpoint.id}")
+            return
+
+        event = WebhookEvent(webhook_id=endpoint.id, espi_ebi_id=espi_ebi_id)
         retry_job = False
 
         async with aiohttp.ClientSession() as client:
             try:
                 if dry_run:
-                    logger.info(f"Would have sent espi ebi #{espi_ebi.id} payload to {endpoint.url!s}")
+                    logger.info(f"Would have sent espi ebi #{espi_ebi_id} payload to {endpoint.url!s}")
                     event.meta = {"dry_run": True}
                     response_status = 200
                 else:
-                    b64_secret = base64.b64encode(endpoint.secret.encode("utf-8")).decode("utf-8")
+                    started = time.perf_counter()
                     # TODO: .post should be used as context manager
                     response = await client.post(
                         endpoint.url,
-                        json=payload,
+                        data=payload,
                         headers={
                             "user-agent": "gpw-scraper webhook",
-                            "x-webhook-secret": b64_secret,
+                            "content-type": "application/json",
+                            **webhook_signature.signature_headers(endpoint.secret, payload),
                         },
                         timeout=aiohttp.ClientTimeout(60),
                     )
-                    response_text = await response.text()
+                    # only the start of the body is kept, endpoints can answer with anything
+                    response_body = await read_text(response, max_bytes=settings.WEBHOOK_RESPONSE_TEXT_MAX_BYTES)
+                    event.latency_ms = (time.perf_counter() - started) * 1000
                     response_status = response.status
                     response.raise_for_status()
                     response_status = response.status
@@ -147,7 +783,8 @@ async def send_webhook(ctx, espi_ebi: EspiEbi, endpoint: WebhookEndpoint, *, dry
                 event.meta = {
                     "exception_type": type(exc).__name__,
                     # mute unbound error because of aiohttp weirdness if not used as context manager
-                    "response_text": response_text,  # type: ignore
+                    "response_text": response_body.text,  # type: ignore
+                    "response_text_truncated": response_body.oversize,  # type: ignore
                     "exception": str(exc),
                 }
             except aiohttp.ClientError as exc:
@@ -174,9 +811,133 @@ async def send_webhook(ctx, espi_ebi: EspiEbi, endpoint: WebhookEndpoint, *, dry
                 logger.debug(f"Saving webhook event {event!r}")
                 await event_service.create(event, auto_commit=True)
 
-                if retry_job:
-                    logger.info(f"Retrying job for #{espi_ebi.id}")
-                    raise Retry(defer=ctx["job_try"] * 5)
+        if dry_run:
+            return
+
+        if not retry_job:
+            previous_state = await circuit_breaker.record_success(endpoint.id)
+            if previous_state != CircuitState.closed:
+                logger.info(f"Endpoint #{endpoint.id} recovered, replaying its dead letters")
+                await ctx["redis"].enqueue_job("replay_webhook_dead_letters", endpoint.id)
+            return
+
+        circuit_state = await circuit_breaker.record_failure(endpoint.id)
+        if circuit_state == CircuitState.closed and attempt < settings.WEBHOOK_MAX_TRIES:
+            defer = backoff_delay(attempt, base=settings.WEBHOOK_BACKOFF_BASE, max_delay=settings.WEBHOOK_BACKOFF_MAX)
+            logger.info(f"Retrying delivery of #{espi_ebi_id} in {defer:.1f}s")
+            # endpoint slot is not held through the backoff, the delivery queues up again after it
+            await ctx["redis"].enqueue_job(
+                "requeue_webhook_delivery",
+                endpoint.id,
+                endpoint.user_id,
+                espi_ebi_id,
+                delivery_id=delivery_id or uuid.uuid4().hex,
+                attempt=attempt + 1,
+                _defer_by=defer,
+            )
+            return
+
+        reason = (
+            WebhookDeadLetterReason.circuit_open
+            if circuit_state == CircuitState.open
+            else WebhookDeadLetterReason.retries_exhausted
+        )
+        logger.info(f"Dead lettering espi ebi #{espi_ebi_id} for endpoint #{endpoint.id}, {reason=!s}")
+        await dead_letter_service.create(
+            WebhookDeadLetter(
+                webhook_id=endpoint.id,
+                espi_ebi_id=espi_ebi_id,
+                reason=reason,
+                attempts=attempt,
+            ),
+            auto_commit=True,
+        )
+
+
+async def replay_webhook_dead_letters(ctx, endpoint_id: int | None = None, limit: int | None = None):
+    scheduler = get_webhook_delivery_scheduler(ctx)
+    db_sessionmaker: async_sessionmaker[AsyncSession] = ctx["db_sessionmaker"]
+
+    async with db_sessionmaker() as session:
+        dead_letter_service = SQLAWebhookDeadLetterService(session)
+        endpoint_service = SQLAWebhookEndpointService(session)
+
+        dead_letters = await dead_letter_service.list_pending(webhook_id=endpoint_id, limit=limit)
+        if len(dead_letters) == 0:
+            return
+
+        endpoint_by_id = {
+            item.id: item
+            for item in await endpoint_service.list_(
+                statement=select(WebhookEndpoint).where(WebhookEndpoint.id.in_({dl.webhook_id for dl in dead_letters}))
+            )
+        }
+
+        logger.info(f"Replaying {len(dead_letters)} dead letters")
+        for dead_letter in dead_letters:
+            await scheduler.push(
+                dead_letter.webhook_id,
+                endpoint_by_id[dead_letter.webhook_id].user_id,
+                dead_letter.espi_ebi_id,
+            )
+            dead_letter.replayed_at = utils.utc_now()
+
+        await session.commit()
+
+    await drain_webhook_queues(ctx)
+
+
+async def cron_probe_webhook_endpoints(ctx):
+    circuit_breaker = get_webhook_circuit_breaker(ctx)
+    db_sessionmaker: async_sessionmaker[AsyncSession] = ctx["db_sessionmaker"]
+
+    async with db_sessionmaker() as session:
+        endpoint_ids = await SQLAWebhookDeadLetterService(session).list_pending_webhook_ids()
+
+    for endpoint_id in endpoint_ids:
+        state = await circuit_breaker.state(endpoint_id)
+        logger.debug(f"Endpoint #{endpoint_id} circuit {state=!s}")
+        if state != CircuitState.half_open:
+            continue
+
+        # a single dead letter as a probe, the rest is replayed once it succeeds and closes the circuit,
+        # dead letters of endpoints with a closed circuit are only replayed on request
+        await replay_webhook_dead_letters(ctx, endpoint_id, limit=1)
+
+
+async def cron_create_espi_ebi_partitions(ctx):
+    db_sessionmaker: async_sessionmaker[AsyncSession] = ctx["db_sessionmaker"]
+    today = utils.utc_now().date()
+    partitions = month_partitions(today, today + timedelta(days=31 * settings.ESPI_EBI_PARTITIONS_AHEAD_MONTHS))
+
+    async with db_sessionmaker() as session:
+        created = await SQLAEspiEbiService(session).create_partitions(partitions)
+
+    if created:
+        logger.info(f"Created espi_ebi partitions {created}")
+
+
+async def cron_webhook_events_maintenance(ctx):
+    """
+    Rolls up today and yesterday, creates partitions ahead and drops the ones past retention
+    """
+    db_sessionmaker: async_sessionmaker[AsyncSession] = ctx["db_sessionmaker"]
+    today = utils.utc_now().date()
+
+    async with db_sessionmaker() as session:
+        service = SQLAWebhookEventService(session)
+        for day in (today - timedelta(days=1), today):
+            await service.rollup_day(day)
+
+        created = await service.create_partitions(
+            day_partitions(today, today + timedelta(days=settings.WEBHOOK_EVENTS_PARTITIONS_AHEAD_DAYS))
+        )
+        dropped = await service.drop_partitions_before(today - timedelta(days=settings.WEBHOOK_EVENTS_RETENTION_DAYS))
+
+    if created:
+        logger.info(f"Created webhook_events partitions {created}")
+    if dropped:
+        logger.info(f"Dropped webhook_events partitions {dropped}")
 
 
 async def startup(ctx):  # noqa: RUF029
@@ -186,7 +947,8 @@ async def startup(ctx):  # noqa: RUF029
         password=settings.REDIS_PASSWORD,
         decode_responses=True,
     )
-    ctx["pap_session"] = aiohttp.ClientSession(base_url=EspiEbiPapScraper.url)
+    ctx["pap_connection_tracer"] = http_client.ConnectionTracer()
+    ctx["pap_session"] = create_pap_fetcher(ctx["pap_connection_tracer"])
     ctx["openrouter_session"] = LLMClientManaged(
         settings.OPENROUTER_BASE_URL,
         api_key=settings.OPENROUTER_API_KEY,
@@ -215,6 +977,7 @@ async def startup(ctx):  # noqa: RUF029
         ),
     )
     ctx["db_sessionmaker"] = sessionmaker
+    ctx["company_resolver"] = CompanyResolver(sessionmaker, max_size=settings.COMPANY_RESOLVER_CACHE_SIZE)
 
 
 async def shutdown(ctx):
@@ -229,18 +992,77 @@ class WorkerSettings:
     on_startup = startup
     on_shutdown = shutdown
     redis_settings = settings.ARQ_REDIS_SETTINGS
+    job_serializer = get_job_serializers()["job_serializer"]
+    job_deserializer = get_job_serializers()["job_deserializer"]
     max_tries = 3
     retry_jobs = True
-    functions = [scrape_pap_espi_ebi, dispatch_send_webhook_tasks, send_webhook]  # noqa: RUF012
+    functions = [  # noqa: RUF012
+        scrape_pap_espi_ebi,
+        scrape_pap_espi_ebi_sharded,
+        scrape_pap_hrefs_shard,
+        merge_pap_hrefs_shards,
+        scrape_pap_items_chunk,
+        dispatch_send_webhook_tasks,
+        func(send_webhook, max_tries=settings.WEBHOOK_MAX_TRIES),
+        requeue_webhook_delivery,
+        replay_webhook_dead_letters,
+        start_backfill,
+    ]
     cron_jobs: list[CronJob] | None = (
         None
         if settings.ENVIRONMENT.is_qa
         else [
             cron(
                 cron_scrape_pap_espi_ebi,
-                minute=set(range(0, 60, 5)),  # every 5 min
+                second={0, 30},  # checks every 30 sec if a scrape is due, see `ScrapeCadence`
+                max_tries=1,
+                timeout=SCRAPE_CRON_TIMEOUT,
+            ),
+            cron(
+                cron_drain_webhook_queues,  # every minute
                 max_tries=1,
-                timeout=500,
+            ),
+            cron(
+                cron_probe_webhook_endpoints,
+                minute=set(range(2, 60, 5)),  # every 5 min, between scrapes
+                max_tries=1,
+            ),
+            cron(
+                cron_create_espi_ebi_partitions,
+                hour={3},
+                minute={7},
+                max_tries=3,
+            ),
+            cron(
+                cron_webhook_events_maintenance,
+                minute={17},  # hourly, keeps today's rollup fresh
+                max_tries=3,
             ),
         ]
     )
+
+
+class BackfillWorkerSettings:
+    """
+    Backfills run on their own queue so they never take slots of live scraping and webhooks
+    """
+
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = settings.ARQ_REDIS_SETTINGS
+    queue_name = settings.BACKFILL_QUEUE_NAME
+    job_serializer = get_job_serializers()["job_serializer"]
+    job_deserializer = get_job_serializers()["job_deserializer"]
+    max_jobs = settings.BACKFILL_PARALLELISM
+    job_timeout = settings.BACKFILL_UNIT_LEASE_SECONDS
+    max_tries = 1
+    functions = [  # noqa: RUF012
+        run_backfill,
+    ]
+    cron_jobs = [  # noqa: RUF012
+        cron(
+            cron_resume_backfills,
+            minute=set(range(0, 60, 15)),  # every 15 min
+            max_tries=1,
+        ),
+    ]
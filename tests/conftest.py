@@ -5,14 +5,16 @@ import aiohttp
 import httpx
 import pytest
 from aiohttp import web
-from arq import create_pool
 from redis.asyncio import Redis
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from gpw_scraper.api import create_app
 from gpw_scraper.config import settings
 from gpw_scraper.models.base import BaseModel
 from gpw_scraper.scrapers.pap import EspiEbiPapScraper
+from gpw_scraper.scrapers.pap_fetch import FetchStrategy, PapFetcher
+from gpw_scraper.worker import create_arq_pool
 
 
 @pytest.fixture(scope="module")
@@ -26,7 +28,7 @@ def vcr_config():
 
 @pytest.fixture
 async def arq_pool():
-    pool = await create_pool(settings.ARQ_REDIS_SETTINGS)
+    pool = await create_arq_pool()
     return pool
 
 
@@ -43,6 +45,7 @@ async def db_sessionmaker() -> AsyncGenerator[async_sessionmaker[AsyncSession],
     engine = create_async_engine(settings.DB_URL)
 
     async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(BaseModel.metadata.drop_all)
         await conn.run_sync(BaseModel.metadata.create_all)
 
@@ -62,7 +65,7 @@ async def db_session(db_sessionmaker):
 
 @pytest.fixture
 async def pap_test_client():
-    return aiohttp.ClientSession(base_url=EspiEbiPapScraper.url)
+    return PapFetcher({FetchStrategy.proxy: aiohttp.ClientSession(base_url=EspiEbiPapScraper.url)})
 
 
 @pytest.fixture
@@ -0,0 +1,77 @@
+from datetime import date, datetime
+
+from fastapi import status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from gpw_scraper.models.backfill import BackfillStatus
+from gpw_scraper.services.backfill import SQLABackfillService, SQLABackfillUnitService
+
+
+async def test_backfill_units_claim(db_sessionmaker: async_sessionmaker[AsyncSession]):
+    async with db_sessionmaker() as session:
+        backfill = await SQLABackfillService(session).create_with_units(datetime(2024, 7, 20), datetime(2024, 7, 22))
+
+    # parallel workers claim different units, newest day first
+    async with db_sessionmaker() as session_a, db_sessionmaker() as session_b:
+        unit_a = await SQLABackfillUnitService(session_a).claim(backfill.id, lease_seconds=60)
+        unit_b = await SQLABackfillUnitService(session_b).claim(backfill.id, lease_seconds=60)
+        assert unit_a is not None and unit_b is not None
+        assert (unit_a.day, unit_b.day) == (date(2024, 7, 22), date(2024, 7, 21))
+        assert await SQLABackfillUnitService(session_a).count_in_progress(backfill.id) == 2
+
+        await SQLABackfillUnitService(session_a).finish(unit_a, items_created=5)
+        await SQLABackfillUnitService(session_b).fail(unit_b, "boom", max_attempts=2)
+
+    async with db_sessionmaker() as session:
+        backfill_service = SQLABackfillService(session)
+        progress = await backfill_service.progress(backfill.id)
+        assert progress.units_by_status == {
+            BackfillStatus.pending: 2,
+            BackfillStatus.running: 0,
+            BackfillStatus.done: 1,
+            BackfillStatus.failed: 0,
+        }
+        assert progress.items_created == 5
+        assert (await backfill_service.get(id=backfill.id)).status == BackfillStatus.running
+
+        unit_service = SQLABackfillUnitService(session)
+        days = []
+        while (unit := await unit_service.claim(backfill.id, lease_seconds=60)) is not None:
+            days.append(unit.day)
+            await unit_service.fail(unit, "boom", max_attempts=2)
+
+        # failed unit is retried once more, then stays failed
+        assert days == [date(2024, 7, 21), date(2024, 7, 20), date(2024, 7, 20)]
+        assert await backfill_service.refresh_status(backfill.id) == BackfillStatus.failed
+
+
+async def test_backfill_unit_expired_lease_is_reclaimed(db_sessionmaker: async_sessionmaker[AsyncSession]):
+    async with db_sessionmaker() as session:
+        backfill = await SQLABackfillService(session).create_with_units(datetime(2024, 7, 22), datetime(2024, 7, 22))
+        unit_service = SQLABackfillUnitService(session)
+
+        unit = await unit_service.claim(backfill.id, lease_seconds=-1)  # worker died right away
+        assert unit is not None
+
+        unit = await unit_service.claim(backfill.id, lease_seconds=60)
+        assert unit is not None and unit.attempts == 2
+        assert await unit_service.claim(backfill.id, lease_seconds=60) is None
+
+
+async def test_router_get_backfill(db_sessionmaker: async_sessionmaker[AsyncSession], api_client):
+    async with db_sessionmaker() as session:
+        backfill = await SQLABackfillService(session).create_with_units(datetime(2024, 7, 20), datetime(2024, 7, 22))
+
+    response = await api_client.get(f"/api/v1/backfills/{backfill.id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "id": backfill.id,
+        "dateStart": "2024-07-20",
+        "dateEnd": "2024-07-22",
+        "status": "pending",
+        "units": {"pending": 3, "running": 0, "done": 0, "failed": 0},
+        "itemsCreated": 0,
+    }
+
+    response = await api_client.get(f"/api/v1/backfills/{backfill.id + 1}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from gpw_scraper.http_client import ConnectionStats, ConnectionTracer, create_session
+
+
+@pytest.fixture
+async def slow_server(aiohttp_server):
+    async def ok(request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    async def slow(request: web.Request) -> web.Response:
+        await asyncio.sleep(1)
+        return web.Response(text="slow")
+
+    app = web.Application()
+    app.router.add_get("/ok", ok)
+    app.router.add_get("/slow", slow)
+    return await aiohttp_server(app)
+
+
+def session_for(server, tracer: ConnectionTracer | None = None):
+    return create_session(
+        str(server.make_url("")),
+        limit=2,
+        limit_per_host=1,
+        keepalive_timeout=30,
+        dns_ttl=60,
+        connect_timeout=1,
+        read_timeout=0.1,
+        total_timeout=5,
+        tracer=tracer,
+    )
+
+
+async def test_session_reuses_connections(slow_server):
+    tracer = ConnectionTracer()
+    async with session_for(slow_server, tracer) as session:
+        for _ in range(3):
+            async with session.get("/ok") as response:
+                assert await response.text() == "ok"
+
+    stats = tracer.pop_stats()
+    assert (stats.created, stats.reused) == (1, 2)
+    assert tracer.pop_stats() == ConnectionStats()
+
+
+async def test_session_read_timeout(slow_server):
+    async with session_for(slow_server) as session:
+        with pytest.raises(TimeoutError):
+            await session.get("/slow")
@@ -0,0 +1,53 @@
+import re
+
+import pytest
+from aiohttp import web
+
+from gpw_scraper.scrapers.pap_fetch import read_text
+
+PAGE = (
+    "<html><head></head><body><h2>2024-07-22</h2><ul><li>Zażółć gęślą jaźń</li></ul>" + "x" * 10_000 + "</body></html>"
+)
+
+
+@pytest.fixture
+async def page_client(aiohttp_client):
+    async def utf8(request: web.Request) -> web.Response:
+        return web.Response(text=PAGE, content_type="text/html")
+
+    async def meta_charset(request: web.Request) -> web.Response:
+        body = PAGE.replace("<head>", '<head><meta charset="iso-8859-2">').encode("iso-8859-2")
+        return web.Response(body=body, headers={"Content-Type": "text/html"})
+
+    app = web.Application()
+    app.router.add_get("/utf8", utf8)
+    app.router.add_get("/meta-charset", meta_charset)
+    return await aiohttp_client(app)
+
+
+@pytest.mark.parametrize("path", ["/utf8", "/meta-charset"])
+async def test_read_text_detects_encoding(page_client, path: str):
+    page = await read_text(await page_client.get(path), max_bytes=1024 * 1024, chunk_size=1024)
+    assert "Zażółć gęślą jaźń" in page.text
+    assert page.text.endswith("</body></html>")
+    assert not page.oversize
+    assert not page.stopped_early
+
+
+async def test_read_text_max_bytes(page_client):
+    page = await read_text(await page_client.get("/utf8"), max_bytes=2000, chunk_size=512)
+    assert page.oversize
+    assert page.size == 2000
+    assert PAGE.startswith(page.text)
+
+
+@pytest.mark.parametrize("chunk_size", [8, 256])  # match split between chunks, in a single one
+async def test_read_text_stop_at(page_client, chunk_size: int):
+    stop_at = re.compile(r"<h2>2024-07-22</h2>.*?</ul>", re.DOTALL)
+    page = await read_text(
+        await page_client.get("/utf8"), max_bytes=1024 * 1024, chunk_size=chunk_size, stop_at=stop_at
+    )
+    assert page.stopped_early
+    assert not page.oversize
+    assert page.size < len(PAGE.encode())
+    assert "Zażółć gęślą jaźń</li></ul>" in page.text
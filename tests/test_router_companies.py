@@ -0,0 +1,84 @@
+import pytest
+from fastapi import status
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gpw_scraper.company_resolver import CompanyResolver
+from gpw_scraper.models.company import Company
+from gpw_scraper.response_cache import ResponseCache
+from gpw_scraper.services.company import SQLACompanyService, company_key, escape_like
+
+
+@pytest.fixture
+async def companies_db_data(db_session: AsyncSession, redis_conn: Redis) -> list[Company]:
+    names = ["ORLEN SA", "ORANGE POLSKA SA", "PKN ORLEN SA", "ORLEN OIL SP Z O O", "KGHM POLSKA MIEDZ SA", "100% SA"]
+    company_service = SQLACompanyService(db_session)
+    return [await company_service.get_or_create_by_name(name) for name in names]
+
+
+async def test_get_companies_prefix_first(companies_db_data: list[Company], api_client):
+    response = await api_client.get("/api/v1/companies", params={"q": "orlen"})
+    assert response.status_code == status.HTTP_200_OK
+    names = [item["name"] for item in response.json()]
+
+    # prefix matches shortest first, then names with a similar word
+    assert names[:2] == ["ORLEN SA", "ORLEN OIL SP Z O O"]
+    assert "PKN ORLEN SA" in names[2:]
+    assert "KGHM POLSKA MIEDZ SA" not in names
+
+
+async def test_get_companies_short_query(companies_db_data: list[Company], api_client):
+    response = await api_client.get("/api/v1/companies", params={"q": "or", "limit": 1})
+    assert [item["name"] for item in response.json()] == ["ORLEN SA"]
+
+    response = await api_client.get("/api/v1/companies", params={"q": "100%"})
+    assert [item["name"] for item in response.json()] == ["100% SA"]
+
+
+async def test_get_companies_cached(companies_db_data: list[Company], api_client, db_session: AsyncSession):
+    first = (await api_client.get("/api/v1/companies", params={"q": "kghm"})).json()
+    await SQLACompanyService(db_session).get_or_create_by_name("KGHM")
+    second = (await api_client.get("/api/v1/companies", params={"q": "KGHM "})).json()
+
+    assert first == second
+
+
+async def test_response_cache(redis_conn: Redis):
+    cache = ResponseCache(redis_conn, ttl=60)
+    assert await cache.get("companies", {"q": "orlen"}) is None
+
+    await cache.set("companies", {"q": "orlen", "limit": 10}, [{"id": 1, "name": "ORLEN SA"}])
+    assert await cache.get("companies", {"limit": 10, "q": "orlen"}) == [{"id": 1, "name": "ORLEN SA"}]
+    assert 0 < await redis_conn.ttl(cache._key("companies", {"q": "orlen", "limit": 10})) <= 60
+
+
+def test_escape_like():
+    assert escape_like(r"100%_a\b") == r"100\%\_a\\b"
+
+
+@pytest.mark.parametrize(
+    ("name", "key"),
+    [
+        ("ORLEN S.A.", "ORLENSA"),
+        ("Orlen Spółka Akcyjna", "ORLENSA"),
+        ("CI GAMES SPÓŁKA EUROPEJSKA", "CIGAMESSE"),
+        ("Arena.pl SPÓŁKA AKCYJNA", "ARENAPLSA"),
+        ("ORLEN OIL Sp. z o.o.", "ORLENOILSPZOO"),
+    ],
+)
+def test_company_key(name: str, key: str):
+    assert company_key(name) == key
+
+
+async def test_company_resolver(db_sessionmaker, db_session: AsyncSession):
+    resolver = CompanyResolver(db_sessionmaker, max_size=2)
+
+    company_id = await resolver.resolve("ORLEN SPÓŁKA AKCYJNA")
+    assert await resolver.resolve("Orlen S.A.") == company_id
+    assert await resolver.resolve("KGHM POLSKA MIEDZ SA") != company_id
+    assert await resolver.resolve("BIOMASS") != company_id
+
+    companies = await SQLACompanyService(db_session).list_()
+    assert len(companies) == 3
+    # the name it was first seen under stays canonical
+    assert {company.name for company in companies} == {"ORLEN SPÓŁKA AKCYJNA", "KGHM POLSKA MIEDZ SA", "BIOMASS"}
@@ -0,0 +1,233 @@
+import json
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from fastapi import status
+from redis.asyncio import Redis
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gpw_scraper.models.espi_ebi import EntryType, EspiEbi
+from gpw_scraper.response_cache import ESPI_EBI_ENDPOINT, ResponseCache
+from gpw_scraper.routers.espi_ebi import filter_espi_ebi
+from gpw_scraper.schemas.pagination import Cursor
+from gpw_scraper.services.company import SQLACompanyService
+from gpw_scraper.services.sqlalchemy import Explain
+
+
+@pytest.fixture
+async def espi_ebi_db_data(db_session: AsyncSession, redis_conn: Redis) -> list[EspiEbi]:
+    start = datetime(2024, 7, 22, 8, 0)
+    items = [
+        EspiEbi(
+            type=EntryType.ESPI if i % 2 == 0 else EntryType.EBI,
+            title=f"title {i}",
+            description=None,
+            company=f"company {i % 3}",
+            source=f"https://espiebi.pap.pl/node/{i}",
+            parsed_by_llm=None,
+            # pairs of items with the same date, `id` breaks the tie
+            date=start + timedelta(minutes=i // 2),
+        )
+        for i in range(7)
+    ]
+    db_session.add_all(items)
+    await db_session.commit()
+    return items
+
+
+def test_cursor_roundtrip():
+    cursor = Cursor([datetime(2024, 7, 22, 8, 0).isoformat(), 5], before=True)
+    assert Cursor.decode(cursor.encode()) == cursor
+
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        Cursor.decode("not-a-cursor")
+
+
+async def test_get_espi_ebi_cursor_paging(espi_ebi_db_data: list[EspiEbi], api_client):
+    expected = [item.id for item in sorted(espi_ebi_db_data, key=lambda item: (item.date, item.id), reverse=True)]
+
+    pages: list[dict] = []
+    params: dict[str, str | int] = {"paging": "cursor", "limit": 3}
+    while True:
+        response = await api_client.get("/api/v1/espi-ebi", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        pages.append(response.json())
+        if pages[-1]["nextCursor"] is None:
+            break
+        params = {"cursor": pages[-1]["nextCursor"], "limit": 3}
+
+    assert [item["id"] for page in pages for item in page["items"]] == expected
+    assert pages[0]["prevCursor"] is None
+
+    # back from the last page
+    response = await api_client.get("/api/v1/espi-ebi", params={"cursor": pages[-1]["prevCursor"], "limit": 3})
+    data = response.json()
+    assert data["items"] == pages[-2]["items"]
+    assert data["nextCursor"] is not None
+
+
+async def test_get_espi_ebi_cursor_paging_with_filter(espi_ebi_db_data: list[EspiEbi], api_client):
+    response = await api_client.get("/api/v1/espi-ebi", params={"paging": "cursor", "limit": 2, "filter": "ebi"})
+    first = response.json()
+    response = await api_client.get(
+        "/api/v1/espi-ebi", params={"cursor": first["nextCursor"], "limit": 2, "filter": "ebi"}
+    )
+    second = response.json()
+
+    ids = [item["id"] for item in first["items"] + second["items"]]
+    assert ids == sorted((item.id for item in espi_ebi_db_data if item.type == EntryType.EBI), reverse=True)
+    assert second["nextCursor"] is None
+
+
+@pytest.mark.parametrize("params", [{"cursor": "not-a-cursor"}, {"paging": "cursor", "fts": "umowa"}])
+async def test_get_espi_ebi_cursor_bad_request(espi_ebi_db_data: list[EspiEbi], api_client, params: dict[str, str]):
+    response = await api_client.get("/api/v1/espi-ebi", params=params)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize("count", ["exact", "cached"])
+async def test_get_espi_ebi_count(espi_ebi_db_data: list[EspiEbi], api_client, count: str):
+    response = await api_client.get("/api/v1/espi-ebi", params={"count": count, "limit": 3, "filter": "espi"})
+    data = response.json()
+    assert data["total"] == len([item for item in espi_ebi_db_data if item.type == EntryType.ESPI])
+    assert data["hasMore"] is True
+
+    # past the last page
+    response = await api_client.get("/api/v1/espi-ebi", params={"count": count, "limit": 3, "offset": 10})
+    data = response.json()
+    assert data["items"] == []
+    assert data["total"] == len(espi_ebi_db_data)
+    assert data["hasMore"] is False
+
+
+async def test_get_espi_ebi_count_none(espi_ebi_db_data: list[EspiEbi], api_client):
+    response = await api_client.get("/api/v1/espi-ebi", params={"count": "none", "limit": 4})
+    first = response.json()
+    response = await api_client.get("/api/v1/espi-ebi", params={"count": "none", "limit": 4, "offset": 4})
+    second = response.json()
+
+    assert first["total"] is None
+    assert (first["hasMore"], second["hasMore"]) == (True, False)
+    assert first["itemsCount"] + second["itemsCount"] == len(espi_ebi_db_data)
+
+
+async def test_get_espi_ebi_count_estimate(espi_ebi_db_data: list[EspiEbi], api_client):
+    response = await api_client.get("/api/v1/espi-ebi", params={"limit": 3})
+    data = response.json()
+    assert response.status_code == status.HTTP_200_OK
+    assert isinstance(data["total"], int)
+    assert data["hasMore"] is True
+
+
+@pytest.mark.parametrize("count", [None, "estimate", "cached"])
+async def test_get_espi_ebi_fts_count(espi_ebi_db_data: list[EspiEbi], api_client, count: str | None):
+    params = {"fts": "title", "limit": 3, **({"count": count} if count is not None else {})}
+    response = await api_client.get("/api/v1/espi-ebi", params=params)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert isinstance(data["total"], int)
+    if count is None:
+        # filtered, counted exactly instead of estimated
+        assert data["total"] == len(espi_ebi_db_data)
+
+
+def plan_nodes(plan: dict[str, Any]) -> list[str]:
+    return [plan["Node Type"], *(node for child in plan.get("Plans", []) for node in plan_nodes(child))]
+
+
+async def explain(db_session: AsyncSession, stmt: Select[Any]) -> dict[str, Any]:
+    plan = (await db_session.execute(Explain(stmt))).scalar_one()
+    return plan[0]["Plan"]
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"date_start": datetime(2024, 7, 22, 8, 1), "date_end": datetime(2024, 7, 22, 8, 2)},
+        {"espi_or_ebi": EntryType.ESPI},
+        {"espi_or_ebi": EntryType.EBI, "date_start": datetime(2024, 7, 22, 8, 1)},
+        {"company_id": 1},
+    ],
+)
+async def test_espi_ebi_listing_query_plan(
+    espi_ebi_db_data: list[EspiEbi], db_session: AsyncSession, filters: dict[str, Any]
+):
+    # few rows make a seq scan the cheapest, disabling it shows whether an index can serve the query at all
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = await explain(db_session, filter_espi_ebi(**filters).order_by(EspiEbi.date.desc()).limit(25))
+
+    nodes = plan_nodes(plan)
+    assert "Seq Scan" not in nodes, json.dumps(plan)
+    assert "Sort" not in nodes, json.dumps(plan)
+
+
+async def test_espi_ebi_company_query_plan(espi_ebi_db_data: list[EspiEbi], db_session: AsyncSession):
+    # plain index scans would walk the whole date index, only a bitmap scan of a matching index is left
+    await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    await db_session.execute(text("SET LOCAL enable_indexscan = off"))
+    plan = await explain(db_session, filter_espi_ebi(company="%pany 1%").order_by(EspiEbi.date.desc()).limit(25))
+
+    assert "ix_espi_ebi_company_trgm" in json.dumps(plan), json.dumps(plan)
+
+
+async def test_get_espi_ebi_company_id(espi_ebi_db_data: list[EspiEbi], api_client, db_session: AsyncSession):
+    company = await SQLACompanyService(db_session).get_or_create_by_name("company 1")
+    for item in espi_ebi_db_data[:2]:
+        item.company_id = company.id
+    await db_session.commit()
+
+    response = await api_client.get("/api/v1/espi-ebi", params={"company-id": company.id, "count": "exact"})
+    data = response.json()
+    assert data["total"] == 2
+    assert {item["id"] for item in data["items"]} == {item.id for item in espi_ebi_db_data[:2]}
+    assert all(item["companyId"] == company.id for item in data["items"])
+
+
+async def test_get_espi_ebi_cached(
+    espi_ebi_db_data: list[EspiEbi], api_client, db_session: AsyncSession, redis_conn: Redis
+):
+    response_cache = ResponseCache(redis_conn, ttl=60)
+
+    first = await api_client.get("/api/v1/espi-ebi", params={"filter": "espi", "count": "exact"})
+    assert first.headers["X-Cache"] == "MISS"
+    # same query with the default offset spelled out
+    second = await api_client.get("/api/v1/espi-ebi", params={"count": "exact", "filter": "espi", "offset": 0})
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+
+    db_session.add(
+        EspiEbi(
+            type=EntryType.ESPI,
+            title="new",
+            description=None,
+            company="company 0",
+            source="https://espiebi.pap.pl/node/100",
+            parsed_by_llm=None,
+            date=datetime(2024, 7, 23, 8, 0),
+        )
+    )
+    await db_session.commit()
+    assert (
+        await api_client.get("/api/v1/espi-ebi", params={"filter": "espi", "count": "exact"})
+    ).json() == first.json()
+
+    # what the worker does after saving new entries
+    await response_cache.bump_version(ESPI_EBI_ENDPOINT)
+    response = await api_client.get("/api/v1/espi-ebi", params={"filter": "espi", "count": "exact"})
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json()["total"] == first.json()["total"] + 1
+    assert response.json()["items"][0]["title"] == "new"
+
+    stats = await response_cache.stats(ESPI_EBI_ENDPOINT)
+    assert (stats.hits, stats.misses) == (2, 2)
+    assert stats.hit_ratio == pytest.approx(0.5)
+
+
+async def test_get_espi_ebi_company_cache_key(espi_ebi_db_data: list[EspiEbi], api_client):
+    first = await api_client.get("/api/v1/espi-ebi", params={"company": "Company 1", "paging": "cursor"})
+    second = await api_client.get("/api/v1/espi-ebi", params={"company": "company 1", "paging": "cursor"})
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+    assert second.json() == first.json()
@@ -1,3 +1,4 @@
+from datetime import date
 from typing import TypedDict
 
 import pytest
@@ -141,3 +142,61 @@ async def test_router_webhook_delete_endpoint_403_if_not_owner(webhook_db_data,
         headers={"Authorization": f"Bearer {webhook_db_data['users'][0].api_key}"},
     )
     assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+async def test_router_webhook_get_endpoint_queue(webhook_db_data, api_client, redis_conn):
+    response = await api_client.get(
+        f"/api/v1/webhooks/endpoints/{webhook_db_data['endpoints'][0].id}/queue",
+        headers={"Authorization": f"Bearer {webhook_db_data['users'][0].api_key}"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"depth": 0, "oldestAgeSeconds": None, "inFlight": 0}
+
+
+async def test_router_webhook_get_endpoint_queue_403_if_not_owner(webhook_db_data, api_client):
+    response = await api_client.get(
+        f"/api/v1/webhooks/endpoints/{webhook_db_data['endpoints'][1].id}/queue",
+        headers={"Authorization": f"Bearer {webhook_db_data['users'][0].api_key}"},
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+async def test_router_webhook_get_endpoint_stats(webhook_db_data, api_client, db_session: AsyncSession):
+    endpoint_id = webhook_db_data["endpoints"][0].id
+    db_session.add_all(
+        webhook_models.WebhookEventDailyRollup(
+            day=day,
+            webhook_id=endpoint_id,
+            success_count=10,
+            failure_count=1,
+            latency_p50_ms=12.5,
+            latency_p95_ms=40.0,
+            latency_p99_ms=80.0,
+        )
+        for day in (date(2024, 7, 20), date(2024, 7, 21), date(2024, 7, 25))
+    )
+    await db_session.commit()
+
+    response = await api_client.get(
+        f"/api/v1/webhooks/endpoints/{endpoint_id}/stats",
+        params={"date-start": "2024-07-20", "date-end": "2024-07-21"},
+        headers={"Authorization": f"Bearer {webhook_db_data['users'][0].api_key}"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["day"] for item in response.json()] == ["2024-07-20", "2024-07-21"]
+    assert response.json()[0] == {
+        "day": "2024-07-20",
+        "successCount": 10,
+        "failureCount": 1,
+        "latencyP50Ms": 12.5,
+        "latencyP95Ms": 40.0,
+        "latencyP99Ms": 80.0,
+    }
+
+
+async def test_router_webhook_get_endpoint_stats_403_if_not_owner(webhook_db_data, api_client):
+    response = await api_client.get(
+        f"/api/v1/webhooks/endpoints/{webhook_db_data['endpoints'][1].id}/stats",
+        headers={"Authorization": f"Bearer {webhook_db_data['users'][0].api_key}"},
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
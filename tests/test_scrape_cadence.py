@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import pytest
+from redis.asyncio import Redis
+
+from gpw_scraper.scrape_cadence import (
+    WARSAW_TZ,
+    ActivityWindow,
+    ScrapeCadence,
+    hourly_arrival_rates,
+    scrape_interval,
+)
+
+INTERVAL_KWARGS = {
+    "peak_windows": [ActivityWindow.parse("07:55-08:30"), ActivityWindow.parse("16:55-17:45")],
+    "peak_interval": 60,
+    "min_interval": 90,
+    "max_interval": 1800,
+    "target_items": 4,
+}
+
+
+def test_activity_window():
+    window = ActivityWindow.parse("07:55 - 08:30")
+    assert datetime(2024, 7, 22, 7, 55).time() in window
+    assert datetime(2024, 7, 22, 8, 29).time() in window
+    assert datetime(2024, 7, 22, 8, 30).time() not in window
+
+
+def test_hourly_arrival_rates():
+    # 2024-07-15 (monday) - 2024-07-28 (sunday), 10 weekdays and 4 weekend days
+    counts = {(False, 8): 100, (True, 8): 2}
+    rates = hourly_arrival_rates(counts, datetime(2024, 7, 15), datetime(2024, 7, 28))
+    assert rates == {(False, 8): 10.0, (True, 8): 0.5}
+
+
+@pytest.mark.parametrize(
+    ("now", "empty_runs", "expected"),
+    [
+        # monday 8:00 Warsaw (6:00 UTC), peak
+        (datetime(2024, 7, 22, 8, 0, tzinfo=WARSAW_TZ), 0, 60),
+        (datetime(2024, 7, 22, 8, 0, tzinfo=WARSAW_TZ), 5, 60),
+        # same moment as UTC
+        (datetime.fromisoformat("2024-07-22T06:00:00+00:00"), 0, 60),
+        # saturday 8:00 isn't a peak
+        (datetime(2024, 7, 27, 8, 0, tzinfo=WARSAW_TZ), 0, 1800),
+        # 4 items at 48/h -> 5 min
+        (datetime(2024, 7, 22, 10, 0, tzinfo=WARSAW_TZ), 0, 300),
+        (datetime(2024, 7, 22, 10, 0, tzinfo=WARSAW_TZ), 1, 600),
+        (datetime(2024, 7, 22, 10, 0, tzinfo=WARSAW_TZ), 3, 1800),
+        # busy hour is clamped to min interval
+        (datetime(2024, 7, 22, 17, 50, tzinfo=WARSAW_TZ), 0, 90),
+        # no arrivals, max interval
+        (datetime(2024, 7, 22, 3, 0, tzinfo=WARSAW_TZ), 0, 1800),
+    ],
+)
+def test_scrape_interval(now: datetime, empty_runs: int, expected: float):
+    rates = {(False, 10): 48.0, (False, 17): 400.0, (True, 8): 0.0}
+    assert scrape_interval(now, rates, empty_runs, **INTERVAL_KWARGS) == expected
+
+
+async def test_scrape_cadence(redis_conn: Redis):
+    cadence = ScrapeCadence(redis_conn)
+    now = datetime(2024, 7, 22, 10, 0, tzinfo=WARSAW_TZ)
+
+    assert await cadence.claim(now, hold=500)
+    # run in progress
+    assert not await cadence.claim(now.replace(minute=1), hold=500)
+
+    await cadence.record_run(now, 0, 120)
+    assert await cadence.empty_runs() == 1
+    assert not await cadence.claim(now.replace(minute=1), hold=500)
+    assert await cadence.claim(now.replace(minute=2), hold=500)
+
+    await cadence.record_run(now, 3, 120)
+    assert await cadence.empty_runs() == 0
+
+    await cadence.set_arrival_rates({(False, 8): 1.5}, ttl=60)
+    assert await cadence.get_arrival_rates() == {(False, 8): 1.5}
+
+
+async def test_scrape_cadence_failure(redis_conn: Redis):
+    cadence = ScrapeCadence(redis_conn)
+    now = datetime(2024, 7, 22, 10, 0, tzinfo=WARSAW_TZ)
+
+    await cadence.record_run(now, 0, 120)
+    assert await cadence.claim(now.replace(minute=2), hold=500)
+
+    # failed run is retried after `retry_after`, not the claim hold
+    await cadence.record_failure(now.replace(minute=3), 60)
+    assert not await cadence.claim(now.replace(minute=3, second=30), hold=500)
+    assert await cadence.claim(now.replace(minute=4), hold=500)
+    assert await cadence.empty_runs() == 1
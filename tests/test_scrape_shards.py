@@ -0,0 +1,38 @@
+from datetime import date, datetime
+
+from redis.asyncio import Redis
+
+from gpw_scraper.scrape_shards import ScrapeShard, ShardedScrapeRun, ShardTiming, plan_shards
+from gpw_scraper.scrapers.pap import PapHrefItem
+
+
+def test_plan_shards():
+    # friday - sunday
+    shards = plan_shards(datetime(2024, 7, 19), datetime(2024, 7, 21), heavy_day_stride=2)
+    assert shards == [
+        ScrapeShard(date(2024, 7, 19), 0, 2),
+        ScrapeShard(date(2024, 7, 19), 1, 2),
+        ScrapeShard(date(2024, 7, 20), 0, 1),
+        ScrapeShard(date(2024, 7, 21), 0, 1),
+    ]
+
+
+async def test_sharded_scrape_run(redis_conn: Redis):
+    run = ShardedScrapeRun(redis_conn, "run-1")
+    await run.start(datetime(2024, 7, 19), datetime(2024, 7, 19), 2, dispatch_webhooks=False)
+
+    first, second = plan_shards(datetime(2024, 7, 19), datetime(2024, 7, 19), heavy_day_stride=2)
+    item_a = PapHrefItem(href="/node/1", date=datetime(2024, 7, 19, 10, 0))
+    item_b = PapHrefItem(href="/node/2", date=datetime(2024, 7, 19, 9, 0))
+
+    assert not await run.record_shard(first, [item_a, item_b], ShardTiming(seconds=1.5, hrefs=2))
+    # listing moved while paging, same item seen by both shards
+    assert await run.record_shard(second, [item_a], ShardTiming(seconds=0.5, hrefs=1))
+
+    assert await run.hrefs() == [item_b, item_a]
+    assert await run.timings() == {
+        "2024-07-19:0/2": ShardTiming(seconds=1.5, hrefs=2),
+        "2024-07-19:1/2": ShardTiming(seconds=0.5, hrefs=1),
+    }
+    assert await run.date_range() == (datetime(2024, 7, 19), datetime(2024, 7, 19))
+    assert await run.meta() == {"dispatch_webhooks": False}
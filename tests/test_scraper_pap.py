@@ -1,11 +1,123 @@
-from datetime import datetime
+import hashlib
+from datetime import UTC, datetime
 from unittest import mock
 
+import aiohttp
 import pytest
+from aiohttp import web
+from multidict import CIMultiDict
+from redis.asyncio import Redis
 
 from gpw_scraper.llm import LLMClientManaged, ModelManager
+from gpw_scraper.models.espi_ebi import ScrapeErrorKind
+from gpw_scraper.pap_listing_cache import CachedListingPage, PapListingPageCache
+from gpw_scraper.pap_listing_variants import ListingDateVariant, PapListingVariantCache
 from gpw_scraper.schemas.espi_ebi import EspiLLMSummary
-from gpw_scraper.scrapers.pap import EspiEbiPapScraper
+from gpw_scraper.scrapers.pap import EspiEbiPapScraper, PapHrefItem, parse_node_id
+from gpw_scraper.scrapers.pap_errors import ParseError, RetryPolicy, UnsupportedSourceError, classify_error
+from gpw_scraper.scrapers.pap_fetch import FetchStrategy, PapFetcher
+
+LISTING_DAY = "2024-07-22"
+LISTING_PAGES = 5
+LISTING_ITEMS_PER_PAGE = 3
+
+
+def listing_page_html(page: int, *, proxied: bool = True) -> str:
+    """
+    Proxy rewrites hrefs to absolute ones with its params, origin has them relative
+    """
+    href = "https://espiebi-pap-pl.translate.goog/node/{}?_x_tr_sl=en" if proxied else "/node/{}"
+    items = "".join(
+        f'<li><span class="hour">{10 + page}:{i:02}</span><a href="{href.format(page * 100 + i)}">item</a></li>'
+        for i in range(LISTING_ITEMS_PER_PAGE)
+    )
+    return f"<html><body><h2>{LISTING_DAY}</h2><ul>{items}</ul></body></html>"
+
+
+@pytest.fixture
+def pap_listing_app() -> web.Application:
+    """
+    Stand-in for both the origin and the proxy, requests with proxy params get proxy pages.
+    Listing of `LISTING_DAY` with `LISTING_PAGES` pages under `app["listed_under"]` (created, enddate) params,
+    requested listing pages are kept in `app["requests"]`, pages have an ETag if `app["etag"]` is set,
+    origin answers with 403 if `app["direct_blocked"]` is set
+    """
+
+    async def wyszukiwarka(request: web.Request) -> web.Response:
+        proxied = "_x_tr_sl" in request.query
+        if not proxied and request.app["direct_blocked"]:
+            return web.Response(status=403)
+
+        page = int(request.query["page"])
+        date_params = (request.query["created"], request.query["enddate"])
+        request.app["requests"].append((*date_params, page))
+        if date_params != request.app["listed_under"] or page >= LISTING_PAGES:
+            text = "<html><body></body></html>"
+        else:
+            text = listing_page_html(page, proxied=proxied)
+
+        if not request.app["etag"]:
+            return web.Response(text=text, content_type="text/html")
+
+        etag = f'"{hashlib.sha256(text.encode()).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+
+        return web.Response(text=text, content_type="text/html", headers={"ETag": etag})
+
+    app = web.Application()
+    app["requests"] = []
+    app["listed_under"] = (LISTING_DAY, LISTING_DAY)
+    app["etag"] = False
+    app["direct_blocked"] = False
+    app.router.add_get("/wyszukiwarka", wyszukiwarka)
+    return app
+
+
+@pytest.fixture
+async def pap_listing_client(aiohttp_client, pap_listing_app: web.Application) -> PapFetcher:
+    client = await aiohttp_client(pap_listing_app)
+    return PapFetcher({FetchStrategy.direct: client, FetchStrategy.proxy: client}, block_cooldown=60)
+
+
+async def test_scrape_hrefs_page_stride(pap_listing_client, pap_listing_app: web.Application):
+    scraper = EspiEbiPapScraper()
+    dt = datetime(year=2024, month=7, day=22)
+
+    hrefs = await scraper.scrape_hrefs(pap_listing_client, dt)
+    assert len(hrefs) == LISTING_PAGES * LISTING_ITEMS_PER_PAGE
+    assert hrefs[0] == PapHrefItem(href="/node/0", date=datetime(2024, 7, 22, 10, 0))
+
+    shard_0 = await scraper.scrape_hrefs(pap_listing_client, dt, page_start=0, page_stride=2)
+    shard_1 = await scraper.scrape_hrefs(pap_listing_client, dt, page_start=1, page_stride=2)
+    assert {item.href for item in shard_0}.isdisjoint({item.href for item in shard_1})
+    assert sorted(shard_0 + shard_1) == sorted(hrefs)
+
+    pages = [page for *_, page in pap_listing_app["requests"]]
+    # full scan, then shard 0, then shard 1 which also looks at the first page to find listing params
+    assert pages == [0, 1, 2, 3, 4, 5, 0, 2, 4, 6, 0, 1, 3, 5]
+
+
+async def test_scrape_hrefs_ignore_list(pap_listing_client):
+    scraper = EspiEbiPapScraper()
+    dt = datetime(year=2024, month=7, day=22)
+
+    hrefs = await scraper.scrape_hrefs(pap_listing_client, dt, {0, 1})
+    assert len(hrefs) == LISTING_PAGES * LISTING_ITEMS_PER_PAGE - 2
+    assert {item.node_id for item in hrefs}.isdisjoint({0, 1})
+
+
+@pytest.mark.parametrize(
+    ("url", "node_id"),
+    [
+        ("/node/560617", 560617),
+        ("https://espiebi.pap.pl/node/560617", 560617),
+        ("https://espiebi-pap-pl.translate.goog/node/560617?_x_tr_sl=en", 560617),
+        ("https://espiebi.pap.pl/", None),
+    ],
+)
+def test_parse_node_id(url: str, node_id: int | None):
+    assert parse_node_id(url) == node_id
 
 
 @pytest.mark.block_network
@@ -661,3 +773,225 @@ async def test_espi_ebi_pap_scraper_scrape(pap_test_client):
                 for item in items
             }
             assert items_dict == expected
+            assert all(item.pap_node_id == parse_node_id(item.source) for item in items)
+
+
+async def test_scrape_hrefs_direct_falls_back_to_proxy(
+    pap_listing_client: PapFetcher, pap_listing_app: web.Application
+):
+    scraper = EspiEbiPapScraper()
+    dt = datetime(year=2024, month=7, day=22)
+
+    hrefs = await scraper.scrape_hrefs(pap_listing_client, dt)
+    assert len(hrefs) == LISTING_PAGES * LISTING_ITEMS_PER_PAGE
+    stats = pap_listing_client.pop_stats()
+    assert stats.keys() == {FetchStrategy.direct}
+    assert stats[FetchStrategy.direct].failure_rate == 0
+
+    # same hrefs from proxy pages, direct is skipped after it got blocked
+    pap_listing_app["direct_blocked"] = True
+    assert await scraper.scrape_hrefs(pap_listing_client, dt) == hrefs
+    stats = pap_listing_client.pop_stats()
+    assert stats[FetchStrategy.direct] == (1, 1, stats[FetchStrategy.direct].seconds_total)
+    assert stats[FetchStrategy.proxy].requests == LISTING_PAGES + 1
+    assert stats[FetchStrategy.proxy].failures == 0
+
+
+async def test_scrape_hrefs_page_size_cap(pap_listing_client: PapFetcher):
+    dt = datetime(year=2024, month=7, day=22)
+    html = listing_page_html(LISTING_PAGES - 1, proxied=False)  # longest one
+
+    scraper = EspiEbiPapScraper(max_page_bytes=html.index("<h2>"))
+    assert await scraper.scrape_hrefs(pap_listing_client, dt) == []
+    assert scraper.pages_oversize > 0
+
+    # reading stops after the listing section, the rest of the page doesn't count
+    scraper = EspiEbiPapScraper(max_page_bytes=html.index("</ul>") + len("</ul>"))
+    assert len(await scraper.scrape_hrefs(pap_listing_client, dt)) == LISTING_PAGES * LISTING_ITEMS_PER_PAGE
+    assert scraper.pages_oversize == 0
+
+
+@pytest.mark.parametrize("prefetch_depth", [1, 3])
+async def test_scrape_hrefs_prefetch(pap_listing_client, prefetch_depth: int):
+    scraper = EspiEbiPapScraper(prefetch_depth=prefetch_depth)
+    dt = datetime(year=2024, month=7, day=22)
+
+    hrefs = await scraper.scrape_hrefs(pap_listing_client, dt)
+    assert hrefs == await EspiEbiPapScraper().scrape_hrefs(pap_listing_client, dt)
+
+    # pages 0 - 5 are needed, first empty page ends the listing
+    assert scraper.listing_prefetches_wasted == prefetch_depth
+    assert scraper.listing_pages_fetched == LISTING_PAGES + 1 + prefetch_depth
+
+
+@pytest.mark.parametrize("etag", [True, False])
+async def test_scrape_hrefs_page_cache(
+    pap_listing_client, pap_listing_app: web.Application, redis_conn: Redis, *, etag: bool
+):
+    pap_listing_app["etag"] = etag
+    requests = pap_listing_app["requests"]
+    page_cache = PapListingPageCache(redis_conn, ttl=60, past_day_max_age=60)
+    dt = datetime(year=2024, month=7, day=22)
+
+    scraper = EspiEbiPapScraper(page_cache=page_cache)
+    hrefs = await scraper.scrape_hrefs(pap_listing_client, dt)
+    assert hrefs == await EspiEbiPapScraper().scrape_hrefs(pap_listing_client, dt)
+    assert scraper.listing_pages_fetched == LISTING_PAGES + 1
+    requests.clear()
+
+    # past day, served from cache
+    scraper = EspiEbiPapScraper(page_cache=page_cache)
+    assert await scraper.scrape_hrefs(pap_listing_client, dt) == hrefs
+    assert requests == []
+    assert scraper.listing_pages_cached == LISTING_PAGES + 1
+
+    # revalidated like the current day, pages are not parsed again
+    page_cache.past_day_max_age = 0
+    scraper = EspiEbiPapScraper(page_cache=page_cache)
+    with mock.patch.object(scraper, "parse_listing_page") as parse_listing_page:
+        assert await scraper.scrape_hrefs(pap_listing_client, dt) == hrefs
+
+    parse_listing_page.assert_not_called()
+    assert len(requests) == LISTING_PAGES + 1
+    assert scraper.listing_pages_unchanged == LISTING_PAGES + 1
+    assert (scraper.listing_bytes_fetched == 0) is etag
+
+    # listing changed
+    pap_listing_app["listed_under"] = ("2024-07-21", "2024-07-21")
+    scraper = EspiEbiPapScraper(page_cache=page_cache)
+    assert await scraper.scrape_hrefs(pap_listing_client, dt) == []
+    assert scraper.listing_pages_unchanged == 0
+
+
+async def test_scrape_hrefs_page_cache_per_strategy(
+    pap_listing_client: PapFetcher, pap_listing_app: web.Application, redis_conn: Redis
+):
+    pap_listing_app["etag"] = True
+    page_cache = PapListingPageCache(redis_conn, ttl=60, past_day_max_age=0)
+    dt = datetime(year=2024, month=7, day=22)
+
+    hrefs = await EspiEbiPapScraper(page_cache=page_cache).scrape_hrefs(pap_listing_client, dt)
+
+    # proxy pages are cached next to the direct ones, not revalidated against them
+    pap_listing_app["direct_blocked"] = True
+    scraper = EspiEbiPapScraper(page_cache=page_cache)
+    assert await scraper.scrape_hrefs(pap_listing_client, dt) == hrefs
+    assert scraper.listing_pages_unchanged == 0
+
+    # direct validators are still the direct ones
+    pap_listing_app["direct_blocked"] = False
+    pap_listing_client._blocked_until.clear()
+    scraper = EspiEbiPapScraper(page_cache=page_cache)
+    assert await scraper.scrape_hrefs(pap_listing_client, dt) == hrefs
+    assert scraper.listing_pages_unchanged == LISTING_PAGES + 1
+    assert scraper.listing_bytes_fetched == 0
+
+
+@pytest.mark.parametrize(
+    ("fetched_at", "fresh"),
+    [
+        (datetime(2024, 7, 22, 21, 50, tzinfo=UTC), False),  # 23:50 in Warsaw, the day was still going
+        (datetime(2024, 7, 22, 22, 10, tzinfo=UTC), True),  # 00:10 in Warsaw, after the day ended
+    ],
+)
+def test_listing_page_cache_is_fresh_after_warsaw_midnight(fetched_at: datetime, *, fresh: bool):
+    page_cache = PapListingPageCache(mock.Mock(), ttl=60, past_day_max_age=60 * 60)
+    page = CachedListingPage(hrefs=[], content_hash="hash", fetched_at=fetched_at.timestamp())
+
+    # past Warsaw midnight, still the same day in utc
+    with mock.patch("gpw_scraper.utils.utc_now", return_value=datetime(2024, 7, 22, 22, 30, tzinfo=UTC)):
+        assert page_cache.is_fresh(datetime(2024, 7, 22, 22, 0), page) is fresh
+
+
+async def test_scrape_hrefs_remembers_listing_date_variant(
+    pap_listing_client, pap_listing_app: web.Application, redis_conn: Redis
+):
+    variant_cache = PapListingVariantCache(redis_conn, ttl=60)
+    scraper = EspiEbiPapScraper(variant_cache=variant_cache)
+    dt = datetime(year=2024, month=7, day=22)
+    requests = pap_listing_app["requests"]
+    pap_listing_app["listed_under"] = ("2024-07-22", "2024-07-23")
+
+    def first_page_requests() -> list[tuple[str, str]]:
+        return [(created, enddate) for created, enddate, page in requests if page == 0]
+
+    assert len(await scraper.scrape_hrefs(pap_listing_client, dt)) == LISTING_PAGES * LISTING_ITEMS_PER_PAGE
+    assert first_page_requests() == [
+        ("2024-07-22", "2024-07-22"),
+        ("2024-07-23", "2024-07-23"),
+        ("2024-07-22", "2024-07-23"),
+    ]
+    assert await variant_cache.get(dt) == ListingDateVariant.shift_end
+
+    # remembered variant goes first
+    requests.clear()
+    assert len(await scraper.scrape_hrefs(pap_listing_client, dt)) == LISTING_PAGES * LISTING_ITEMS_PER_PAGE
+    assert first_page_requests() == [("2024-07-22", "2024-07-23")]
+
+    # remembered variant stopped working
+    requests.clear()
+    pap_listing_app["listed_under"] = ("2024-07-22", "2024-07-22")
+    assert len(await scraper.scrape_hrefs(pap_listing_client, dt)) == LISTING_PAGES * LISTING_ITEMS_PER_PAGE
+    assert first_page_requests() == [("2024-07-22", "2024-07-23"), ("2024-07-22", "2024-07-22")]
+    assert await variant_cache.get(dt) == ListingDateVariant.same
+
+    assert await variant_cache.usage() == {"shift_end": 2, "same": 1, "probed": 2}
+
+
+@pytest.mark.parametrize(
+    ("exc", "kind"),
+    [
+        (aiohttp.ClientConnectionError(), ScrapeErrorKind.transient),
+        (TimeoutError(), ScrapeErrorKind.transient),
+        (aiohttp.ClientResponseError(mock.Mock(), (), status=502), ScrapeErrorKind.transient),
+        (aiohttp.ClientResponseError(mock.Mock(), (), status=429), ScrapeErrorKind.throttled),
+        (aiohttp.ClientResponseError(mock.Mock(), (), status=404), ScrapeErrorKind.unsupported),
+        (aiohttp.ClientResponseError(mock.Mock(), (), status=410), ScrapeErrorKind.unsupported),
+        (aiohttp.ClientResponseError(mock.Mock(), (), status=400), ScrapeErrorKind.transient),
+        (ParseError("Company name not found"), ScrapeErrorKind.parse),
+        (UnsupportedSourceError("Unexpected source: 'X'"), ScrapeErrorKind.unsupported),
+        (KeyError("bug"), None),
+    ],
+)
+def test_classify_error(exc: Exception, kind: ScrapeErrorKind | None):
+    assert classify_error(exc) == kind
+
+
+async def test_scrape_item_data_with_retry(pap_listing_client: PapFetcher):
+    scraper = EspiEbiPapScraper()
+    href_item = PapHrefItem(href="/node/1", date=datetime(2024, 7, 22, 10, 0))
+    item = mock.Mock()
+    throttled = aiohttp.ClientResponseError(mock.Mock(), (), status=429, headers=CIMultiDict({"Retry-After": "7"}))
+    policies = {
+        ScrapeErrorKind.transient: RetryPolicy(max_attempts=3, base_delay=1, max_delay=10),
+        ScrapeErrorKind.throttled: RetryPolicy(max_attempts=3, base_delay=1, max_delay=10),
+        ScrapeErrorKind.parse: RetryPolicy(max_attempts=1),
+    }
+
+    with (
+        mock.patch.object(scraper, "scrape_item_data", side_effect=[aiohttp.ClientConnectionError(), throttled, item]),
+        mock.patch("asyncio.sleep") as sleep,
+    ):
+        assert await scraper.scrape_item_data_with_retry(pap_listing_client, href_item, [], policies) is item
+
+    assert sleep.call_count == 2
+    assert sleep.call_args_list[1].args[0] == 7  # Retry-After
+
+    # parse errors are not retried
+    with (
+        mock.patch.object(scraper, "scrape_item_data", side_effect=ParseError("Title not found")) as scrape_item_data,
+        mock.patch("asyncio.sleep"),
+        pytest.raises(ParseError),
+    ):
+        await scraper.scrape_item_data_with_retry(pap_listing_client, href_item, [], policies)
+
+    assert scrape_item_data.call_count == 1
+
+    with (
+        mock.patch.object(scraper, "scrape_item_data", side_effect=aiohttp.ClientConnectionError()) as scrape_item_data,
+        mock.patch("asyncio.sleep"),
+        pytest.raises(aiohttp.ClientConnectionError),
+    ):
+        await scraper.scrape_item_data_with_retry(pap_listing_client, href_item, [], policies)
+
+    assert scrape_item_data.call_count == 3
@@ -0,0 +1,54 @@
+import asyncio
+
+from redis.asyncio import Redis
+
+from gpw_scraper.single_flight import SingleFlightLock
+
+
+async def test_single_flight_lock(redis_conn: Redis):
+    lock = SingleFlightLock(redis_conn, "test", lease_seconds=1)
+
+    lease = await lock.acquire()
+    assert lease is not None
+
+    # overlapping run is skipped and asks for a rerun
+    assert await lock.acquire() is None
+    assert await lock.acquire() is None
+
+    # lease is renewed while held
+    await asyncio.sleep(1.5)
+    assert await lease.is_valid()
+
+    assert await lock.release(lease) is True
+
+    stats = await lock.stats()
+    assert stats.runs == 1
+    assert stats.skipped == 2
+    assert stats.held_seconds_last is not None and stats.held_seconds_last >= 1.5
+
+    lease = await lock.acquire()
+    assert lease is not None
+    assert await lock.release(lease) is False
+
+
+async def test_single_flight_lock_fencing_token(redis_conn: Redis):
+    lock = SingleFlightLock(redis_conn, "test", lease_seconds=1)
+
+    first = await lock.acquire()
+    assert first is not None
+    await first.stop_renewal()
+
+    # lease expired without renewal, e.g. worker got stuck
+    await asyncio.sleep(1.1)
+    second = await lock.acquire()
+    assert second is not None
+    assert second.token > first.token
+
+    assert not await first.is_valid()
+    assert await second.is_valid()
+
+    # stale holder can't release the lock of the new one
+    await lock.release(first)
+    assert await lock.holder() == second.token
+    await lock.release(second)
+    assert await lock.holder() is None
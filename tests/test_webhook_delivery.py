@@ -0,0 +1,120 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from redis.asyncio import Redis
+
+from gpw_scraper.webhook_delivery import (
+    CircuitState,
+    EndpointCircuitBreaker,
+    WebhookDeliveryScheduler,
+    backoff_delay,
+)
+
+
+@pytest.mark.parametrize("job_try", [1, 2, 3, 8, 64])
+def test_backoff_delay(job_try: int):
+    ceiling = min(100.0, 5.0 * 2 ** (job_try - 1))
+
+    for _ in range(100):
+        delay = backoff_delay(job_try, base=5.0, max_delay=100.0)
+        assert ceiling / 2 <= delay <= ceiling
+
+
+async def test_endpoint_circuit_breaker(redis_conn: Redis):
+    circuit_breaker = EndpointCircuitBreaker(redis_conn, failure_threshold=2, open_seconds=1)
+
+    assert await circuit_breaker.acquire(1)
+    assert await circuit_breaker.record_failure(1) == CircuitState.closed
+    assert await circuit_breaker.record_failure(1) == CircuitState.open
+    assert not await circuit_breaker.acquire(1)
+
+    # other endpoints are not affected
+    assert await circuit_breaker.acquire(2)
+
+    await asyncio.sleep(1.1)
+
+    assert await circuit_breaker.state(1) == CircuitState.half_open
+    assert await circuit_breaker.acquire(1)
+    assert not await circuit_breaker.acquire(1)  # single probe
+
+    assert await circuit_breaker.record_success(1) == CircuitState.half_open
+    assert await circuit_breaker.state(1) == CircuitState.closed
+    assert await circuit_breaker.acquire(1)
+
+
+async def test_endpoint_circuit_breaker_failed_probe_opens_circuit(redis_conn: Redis):
+    circuit_breaker = EndpointCircuitBreaker(redis_conn, failure_threshold=1, open_seconds=1)
+
+    assert await circuit_breaker.record_failure(1) == CircuitState.open
+
+    await asyncio.sleep(1.1)
+    assert await circuit_breaker.acquire(1)
+    assert await circuit_breaker.record_failure(1) == CircuitState.open
+    assert not await circuit_breaker.acquire(1)
+
+
+async def test_webhook_delivery_scheduler_fair_batches(redis_conn: Redis):
+    scheduler = WebhookDeliveryScheduler(redis_conn, max_in_flight_per_endpoint=2, in_flight_ttl=60)
+    owners = {1: 1, 2: 1, 3: 2}
+
+    # user 1 has a busy endpoint and a quiet one, user 2 has a single endpoint
+    for espi_ebi_id in range(10):
+        await scheduler.push(1, owners[1], espi_ebi_id)
+    await scheduler.push(2, owners[2], 100)
+    await scheduler.push(3, owners[3], 200)
+
+    batch = await scheduler.next_batch(limit=10)
+    assert Counter(delivery.endpoint_id for delivery in batch) == {1: 2, 2: 1, 3: 1}
+    assert owners[batch[0].endpoint_id] != owners[batch[1].endpoint_id]
+    assert [delivery.espi_ebi_id for delivery in batch if delivery.endpoint_id == 1] == [0, 1]
+
+    stats = await scheduler.stats(1)
+    assert stats.depth == 8
+    assert stats.in_flight == 2
+    assert stats.oldest_age is not None and stats.oldest_age >= 0
+
+    # busy endpoint is at its limit, nothing else is queued
+    assert await scheduler.next_batch(limit=10) == []
+
+    await scheduler.release(1, next(delivery.delivery_id for delivery in batch if delivery.espi_ebi_id == 0))
+    batch = await scheduler.next_batch(limit=10)
+    assert [(delivery.endpoint_id, delivery.espi_ebi_id) for delivery in batch] == [(1, 2)]
+
+
+async def test_webhook_delivery_scheduler_max_in_flight_override(redis_conn: Redis):
+    scheduler = WebhookDeliveryScheduler(redis_conn, max_in_flight_per_endpoint=2, in_flight_ttl=60)
+    for endpoint_id in (1, 2, 3):
+        for espi_ebi_id in range(3):
+            await scheduler.push(endpoint_id, endpoint_id, espi_ebi_id)
+
+    # open circuit of 1 keeps its deliveries queued, half open 2 gets a single probe
+    batch = await scheduler.next_batch(limit=10, max_in_flight={1: 0, 2: 1})
+    assert Counter(delivery.endpoint_id for delivery in batch) == {2: 1, 3: 2}
+    assert (await scheduler.stats(1)).depth == 3
+
+    batch = await scheduler.next_batch(limit=10)
+    assert Counter(delivery.endpoint_id for delivery in batch) == {1: 2, 2: 1}
+
+
+async def test_webhook_delivery_scheduler_same_report_twice(redis_conn: Redis):
+    scheduler = WebhookDeliveryScheduler(redis_conn, max_in_flight_per_endpoint=2, in_flight_ttl=60)
+    # e.g. a replayed dead letter and a fresh dispatch of the same report
+    await scheduler.push(1, 1, 100)
+    await scheduler.push(1, 1, 100)
+    await scheduler.push(1, 1, 101)
+
+    first, second = await scheduler.next_batch(limit=10)
+    assert first.delivery_id != second.delivery_id
+    assert await scheduler.in_flight(1) == 2
+
+    # each delivery holds its own slot
+    await scheduler.release(1, first.delivery_id)
+    assert await scheduler.in_flight(1) == 1
+    assert [delivery.espi_ebi_id for delivery in await scheduler.next_batch(limit=10)] == [101]
+
+    # retry keeps the id and counts the attempt
+    await scheduler.release(1, second.delivery_id)
+    assert await scheduler.push(1, 1, 100, delivery_id=second.delivery_id, attempt=2) == second.delivery_id
+    (retried,) = await scheduler.next_batch(limit=10)
+    assert (retried.delivery_id, retried.attempt) == (second.delivery_id, 2)
@@ -0,0 +1,41 @@
+import json
+
+from gpw_scraper.webhook_signature import serialize_payload, sign_payload, signature_headers, verify_signature
+
+
+def test_serialize_payload_is_canonical():
+    assert serialize_payload({"b": 1, "a": "zażółć"}) == serialize_payload({"a": "zażółć", "b": 1})
+    assert serialize_payload({"b": 1, "a": "zażółć"}) == '{"a":"zażółć","b":1}'.encode()
+
+
+def test_verify_signature():
+    body = serialize_payload({"id": 1, "title": "title"})
+    headers = signature_headers("secret", body, timestamp=1_700_000_000)
+
+    assert verify_signature(
+        "secret",
+        body,
+        headers["x-webhook-timestamp"],
+        headers["x-webhook-signature"],
+        now=1_700_000_010,
+    )
+
+
+def test_verify_signature_rejects_tampered_requests():
+    body = serialize_payload({"id": 1, "title": "title"})
+    timestamp = 1_700_000_000
+    signature = sign_payload("secret", timestamp, body)
+
+    # wrong secret
+    assert not verify_signature("not-secret", body, timestamp, signature, now=timestamp)
+    # modified body
+    assert not verify_signature(
+        "secret", serialize_payload({"id": 2, "title": "title"}), timestamp, signature, now=timestamp
+    )
+    # re-serialized body
+    assert not verify_signature("secret", json.dumps(json.loads(body)).encode(), timestamp, signature, now=timestamp)
+    # timestamp moved
+    assert not verify_signature("secret", body, timestamp + 1, signature, now=timestamp)
+    # too old
+    assert not verify_signature("secret", body, timestamp, signature, now=timestamp + 301)
+    assert not verify_signature("secret", body, "not-a-timestamp", signature, now=timestamp)
@@ -1,22 +1,32 @@
-import base64
-from datetime import datetime
+import json
+from datetime import UTC, date, datetime
 from typing import TypedDict
-from unittest.mock import AsyncMock, patch
 
+import pydantic
 import pytest
 from aiohttp import web
 from arq.connections import ArqRedis
 from arq.worker import Worker
 from redis.asyncio import Redis
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from gpw_scraper import webhook_signature
 from gpw_scraper.config import settings
 from gpw_scraper.llm import LLMClientManaged, ModelManager
 from gpw_scraper.models import espi_ebi as espi_ebi_models
 from gpw_scraper.models import webhook as webhook_models
+from gpw_scraper.scrapers.pap import PapHrefItem
+from gpw_scraper.services.espi_ebi import SQLAEspiEbiService, month_partition, month_partitions
+from gpw_scraper.services.sqlalchemy import ConflictError
+from gpw_scraper.services.webhook import SQLAWebhookEventService, day_partitions, parse_day_partition
 from gpw_scraper.worker import (
     dispatch_send_webhook_tasks,
+    get_job_serializers,
+    job_deserializer,
+    job_serializer,
+    replay_webhook_dead_letters,
+    requeue_webhook_delivery,
     scrape_pap_espi_ebi,
     send_webhook,
 )
@@ -90,6 +100,7 @@ async def test_worker_job_scrape_pap_espi_ebi(
         poll_delay=0,
         queue_read_limit=10,
         redis_settings=settings.ARQ_REDIS_SETTINGS,
+        **get_job_serializers(),
     )
 
     dt = datetime(year=2024, month=7, day=22)
@@ -151,11 +162,12 @@ async def webhook_tests_db_data(db_session: AsyncSession) -> WebhookDbData:
     return {"espi_ebi": espi_ebi, "users": users, "endpoints": endpoints}
 
 
-@patch("gpw_scraper.worker.create_pool")
-async def test_dispatch_webhook_tasks(mock_create_pool, webhook_tests_db_data, db_sessionmaker, arq_pool: ArqRedis):
-    mock_pool = AsyncMock()
-    mock_create_pool.return_value = mock_pool
-
+async def test_dispatch_webhook_tasks(
+    webhook_tests_db_data,
+    db_sessionmaker,
+    arq_pool: ArqRedis,
+    redis_conn: Redis,
+):
     async def startup(ctx):
         ctx["db_sessionmaker"] = db_sessionmaker
 
@@ -163,18 +175,22 @@ async def test_dispatch_webhook_tasks(mock_create_pool, webhook_tests_db_data, d
         on_startup=startup,
         functions=[dispatch_send_webhook_tasks],
         burst=True,
+        max_burst_jobs=1,
         poll_delay=0,
         queue_read_limit=10,
         redis_settings=settings.ARQ_REDIS_SETTINGS,
+        **get_job_serializers(),
     )
     await arq_pool.enqueue_job("dispatch_send_webhook_tasks", webhook_tests_db_data["espi_ebi"][0].id)
     await worker.main()
 
-    assert mock_pool.enqueue_job.call_count == 3
-    assert all(call.args[1] == webhook_tests_db_data["espi_ebi"][0] for call in mock_pool.enqueue_job.call_args_list)
-    assert set(call.args[2].id for call in mock_pool.enqueue_job.call_args_list) == set(  # noqa: C401
+    send_webhook_jobs = [job for job in await arq_pool.queued_jobs() if job.function == "send_webhook"]
+    assert len(send_webhook_jobs) == 3
+    # job serializer stores validated arguments as kwargs
+    assert all(job.kwargs["espi_ebi_id"] == webhook_tests_db_data["espi_ebi"][0].id for job in send_webhook_jobs)
+    assert {job.kwargs["endpoint_id"] for job in send_webhook_jobs} == {
         endpoint.id for endpoint in webhook_tests_db_data["endpoints"]
-    )
+    }
 
 
 @pytest.fixture
@@ -191,9 +207,15 @@ async def webhook_api():
     }
 
     async def response_200(request: web.Request) -> web.Response:
-        webhook_secret_header = request.headers["x-webhook-secret"]
-        assert base64.b64decode(webhook_secret_header).decode("utf-8") == "secret"
-        body = await request.json()
+        raw_body = await request.read()
+        assert "x-webhook-secret" not in request.headers
+        assert webhook_signature.verify_signature(
+            "secret",
+            raw_body,
+            request.headers[webhook_signature.TIMESTAMP_HEADER],
+            request.headers[webhook_signature.SIGNATURE_HEADER],
+        )
+        body = json.loads(raw_body)
         assert body == expected_webhook_body
 
         if body["description"] == "FORCE_400":
@@ -251,13 +273,14 @@ async def test_send_webhook(
         poll_delay=0,
         queue_read_limit=10,
         redis_settings=settings.ARQ_REDIS_SETTINGS,
+        **get_job_serializers(),
     )
 
     # dry run
     await arq_pool.enqueue_job(
         "send_webhook",
-        webhook_tests_db_data["espi_ebi"][0],
-        webhook_tests_db_data["endpoints"][0],
+        webhook_tests_db_data["espi_ebi"][0].id,
+        webhook_tests_db_data["endpoints"][0].id,
         dry_run=True,
     )
     await worker.main()
@@ -274,8 +297,8 @@ async def test_send_webhook(
     # aiohttp.ClientResponseError
     await arq_pool.enqueue_job(
         "send_webhook",
-        webhook_tests_db_data["espi_ebi"][0],
-        webhook_tests_db_data["endpoints"][1],
+        webhook_tests_db_data["espi_ebi"][0].id,
+        webhook_tests_db_data["endpoints"][1].id,
     )
     await worker.main()
     event = (
@@ -290,8 +313,8 @@ async def test_send_webhook(
     # aiohttp.ClientConnectorDNSError
     await arq_pool.enqueue_job(
         "send_webhook",
-        webhook_tests_db_data["espi_ebi"][0],
-        webhook_tests_db_data["endpoints"][0],
+        webhook_tests_db_data["espi_ebi"][0].id,
+        webhook_tests_db_data["endpoints"][0].id,
     )
     await worker.main()
     event = (
@@ -306,8 +329,8 @@ async def test_send_webhook(
     # Valid response
     await arq_pool.enqueue_job(
         "send_webhook",
-        webhook_tests_db_data["espi_ebi"][0],
-        webhook_tests_db_data["endpoints"][2],
+        webhook_tests_db_data["espi_ebi"][0].id,
+        webhook_tests_db_data["endpoints"][2].id,
     )
     await worker.main()
     event = (
@@ -340,17 +363,18 @@ async def test_send_webhook_retry_on_exception(
 
     worker = Worker(
         on_startup=startup,
-        functions=[send_webhook],
+        functions=[send_webhook, requeue_webhook_delivery],
         burst=True,
         poll_delay=0,
         queue_read_limit=10,
         redis_settings=settings.ARQ_REDIS_SETTINGS,
+        **get_job_serializers(),
     )
 
     await arq_pool.enqueue_job(
         "send_webhook",
-        webhook_tests_db_data["espi_ebi"][0],
-        endpoint,
+        webhook_tests_db_data["espi_ebi"][0].id,
+        endpoint.id,
     )
     await worker.main()
     events = (
@@ -371,3 +395,221 @@ async def test_send_webhook_retry_on_exception(
 
     assert events[1].type == webhook_models.WebhookEventType.delivery_success
     assert events[1].http_code == 200
+
+
+async def test_send_webhook_dead_letter_and_replay(
+    *,
+    webhook_api,
+    webhook_tests_db_data,
+    db_sessionmaker,
+    db_session: AsyncSession,
+    arq_pool: ArqRedis,
+    redis_conn: Redis,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(settings, "WEBHOOK_MAX_TRIES", 1)
+
+    async def startup(ctx):
+        ctx["db_sessionmaker"] = db_sessionmaker
+
+    worker = Worker(
+        on_startup=startup,
+        functions=[send_webhook, replay_webhook_dead_letters],
+        burst=True,
+        poll_delay=0,
+        queue_read_limit=10,
+        redis_settings=settings.ARQ_REDIS_SETTINGS,
+        **get_job_serializers(),
+    )
+
+    endpoint = webhook_tests_db_data["endpoints"][1]  # always 400
+    await arq_pool.enqueue_job("send_webhook", webhook_tests_db_data["espi_ebi"][0].id, endpoint.id)
+    await worker.main()
+
+    dead_letter = (await db_session.execute(select(webhook_models.WebhookDeadLetter))).scalar_one()
+    assert dead_letter.webhook_id == endpoint.id
+    assert dead_letter.reason == webhook_models.WebhookDeadLetterReason.retries_exhausted
+    assert dead_letter.attempts == 1
+    assert dead_letter.replayed_at is None
+
+    await arq_pool.enqueue_job("replay_webhook_dead_letters", endpoint.id)
+    await worker.main()
+
+    db_session.expire_all()
+    dead_letter = (await db_session.execute(select(webhook_models.WebhookDeadLetter))).scalar_one()
+    assert dead_letter.replayed_at is not None
+
+    # replayed as dry run in tests
+    event = (
+        await db_session.execute(
+            select(webhook_models.WebhookEvent).order_by(webhook_models.WebhookEvent.created_at.desc()).limit(1)
+        )
+    ).scalar_one()
+    assert event.type == webhook_models.WebhookEventType.delivery_success
+    assert event.meta == {"dry_run": True}
+
+
+async def test_espi_ebi_pap_node_ids_in_date_range(db_session: AsyncSession):
+    dates = [
+        datetime(2024, 7, 21, 23, 59, 59),
+        datetime(2024, 7, 22, 0, 0),
+        datetime(2024, 7, 23, 23, 59, 59),
+        datetime(2024, 7, 24, 0, 0),
+    ]
+    db_session.add_all(
+        espi_ebi_models.EspiEbi(
+            type=espi_ebi_models.EntryType.ESPI,
+            title="title",
+            description=None,
+            company="company",
+            source=f"https://espiebi.pap.pl/node/{i}",
+            pap_node_id=i,
+            parsed_by_llm=None,
+            date=date,
+        )
+        for i, date in enumerate(dates)
+    )
+    await db_session.commit()
+
+    node_ids = await SQLAEspiEbiService(db_session).list_pap_node_ids_in_date_range(
+        datetime(2024, 7, 22, 12, 0), datetime(2024, 7, 23, 8, 0)
+    )
+    assert node_ids == {1, 2}
+
+
+def test_month_partitions():
+    assert month_partition(date(2024, 12, 15)) == ("espi_ebi_y2024m12", date(2024, 12, 1), date(2025, 1, 1))
+    assert [p.name for p in month_partitions(date(2024, 11, 30), date(2025, 1, 1))] == [
+        "espi_ebi_y2024m11",
+        "espi_ebi_y2024m12",
+        "espi_ebi_y2025m01",
+    ]
+    assert [p.name for p in month_partitions(date(2024, 7, 1), date(2024, 7, 31))] == ["espi_ebi_y2024m07"]
+
+
+def espi_ebi_entry(source: str, date_: datetime) -> espi_ebi_models.EspiEbi:
+    return espi_ebi_models.EspiEbi(
+        type=espi_ebi_models.EntryType.ESPI,
+        title="title",
+        description=None,
+        company="company",
+        source=source,
+        parsed_by_llm=None,
+        date=date_,
+    )
+
+
+async def test_espi_ebi_create_partitions(db_session: AsyncSession):
+    service = SQLAEspiEbiService(db_session)
+    partitions = month_partitions(date(2024, 6, 1), date(2024, 8, 1))
+
+    # a row of june in the default partition blocks only that month
+    db_session.add(espi_ebi_entry("https://espiebi.pap.pl/node/1", datetime(2024, 6, 10)))
+    await db_session.commit()
+
+    assert await service.create_partitions(partitions) == ["espi_ebi_y2024m07", "espi_ebi_y2024m08"]
+    assert await service.create_partitions(partitions) == []
+
+    db_session.add(espi_ebi_entry("https://espiebi.pap.pl/node/2", datetime(2024, 7, 10)))
+    await db_session.commit()
+    partition = (await db_session.execute(text("SELECT tableoid::regclass::text FROM espi_ebi WHERE id = 2"))).scalar()
+    assert partition == "espi_ebi_y2024m07"
+
+
+async def test_espi_ebi_source_unique_across_partitions(db_session: AsyncSession):
+    service = SQLAEspiEbiService(db_session)
+    await service.create_partitions(month_partitions(date(2024, 6, 1), date(2024, 7, 1)))
+    await service.create(espi_ebi_entry("https://espiebi.pap.pl/node/1", datetime(2024, 6, 10)))
+
+    with pytest.raises(ConflictError):
+        await service.create(espi_ebi_entry("https://espiebi.pap.pl/node/1", datetime(2024, 7, 10)))
+
+
+def test_webhook_events_day_partitions():
+    partitions = day_partitions(date(2024, 2, 28), date(2024, 3, 1))
+    assert [p.name for p in partitions] == [
+        "webhook_events_y2024m02d28",
+        "webhook_events_y2024m02d29",
+        "webhook_events_y2024m03d01",
+    ]
+    assert partitions[-1].end == date(2024, 3, 2)
+    assert [parse_day_partition(p.name) for p in partitions] == [date(2024, 2, 28), date(2024, 2, 29), date(2024, 3, 1)]
+    assert parse_day_partition("webhook_events_default") is None
+
+
+async def test_webhook_events_rollup_and_retention(webhook_tests_db_data, db_session: AsyncSession):
+    service = SQLAWebhookEventService(db_session)
+    assert len(await service.create_partitions(day_partitions(date(2024, 7, 20), date(2024, 7, 22)))) == 3
+
+    endpoint_id = webhook_tests_db_data["endpoints"][0].id
+    espi_ebi_id = webhook_tests_db_data["espi_ebi"][0].id
+    events = [
+        # default partition
+        (datetime(2024, 7, 19, 12, 0, tzinfo=UTC), webhook_models.WebhookEventType.delivery_success, 10.0),
+        *(
+            (datetime(2024, 7, 21, i, 0, tzinfo=UTC), webhook_models.WebhookEventType.delivery_success, float(i))
+            for i in range(1, 11)
+        ),
+        (datetime(2024, 7, 21, 23, 0, tzinfo=UTC), webhook_models.WebhookEventType.delivery_fail, None),
+        (datetime(2024, 7, 22, 0, 0, tzinfo=UTC), webhook_models.WebhookEventType.delivery_fail_response, 50.0),
+    ]
+    db_session.add_all(
+        webhook_models.WebhookEvent(
+            type=type_,
+            webhook_id=endpoint_id,
+            espi_ebi_id=espi_ebi_id,
+            latency_ms=latency_ms,
+            created_at=created_at,
+        )
+        for created_at, type_, latency_ms in events
+    )
+    await db_session.commit()
+
+    assert await service.rollup_day(date(2024, 7, 21)) == 1
+    rollup = (
+        await db_session.execute(
+            select(webhook_models.WebhookEventDailyRollup).where(
+                webhook_models.WebhookEventDailyRollup.day == date(2024, 7, 21)
+            )
+        )
+    ).scalar_one()
+    assert (rollup.webhook_id, rollup.success_count, rollup.failure_count) == (endpoint_id, 10, 1)
+    assert rollup.latency_p50_ms == pytest.approx(5.5)
+    assert rollup.latency_p99_ms == pytest.approx(9.91)
+
+    # idempotent
+    assert await service.rollup_day(date(2024, 7, 21)) == 1
+
+    assert await service.drop_partitions_before(date(2024, 7, 22)) == [
+        "webhook_events_y2024m07d20",
+        "webhook_events_y2024m07d21",
+    ]
+    remaining = (await db_session.execute(select(webhook_models.WebhookEvent.created_at))).scalars().all()
+    assert remaining == [datetime(2024, 7, 22, 0, 0, tzinfo=UTC)]
+
+
+def test_job_serializer():
+    job = {"t": 1, "f": "send_webhook", "a": (1, 2), "k": {"dry_run": True}, "et": 1700000000000}
+    data = job_deserializer(job_serializer(job))
+    assert data["a"] == []
+    assert data["k"] == {"espi_ebi_id": 1, "endpoint_id": 2, "delivery_id": None, "attempt": 1, "dry_run": True}
+
+    dt = datetime(year=2024, month=7, day=22)
+    job = {"t": 1, "f": "scrape_pap_espi_ebi", "a": (dt, dt), "k": {}, "et": 1700000000000}
+    assert job_deserializer(job_serializer(job))["k"] == {"date_start": dt, "date_end": dt}
+
+    item = PapHrefItem(href="/node/1", date=datetime(2024, 7, 22, 10, 0))
+    job = {"t": 1, "f": "scrape_pap_items_chunk", "a": ([item],), "k": {}, "et": 1700000000000}
+    assert job_deserializer(job_serializer(job))["k"] == {"hrefs": [item], "dispatch_webhooks": True}
+
+    # result of a finished job
+    result = {**job, "s": False, "r": ValueError("boom"), "st": 1, "ft": 2, "q": "arq:queue", "id": "abc"}
+    assert job_deserializer(job_serializer(result))["r"] == "ValueError('boom')"
+
+
+def test_job_serializer_invalid_args():
+    with pytest.raises(pydantic.ValidationError):
+        job_serializer({"t": 1, "f": "send_webhook", "a": ("not an id",), "k": {}, "et": 1700000000000})
+
+    with pytest.raises(pydantic.ValidationError):
+        job_serializer({"t": 1, "f": "send_webhook", "a": (1, 2), "k": {"unknown": 1}, "et": 1700000000000})